@@ -2,6 +2,8 @@ from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
+from sqlalchemy import text
+from sqlalchemy import Column
 
 from alembic import context
 
@@ -11,6 +13,9 @@ from app.db.base import Base
 
 from app.models.user import User
 from app.models.ticket import Ticket
+from app.models.counter import RowCounter
+from app.models.draft import TicketDraft
+from app.models.stats import TicketStat, StatsRollup
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -18,7 +23,8 @@ config = context.config
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
+# app.cli.serve настраивает логирование сам и выключает это через attributes
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
@@ -27,6 +33,25 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# Ключ pg_advisory_xact_lock: экземпляры, стартующие одновременно, применяют миграции по очереди
+MIGRATION_LOCK_KEY = 7_240_513_001
+
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Одноимённые индексы по выражениям (priority_rank) не сравниваются.
+
+    Postgres хранит выражение переформатированным, с переносами строк, и
+    alembic видел бы в нём изменение при каждом check. Появление и удаление
+    таких индексов autogenerate по-прежнему замечает.
+    """
+    if type_ == "index" and compare_to is not None:
+        metadata_index = compare_to if reflected else obj
+        if any(not isinstance(expression, Column) for expression in metadata_index.expressions):
+            return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -71,9 +96,13 @@ def run_migrations_online() -> None:
             connection=connection,
             target_metadata=target_metadata, 
             compare_type=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
+            if connection.dialect.name == "postgresql":
+                # До чтения alembic_version: следующий экземпляр увидит уже обновлённую схему
+                connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
             context.run_migrations()
 
 
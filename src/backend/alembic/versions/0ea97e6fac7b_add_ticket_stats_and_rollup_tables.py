@@ -0,0 +1,79 @@
+"""Add ticket_stats and rollup tables
+
+Revision ID: 0ea97e6fac7b
+Revises: e1b86d4c3f27
+Create Date: 2026-10-18 16:02:41.518307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0ea97e6fac7b'
+down_revision: Union[str, Sequence[str], None] = 'e1b86d4c3f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ticket_stats_rollups',
+    sa.Column('dimension', sa.Enum('DAY', 'OPERATOR', 'PRIORITY', name='statsdimension'), nullable=False),
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('answered', sa.BigInteger(), nullable=False),
+    sa.Column('first_response_seconds_sum', sa.Float(), nullable=False),
+    sa.Column('first_response_seconds_max', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('dimension', 'key')
+    )
+    op.create_table('ticket_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('ticket_id', sa.Integer(), nullable=False),
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('operator_id', sa.Integer(), nullable=True),
+    sa.Column('priority', postgresql.ENUM('LOW', 'MIDDLE', 'HIGH', name='ticketpriority', create_type=False), nullable=False),
+    sa.Column('problem', sa.String(length=255), nullable=False),
+    sa.Column('solution', sa.Text(), nullable=False),
+    sa.Column('ticket_created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('answered_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('first_response_seconds', sa.Float(), sa.Computed('EXTRACT(EPOCH FROM answered_at - ticket_created_at)::double precision', persisted=True), nullable=True),
+    sa.ForeignKeyConstraint(['client_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['operator_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('ticket_id')
+    )
+    op.create_index('ix_ticket_stats_answered_at_id', 'ticket_stats', ['answered_at', 'id'], unique=False)
+    op.create_index(op.f('ix_ticket_stats_client_id'), 'ticket_stats', ['client_id'], unique=False)
+    op.create_index(op.f('ix_ticket_stats_operator_id'), 'ticket_stats', ['operator_id'], unique=False)
+
+    # Уже отвеченные тикеты: исполнитель неизвестен, время ответа — последнее изменение тикета
+    op.execute("""
+        INSERT INTO ticket_stats (ticket_id, client_id, priority, problem, solution, ticket_created_at, answered_at)
+        SELECT id, user_id, priority, topic, response, created_at, coalesce(updated_at, created_at)
+        FROM tickets
+        WHERE response IS NOT NULL
+    """)
+    op.execute("""
+        INSERT INTO ticket_stats_rollups (dimension, key, answered, first_response_seconds_sum, first_response_seconds_max)
+        SELECT 'DAY'::statsdimension, to_char(answered_at AT TIME ZONE 'UTC', 'YYYY-MM-DD'),
+               count(*), sum(first_response_seconds), max(first_response_seconds)
+        FROM ticket_stats GROUP BY 2
+        UNION ALL
+        SELECT 'PRIORITY'::statsdimension, lower(priority::text),
+               count(*), sum(first_response_seconds), max(first_response_seconds)
+        FROM ticket_stats GROUP BY 2
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_ticket_stats_operator_id'), table_name='ticket_stats')
+    op.drop_index(op.f('ix_ticket_stats_client_id'), table_name='ticket_stats')
+    op.drop_index('ix_ticket_stats_answered_at_id', table_name='ticket_stats')
+    op.drop_table('ticket_stats')
+    op.drop_table('ticket_stats_rollups')
+    sa.Enum(name='statsdimension').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,29 @@
+"""Add keyset pagination indexes to tickets
+
+Revision ID: 193150ae0904
+Revises: 68456b1097a5
+Create Date: 2026-10-18 10:12:31.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '193150ae0904'
+down_revision: Union[str, Sequence[str], None] = '68456b1097a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tickets_created_at_id', 'tickets', ['created_at', 'id'], unique=False)
+    op.create_index('ix_tickets_user_id_created_at_id', 'tickets', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tickets_user_id_created_at_id', table_name='tickets')
+    op.drop_index('ix_tickets_created_at_id', table_name='tickets')
@@ -0,0 +1,27 @@
+"""Add tickets updated_at index
+
+Revision ID: 3f7a1c9d2e68
+Revises: 5d2e9c41a7b3
+Create Date: 2026-10-18 13:05:41.527309
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f7a1c9d2e68'
+down_revision: Union[str, Sequence[str], None] = '5d2e9c41a7b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tickets_updated_at', 'tickets', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tickets_updated_at', table_name='tickets')
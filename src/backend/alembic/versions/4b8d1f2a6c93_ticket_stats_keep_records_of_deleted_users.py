@@ -0,0 +1,42 @@
+"""Keep ticket_stats records when their client or operator is deleted
+
+Revision ID: 4b8d1f2a6c93
+Revises: c60891b25c4d
+Create Date: 2026-10-18 15:20:07.114392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8d1f2a6c93'
+down_revision: Union[str, Sequence[str], None] = 'c60891b25c4d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('ticket_stats', 'client_id', existing_type=sa.Integer(), nullable=True)
+    op.drop_constraint('ticket_stats_client_id_fkey', 'ticket_stats', type_='foreignkey')
+    op.drop_constraint('ticket_stats_operator_id_fkey', 'ticket_stats', type_='foreignkey')
+    op.create_foreign_key(
+        'ticket_stats_client_id_fkey', 'ticket_stats', 'users', ['client_id'], ['id'], ondelete='SET NULL'
+    )
+    op.create_foreign_key(
+        'ticket_stats_operator_id_fkey', 'ticket_stats', 'users', ['operator_id'], ['id'], ondelete='SET NULL'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ticket_stats_operator_id_fkey', 'ticket_stats', type_='foreignkey')
+    op.drop_constraint('ticket_stats_client_id_fkey', 'ticket_stats', type_='foreignkey')
+    op.create_foreign_key('ticket_stats_operator_id_fkey', 'ticket_stats', 'users', ['operator_id'], ['id'])
+    op.create_foreign_key('ticket_stats_client_id_fkey', 'ticket_stats', 'users', ['client_id'], ['id'])
+    # Записи удалённых клиентов без client_id вернуть под NOT NULL нельзя
+    op.execute("DELETE FROM ticket_stats WHERE client_id IS NULL")
+    op.alter_column('ticket_stats', 'client_id', existing_type=sa.Integer(), nullable=False)
@@ -20,6 +20,8 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
+    # add_column не создаёт тип enum сам
+    sa.Enum('USER', 'OPERATOR', 'ADMIN', name='userrole').create(op.get_bind(), checkfirst=True)
     # ### commands auto generated by Alembic - please adjust! ###
     op.add_column('users', sa.Column('role', sa.Enum('USER', 'OPERATOR', 'ADMIN', name='userrole'), nullable=True))
     # ### end Alembic commands ###
@@ -30,3 +32,4 @@ def downgrade() -> None:
     # ### commands auto generated by Alembic - please adjust! ###
     op.drop_column('users', 'role')
     # ### end Alembic commands ###
+    sa.Enum(name='userrole').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,31 @@
+"""Release ticket claims when the claiming operator is deleted
+
+Revision ID: 7e3a9c5d1b24
+Revises: 4b8d1f2a6c93
+Create Date: 2026-10-18 17:42:31.508216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e3a9c5d1b24'
+down_revision: Union[str, Sequence[str], None] = '4b8d1f2a6c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_constraint('tickets_claimed_by_fkey', 'tickets', type_='foreignkey')
+    op.create_foreign_key(
+        'tickets_claimed_by_fkey', 'tickets', 'users', ['claimed_by'], ['id'], ondelete='SET NULL'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('tickets_claimed_by_fkey', 'tickets', type_='foreignkey')
+    op.create_foreign_key('tickets_claimed_by_fkey', 'tickets', 'users', ['claimed_by'], ['id'])
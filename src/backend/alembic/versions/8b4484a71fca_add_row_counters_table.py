@@ -0,0 +1,39 @@
+"""Add row_counters table
+
+Revision ID: 8b4484a71fca
+Revises: 193150ae0904
+Create Date: 2026-10-18 11:02:47.530194
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b4484a71fca'
+down_revision: Union[str, Sequence[str], None] = '193150ae0904'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('row_counters',
+    sa.Column('key', sa.String(length=128), nullable=False),
+    sa.Column('value', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    # Начальные значения счётчиков из текущих данных
+    op.execute("INSERT INTO row_counters (key, value) SELECT 'tickets', count(*) FROM tickets")
+    op.execute("INSERT INTO row_counters (key, value) SELECT 'users', count(*) FROM users")
+    op.execute(
+        "INSERT INTO row_counters (key, value) "
+        "SELECT 'tickets:user:' || user_id, count(*) FROM tickets GROUP BY user_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('row_counters')
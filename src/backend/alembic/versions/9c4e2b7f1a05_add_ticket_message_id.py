@@ -0,0 +1,30 @@
+"""Add message_id to tickets
+
+Revision ID: 9c4e2b7f1a05
+Revises: 3f7a1c9d2e68
+Create Date: 2026-10-18 14:02:17.840615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e2b7f1a05'
+down_revision: Union[str, Sequence[str], None] = '3f7a1c9d2e68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tickets', sa.Column('message_id', sa.String(length=255), nullable=True))
+    op.create_unique_constraint('tickets_message_id_key', 'tickets', ['message_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('tickets_message_id_key', 'tickets', type_='unique')
+    op.drop_column('tickets', 'message_id')
@@ -0,0 +1,91 @@
+"""Add tickets archive table
+
+Revision ID: aa9bea2c97f7
+Revises: b949a406cf5d
+Create Date: 2026-10-18 13:47:15.491451
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'aa9bea2c97f7'
+down_revision: Union[str, Sequence[str], None] = 'b949a406cf5d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tickets_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('topic', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('priority', postgresql.ENUM('LOW', 'MIDDLE', 'HIGH', name='ticketpriority', create_type=False), nullable=False),
+    sa.Column('awaits_response', sa.Boolean(), nullable=False),
+    sa.Column('response', sa.Text(), nullable=True),
+    sa.Column('message_id', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('russian', coalesce(topic, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+            "setweight(to_tsvector('russian', coalesce(response, '')), 'C')",
+            persisted=True,
+        ),
+        nullable=True,
+    ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('message_id')
+    )
+    op.create_index('ix_tickets_archive_created_at_id', 'tickets_archive', ['created_at', 'id'], unique=False)
+    op.create_index('ix_tickets_archive_search_vector', 'tickets_archive', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_tickets_archive_user_id_created_at_id', 'tickets_archive', ['user_id', 'created_at', 'id'], unique=False)
+
+
+ARCHIVED_COLUMNS = (
+    "id, user_id, topic, description, priority, awaits_response, response, created_at, updated_at"
+)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Архивные тикеты возвращаются в tickets, а не удаляются вместе с таблицей.
+    # message_id, уже занятый в tickets повторной доставкой, у архивной копии обнуляется
+    op.execute(
+        f"INSERT INTO tickets ({ARCHIVED_COLUMNS}, message_id) "
+        f"SELECT {ARCHIVED_COLUMNS}, CASE WHEN EXISTS "
+        "(SELECT 1 FROM tickets WHERE tickets.message_id = tickets_archive.message_id) "
+        "THEN NULL ELSE message_id END FROM tickets_archive"
+    )
+    # Счётчики снова считают все тикеты в tickets; версии списков растут, кэш страниц устаревает
+    # \: — двоеточие, а не bind-параметр text()
+    op.execute(r"DELETE FROM row_counters WHERE key = 'tickets\:archived' OR key LIKE 'tickets:user:%\:archived'")
+    # Доли счётчика tickets (tickets:1, tickets:2, ...) сводятся в саму строку tickets
+    op.execute("DELETE FROM row_counters WHERE key ~ '^tickets:[0-9]+$'")
+    op.execute("UPDATE row_counters SET value = (SELECT count(*) FROM tickets) WHERE key = 'tickets'")
+    op.execute(
+        "INSERT INTO row_counters (key, value) "
+        "SELECT 'tickets:user:' || user_id, count(*) FROM tickets GROUP BY user_id "
+        "ON CONFLICT (key) DO UPDATE SET value = excluded.value"
+    )
+    op.execute(r"""
+        UPDATE row_counters SET value = value + 1 + (
+            SELECT coalesce(sum(value), 0) FROM row_counters WHERE key ~ '^tickets\:version\:[0-9]+$'
+        ) WHERE key = 'tickets\:version'
+    """)
+    op.execute(r"DELETE FROM row_counters WHERE key ~ '^tickets\:version\:[0-9]+$'")
+    op.execute("UPDATE row_counters SET value = value + 1 WHERE key LIKE 'tickets:user:%version'")
+    op.drop_index('ix_tickets_archive_user_id_created_at_id', table_name='tickets_archive')
+    op.drop_index('ix_tickets_archive_search_vector', table_name='tickets_archive', postgresql_using='gin')
+    op.drop_index('ix_tickets_archive_created_at_id', table_name='tickets_archive')
+    op.drop_table('tickets_archive')
@@ -0,0 +1,34 @@
+"""Add ticket claims and work queue index
+
+Revision ID: b949a406cf5d
+Revises: 0ea97e6fac7b
+Create Date: 2026-10-18 17:24:09.402817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b949a406cf5d'
+down_revision: Union[str, Sequence[str], None] = '0ea97e6fac7b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tickets', sa.Column('claimed_by', sa.Integer(), nullable=True))
+    op.add_column('tickets', sa.Column('claimed_until', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_tickets_work_queue', 'tickets', [sa.literal_column('priority DESC'), 'created_at'], unique=False, postgresql_where=sa.text('awaits_response'))
+    op.create_foreign_key('tickets_claimed_by_fkey', 'tickets', 'users', ['claimed_by'], ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('tickets_claimed_by_fkey', 'tickets', type_='foreignkey')
+    op.drop_index('ix_tickets_work_queue', table_name='tickets', postgresql_where=sa.text('awaits_response'))
+    op.drop_column('tickets', 'claimed_until')
+    op.drop_column('tickets', 'claimed_by')
@@ -0,0 +1,47 @@
+"""Add operator listing indexes and rank-ordered work queue
+
+Revision ID: c60891b25c4d
+Revises: aa9bea2c97f7
+Create Date: 2026-10-18 13:53:15.821942
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# Срочность тикета, как app.models.ticket.priority_rank: 0 — HIGH
+PRIORITY_RANK = sa.literal_column(
+    "(CASE WHEN (priority = 'HIGH') THEN 0 WHEN (priority = 'MIDDLE') THEN 1 WHEN (priority = 'LOW') THEN 2 "
+    "ELSE NULL END)"
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c60891b25c4d'
+down_revision: Union[str, Sequence[str], None] = 'aa9bea2c97f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Очередь операторов теперь упорядочена по (rank, created_at, id), как список с sort=priority
+    op.drop_index('ix_tickets_work_queue', table_name='tickets', postgresql_where=sa.text('awaits_response'))
+    op.create_index('ix_tickets_work_queue', 'tickets', [PRIORITY_RANK, 'created_at', 'id'], unique=False, postgresql_where=sa.text('awaits_response'), sqlite_where=sa.text('awaits_response'))
+    op.create_index('ix_tickets_awaiting_created_at_id', 'tickets', ['created_at', 'id'], unique=False, postgresql_where=sa.text('awaits_response'), sqlite_where=sa.text('awaits_response'))
+    op.create_index('ix_tickets_priority_created_at_id', 'tickets', ['priority', 'created_at', 'id'], unique=False)
+    op.create_index('ix_tickets_priority_rank_created_at_id', 'tickets', [PRIORITY_RANK, 'created_at', 'id'], unique=False)
+    op.create_index('ix_tickets_archive_priority_created_at_id', 'tickets_archive', ['priority', 'created_at', 'id'], unique=False)
+    op.create_index('ix_tickets_archive_priority_rank_created_at_id', 'tickets_archive', [PRIORITY_RANK, 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tickets_archive_priority_rank_created_at_id', table_name='tickets_archive')
+    op.drop_index('ix_tickets_archive_priority_created_at_id', table_name='tickets_archive')
+    op.drop_index('ix_tickets_priority_rank_created_at_id', table_name='tickets')
+    op.drop_index('ix_tickets_priority_created_at_id', table_name='tickets')
+    op.drop_index('ix_tickets_awaiting_created_at_id', table_name='tickets', postgresql_where=sa.text('awaits_response'), sqlite_where=sa.text('awaits_response'))
+    op.drop_index('ix_tickets_work_queue', table_name='tickets', postgresql_where=sa.text('awaits_response'), sqlite_where=sa.text('awaits_response'))
+    op.create_index('ix_tickets_work_queue', 'tickets', [sa.literal_column('priority DESC'), 'created_at'], unique=False, postgresql_where=sa.text('awaits_response'))
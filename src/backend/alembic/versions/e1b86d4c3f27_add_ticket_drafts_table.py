@@ -0,0 +1,46 @@
+"""Add ticket_drafts table
+
+Revision ID: e1b86d4c3f27
+Revises: 9c4e2b7f1a05
+Create Date: 2026-10-18 15:11:52.306148
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b86d4c3f27'
+down_revision: Union[str, Sequence[str], None] = '9c4e2b7f1a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ticket_drafts',
+    sa.Column('ticket_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'READY', 'FAILED', 'CANCELLED', name='draftstatus'), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('drafter', sa.String(length=64), nullable=True),
+    sa.Column('draft', sa.Text(), nullable=True),
+    sa.Column('from_cache', sa.Boolean(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['ticket_id'], ['tickets.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ticket_id')
+    )
+    op.create_index(op.f('ix_ticket_drafts_content_hash'), 'ticket_drafts', ['content_hash'], unique=False)
+    op.create_index('ix_ticket_drafts_status_created_at', 'ticket_drafts', ['status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_ticket_drafts_status_created_at', table_name='ticket_drafts')
+    op.drop_index(op.f('ix_ticket_drafts_content_hash'), table_name='ticket_drafts')
+    op.drop_table('ticket_drafts')
+    sa.Enum(name='draftstatus').drop(op.get_bind(), checkfirst=True)
@@ -1,26 +1,73 @@
+from typing import AsyncGenerator, Optional
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from jose import JWTError, jwt
+from pydantic import ValidationError
 
-from app.db.session import get_db_session
+from app.db.session import get_db_session, read_router, READ_ROUTING
 
 from app.repositories.ticket import TicketRepository
 from app.repositories.user import UserRepository
+from app.repositories.stats import StatsRepository
 
 from app.services.ticket import TicketService
 from app.services.auth import AuthService
 from app.services.user import UserService
+from app.services.stats import StatsService
+
+from app.schemas.user import CurrentUser
 
-from app.core.config import settings
+from app.core.cache import current_user_cache
 from app.core.enums import UserRole
+from app.core.security import InvalidTokenError, decode_access_token
+
 
+async def get_optional_token_subject(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(HTTPBearer(auto_error=False)),
+) -> Optional[str]:
+    """sub из токена, если он есть и валиден; без ошибок для анонимных запросов"""
+    if credentials is None:
+        return None
+    try:
+        payload = decode_access_token(credentials.credentials)
+    except InvalidTokenError:
+        return None
+    return payload.get("sub")
+
+async def get_read_db_session(
+    primary: AsyncSession = Depends(get_db_session),
+    subject: Optional[str] = Depends(get_optional_token_subject),
+) -> AsyncGenerator[AsyncSession, None]:
+    """Сессия для чтения: реплика, либо primary (нет реплик, недавняя запись, реплики недоступны)"""
+    if not read_router.enabled or await read_router.sticks_to_primary(subject):
+        READ_ROUTING.inc(target="primary")
+        yield primary
+        return
+
+    session = await read_router.open_session()
+    if session is None:
+        READ_ROUTING.inc(target="fallback")
+        yield primary
+        return
+
+    READ_ROUTING.inc(target="replica")
+    try:
+        yield session
+    finally:
+        await session.close()
 
 async def get_user_repo(
     session: AsyncSession = Depends(get_db_session),
 ) -> UserRepository:
     return UserRepository(session)
 
+async def get_read_user_repo(
+    session: AsyncSession = Depends(get_db_session),
+    read_session: AsyncSession = Depends(get_read_db_session),
+) -> UserRepository:
+    return UserRepository(session, read_session=read_session)
+
 async def get_auth_service(
     user_repo: UserRepository = Depends(get_user_repo),
 ) -> AuthService:
@@ -31,6 +78,11 @@ async def get_user_service(
 ) -> UserService:
     return UserService(user_repo)
 
+async def get_read_user_service(
+    user_repo: UserRepository = Depends(get_read_user_repo)
+) -> UserService:
+    return UserService(user_repo)
+
 async def get_ticket_repo(session: AsyncSession = Depends(get_db_session)) -> TicketRepository:
     return TicketRepository(session)
 
@@ -40,66 +92,92 @@ async def get_ticket_service(
 ) -> TicketService:
     return TicketService(ticket_repo, user_repo)
 
-async def get_current_user_email(
+async def get_read_ticket_repo(
+    session: AsyncSession = Depends(get_db_session),
+    read_session: AsyncSession = Depends(get_read_db_session),
+) -> TicketRepository:
+    return TicketRepository(session, read_session=read_session)
+
+async def get_read_ticket_service(
+    ticket_repo: TicketRepository = Depends(get_read_ticket_repo),
+    user_repo: UserRepository = Depends(get_read_user_repo)
+) -> TicketService:
+    """Сервис для read-only эндпоинтов: чтения могут идти в реплику"""
+    return TicketService(ticket_repo, user_repo)
+
+async def get_read_stats_service(
+    session: AsyncSession = Depends(get_db_session),
+    read_session: AsyncSession = Depends(get_read_db_session),
+) -> StatsService:
+    return StatsService(StatsRepository(session, read_session=read_session))
+
+async def get_token_payload(
     credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
-) -> str:
-    """Извлекает email из JWT токена"""
+) -> dict:
+    """Проверяет подпись JWT и возвращает его claims"""
     try:
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM]
-        )
-        email: str = payload.get("sub")
-        if email is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        return email
-    except JWTError:
+        payload = decode_access_token(credentials.credentials)
+    except InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-
-async def get_current_user_id(
-    email: str = Depends(get_current_user_email),
-    user_repo: UserRepository = Depends(get_user_repo)
-) -> int:
-    """Получает user_id из БД по email из токена"""
-    user = await user_repo.get_by_email(email)
-    if not user:
+    if payload.get("sub") is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
+            detail="Invalid token",
+            headers={"WWW-Authenticate": "Bearer"},
         )
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Inactive user",
+    return payload
+
+async def get_current_user_email(payload: dict = Depends(get_token_payload)) -> str:
+    """Извлекает email из JWT токена"""
+    return payload["sub"]
+
+def _user_from_claims(payload: dict) -> Optional[CurrentUser]:
+    """Собирает пользователя из claims, если им ещё можно доверять"""
+    if "uid" not in payload or "role" not in payload:
+        return None
+    if not current_user_cache.claims_are_fresh(payload["sub"], payload.get("iat")):
+        return None
+    try:
+        return CurrentUser(
+            id=payload["uid"], email=payload["sub"], is_active=True, role=payload["role"]
         )
-    return user.id
+    except ValidationError:
+        return None
 
-async def get_current_user_role(
-    email: str = Depends(get_current_user_email),
+async def get_current_user(
+    payload: dict = Depends(get_token_payload),
     user_repo: UserRepository = Depends(get_user_repo)
-) -> UserRole:
-    """Получает роль пользователя из БД"""
-    user = await user_repo.get_by_email(email)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-        )
+) -> CurrentUser:
+    """Текущий пользователь: кэш процесса -> свежие claims токена -> БД (один запрос на request)"""
+    email = payload["sub"]
+    user = current_user_cache.get(email) or _user_from_claims(payload)
+    if user is None:
+        db_user = await user_repo.get_by_email(email)
+        if not db_user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+        user = CurrentUser.model_validate(db_user)
+        current_user_cache.set(email, user)
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Inactive user",
         )
-    return user.role
+    return user
+
+async def get_current_user_id(current_user: CurrentUser = Depends(get_current_user)) -> int:
+    """Получает user_id текущего пользователя"""
+    return current_user.id
+
+async def get_current_user_role(current_user: CurrentUser = Depends(get_current_user)) -> UserRole:
+    """Получает роль текущего пользователя"""
+    return current_user.role
 
 def require_role(*allowed_roles: UserRole):
     """Декоратор-зависимость для проверки роли"""
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, status
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.startup import ping_database, startup_state
+
+from app.db.session import get_engine
+
+from app.similarity.engine import similarity_engine
+
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live")
+async def liveness():
+    """Процесс жив и event loop отвечает; БД не проверяется, чтобы её сбой не перезапускал воркеры"""
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+async def readiness():
+    """Прогрев закончен, процесс не останавливается и БД отвечает; иначе 503"""
+    checks = {
+        "startup": startup_state.ready,
+        "database": startup_state.ready
+        and await ping_database(get_engine(), settings.READINESS_DB_TIMEOUT_SECONDS),
+    }
+    ready = all(checks.values())
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={
+            "status": "ready" if ready else "not ready",
+            "checks": checks,
+            # Индекс похожих обращений строится в фоне и на готовность не влияет: пока его нет, поиск отдаёт 503
+            "similarity_index": similarity_engine.ready,
+        },
+    )
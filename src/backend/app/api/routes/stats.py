@@ -0,0 +1,81 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.schemas.stats import (TicketStatListResponse, DailyStatsResponse,
+                               OperatorStatsResponse, PriorityStatsResponse)
+
+from app.services.stats import StatsService
+
+from app.api.deps import get_read_stats_service, require_operator_or_admin
+
+from app.core.enums import UserRole, ExportFormat
+from app.core.export import MEDIA_TYPES, export_filename
+
+
+router = APIRouter(prefix="/stats", tags=["Statistics"])
+
+
+@router.get("/records", response_model=TicketStatListResponse)
+async def get_stat_records(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Курсор next_cursor из предыдущей страницы"),
+    stats_service: StatsService = Depends(get_read_stats_service),
+    role: UserRole = Depends(require_operator_or_admin),
+):
+    """Таблица решённых обращений (только ADMIN и OPERATOR)"""
+    try:
+        return await stats_service.get_records(skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/records/export")
+async def export_stat_records(
+    format: ExportFormat = Query(ExportFormat.CSV),
+    date_from: Optional[date] = Query(None, description="Первый день периода (UTC)"),
+    date_to: Optional[date] = Query(None, description="Последний день периода (UTC)"),
+    stats_service: StatsService = Depends(get_read_stats_service),
+    role: UserRole = Depends(require_operator_or_admin),
+):
+    """Выгрузка таблицы решённых обращений в CSV или XLSX (только ADMIN и OPERATOR)"""
+    return StreamingResponse(
+        stats_service.export_records(format, date_from, date_to),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename("stats", format)}"'},
+    )
+
+
+@router.get("/daily", response_model=DailyStatsResponse)
+async def get_daily_stats(
+    date_from: Optional[date] = Query(None, description="Первый день периода (UTC), по умолчанию 30 дней назад"),
+    date_to: Optional[date] = Query(None, description="Последний день периода (UTC), по умолчанию сегодня"),
+    stats_service: StatsService = Depends(get_read_stats_service),
+    role: UserRole = Depends(require_operator_or_admin),
+):
+    """Ответы и время до первого ответа по дням (только ADMIN и OPERATOR)"""
+    try:
+        return await stats_service.get_daily(date_from, date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/operators", response_model=OperatorStatsResponse)
+async def get_operator_stats(
+    stats_service: StatsService = Depends(get_read_stats_service),
+    role: UserRole = Depends(require_operator_or_admin),
+):
+    """Ответы и время до первого ответа по исполнителям (только ADMIN и OPERATOR)"""
+    return await stats_service.get_by_operator()
+
+
+@router.get("/priorities", response_model=PriorityStatsResponse)
+async def get_priority_stats(
+    stats_service: StatsService = Depends(get_read_stats_service),
+    role: UserRole = Depends(require_operator_or_admin),
+):
+    """Ответы и время до первого ответа по приоритетам (только ADMIN и OPERATOR)"""
+    return await stats_service.get_by_priority()
@@ -1,5 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status, Query
+from fastapi.responses import Response, StreamingResponse
 from fastapi.security import HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.ticket import (
     TicketCreate,
@@ -7,17 +12,34 @@ from app.schemas.ticket import (
     TicketResponse,
     TicketListResponse,
     TicketUpdateResponse,
+    TicketSearchResponse,
+    SimilarTicketsResponse,
+    TicketBulkResult,
+    TicketDraftResponse,
+    TicketClaimResponse,
 )
 
 from app.services.ticket import TicketService
 
 from app.api.deps import (
     get_ticket_service,
+    get_read_ticket_service,
+    get_current_user,
     get_current_user_id,
     require_operator_or_admin,
+    require_admin,
 )
 
-from app.core.enums import UserRole
+from app.db.session import read_router, get_db_session
+
+from app.events.hub import event_hub
+
+from app.schemas.user import CurrentUser
+
+from app.core.enums import TicketPriority, TicketSort, UserRole, ExportFormat
+from app.core.export import MEDIA_TYPES, export_filename
+from app.core.etag import conditional_response
+from app.core.streaming import iter_json_records
 
 router = APIRouter(prefix="/tickets", tags=["Support Tickets"])
 security = HTTPBearer()
@@ -27,34 +49,222 @@ security = HTTPBearer()
 async def create_ticket(
     ticket_in: TicketCreate,
     ticket_service: TicketService = Depends(get_ticket_service),
-    current_user_id: int = Depends(get_current_user_id),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """Создать новый тикет поддержки"""
-    return await ticket_service.create_ticket(ticket_in, user_id=current_user_id)
+    ticket = await ticket_service.create_ticket(ticket_in, user_id=current_user.id)
+    await read_router.mark_write(current_user.email)
+    return ticket
+
+
+@router.post("/bulk", response_model=TicketBulkResult)
+async def bulk_create_tickets(
+    request: Request,
+    ticket_service: TicketService = Depends(get_ticket_service),
+    role: UserRole = Depends(require_admin),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Массовая загрузка тикетов (только ADMIN).
+
+    Тело — NDJSON (одна запись на строку) или JSON-массив записей TicketCreate
+    с необязательным user_email. Тело читается потоком, ошибочные строки
+    попадают в errors с номером записи и не мешают загрузке остальных.
+    """
+    result = await ticket_service.bulk_create_tickets(
+        iter_json_records(request.stream()), default_user_id=current_user.id
+    )
+    await read_router.mark_write(current_user.email)
+    return result
+
+
+@router.post(
+    "/claim",
+    response_model=TicketClaimResponse,
+    responses={status.HTTP_204_NO_CONTENT: {"description": "Очередь пуста"}},
+)
+async def claim_next_ticket(
+    ticket_service: TicketService = Depends(get_ticket_service),
+    role: UserRole = Depends(require_operator_or_admin),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Взять следующий тикет из очереди (только ADMIN и OPERATOR).
+
+    Тикет закрепляется за оператором на TICKET_CLAIM_TTL_SECONDS и не выдаётся
+    другим, пока закрепление не истечёт, не будет снято или на тикет не ответят.
+    """
+    ticket = await ticket_service.claim_next_ticket(current_user.id)
+    if not ticket:
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    await read_router.mark_write(current_user.email)
+    return ticket
+
+
+@router.delete("/{ticket_id}/claim", status_code=status.HTTP_204_NO_CONTENT)
+async def release_ticket_claim(
+    ticket_id: int,
+    ticket_service: TicketService = Depends(get_ticket_service),
+    role: UserRole = Depends(require_operator_or_admin),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """Вернуть тикет в очередь: оператор — только свой, ADMIN — любой"""
+    released = await ticket_service.release_ticket_claim(
+        ticket_id, operator_id=None if role == UserRole.ADMIN else current_user.id
+    )
+    if not released:
+        raise HTTPException(status_code=404, detail="Claim not found")
 
 
-@router.get("/", response_model=TicketListResponse)
+@router.get(
+    "/",
+    response_model=TicketListResponse,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Список не изменился (If-None-Match)"}},
+)
 async def get_my_tickets(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    ticket_service: TicketService = Depends(get_ticket_service),
+    cursor: Optional[str] = Query(None, description="Курсор next_cursor из предыдущей страницы"),
+    with_total: bool = Query(True, description="false — не считать total, использовать has_more"),
+    include_archived: bool = Query(False, description="true — вместе с архивом старых отвеченных тикетов"),
+    if_none_match: Optional[str] = Header(None),
+    ticket_service: TicketService = Depends(get_read_ticket_service),
     current_user_id: int = Depends(get_current_user_id),
 ):
     """Получить список моих тикетов"""
-    return await ticket_service.get_user_tickets(
-        user_id=current_user_id, skip=skip, limit=limit
-    )
+    try:
+        page = await ticket_service.get_user_tickets_body(
+            user_id=current_user_id,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            with_total=with_total,
+            if_none_match=if_none_match,
+            include_archived=include_archived,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return conditional_response(page, "tickets")
 
 
-@router.get("/all", response_model=TicketListResponseWithUser)
+@router.get(
+    "/all",
+    response_model=TicketListResponseWithUser,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Список не изменился (If-None-Match)"}},
+)
 async def get_all_tickets(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    ticket_service: TicketService = Depends(get_ticket_service),
+    cursor: Optional[str] = Query(None, description="Курсор next_cursor из предыдущей страницы"),
+    with_total: bool = Query(True, description="false — не считать total, использовать has_more"),
+    include_archived: bool = Query(False, description="true — вместе с архивом старых отвеченных тикетов"),
+    priority: Optional[TicketPriority] = Query(None),
+    awaits_response: Optional[bool] = Query(None),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+    user_email: Optional[str] = Query(None, max_length=255, description="Только тикеты этого клиента"),
+    sort: TicketSort = Query(TicketSort.NEWEST, description="priority — срочные первыми, затем старые"),
+    if_none_match: Optional[str] = Header(None),
+    ticket_service: TicketService = Depends(get_read_ticket_service),
+    role: UserRole = Depends(require_operator_or_admin),
+):
+    """Получить тикеты системы с фильтрами и сортировкой (только ADMIN и OPERATOR).
+
+    Курсор next_cursor действует только с тем же sort.
+    """
+    try:
+        page = await ticket_service.get_all_tickets_body(
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            with_total=with_total,
+            if_none_match=if_none_match,
+            include_archived=include_archived,
+            priority=priority,
+            awaits_response=awaits_response,
+            created_from=created_from,
+            created_to=created_to,
+            user_email=user_email,
+            sort=sort,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return conditional_response(page, "tickets_all")
+
+
+@router.get("/stream")
+async def stream_ticket_events(
+    session: AsyncSession = Depends(get_db_session),
     role: UserRole = Depends(require_operator_or_admin),
 ):
-    """Получить все тикеты системы (только ADMIN и OPERATOR)"""
-    return await ticket_service.get_all_tickets(skip=skip, limit=limit)
+    """Поток событий для операторов, Server-Sent Events (только ADMIN и OPERATOR).
+
+    События: ticket.created, tickets.imported, ticket.answered, draft.ready.
+    Событие overflow означает, что клиент не успевал читать и был отключён:
+    нужно перечитать /tickets/all и переподключиться.
+    """
+    # Проверка роли могла занять соединение из пула; поток его держать не должен
+    await session.close()
+    return StreamingResponse(
+        event_hub.stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/export")
+async def export_tickets(
+    format: ExportFormat = Query(ExportFormat.CSV),
+    priority: Optional[TicketPriority] = Query(None),
+    awaits_response: Optional[bool] = Query(None),
+    answered: Optional[bool] = Query(None, description="true — только тикеты с ответом"),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+    include_archived: bool = Query(False, description="true — вместе с архивом старых отвеченных тикетов"),
+    ticket_service: TicketService = Depends(get_read_ticket_service),
+    role: UserRole = Depends(require_operator_or_admin),
+):
+    """Выгрузка тикетов в CSV или XLSX (только ADMIN и OPERATOR).
+
+    Файл отдаётся потоком по мере чтения из БД, поэтому размер выгрузки не ограничен.
+    """
+    return StreamingResponse(
+        ticket_service.export_tickets(
+            format,
+            priority=priority,
+            awaits_response=awaits_response,
+            answered=answered,
+            created_from=created_from,
+            created_to=created_to,
+            include_archived=include_archived,
+        ),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename("tickets", format)}"'},
+    )
+
+
+@router.get("/search", response_model=TicketSearchResponse)
+async def search_tickets(
+    q: str = Query(..., min_length=2, max_length=200, description="Поисковый запрос (синтаксис websearch)"),
+    priority: Optional[TicketPriority] = Query(None),
+    awaits_response: Optional[bool] = Query(None),
+    created_from: Optional[datetime] = Query(None),
+    created_to: Optional[datetime] = Query(None),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    include_archived: bool = Query(False, description="true — вместе с архивом старых отвеченных тикетов"),
+    ticket_service: TicketService = Depends(get_read_ticket_service),
+    role: UserRole = Depends(require_operator_or_admin),
+):
+    """Полнотекстовый поиск по тикетам (только ADMIN и OPERATOR)"""
+    return await ticket_service.search_tickets(
+        q,
+        priority=priority,
+        awaits_response=awaits_response,
+        created_from=created_from,
+        created_to=created_to,
+        skip=skip,
+        limit=limit,
+        include_archived=include_archived,
+    )
 
 
 @router.patch("/{ticket_id}/response", response_model=TicketResponse)
@@ -63,35 +273,57 @@ async def add_ticket_response(
     response_in: TicketUpdateResponse,
     ticket_service: TicketService = Depends(get_ticket_service),
     role: UserRole = Depends(require_operator_or_admin),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """Добавить ответ поддержки к тикету (только ADMIN и OPERATOR)"""
-    updated_ticket = await ticket_service.update_ticket_response(ticket_id, response_in)
+    updated_ticket = await ticket_service.update_ticket_response(ticket_id, response_in, operator_id=current_user.id)
     if not updated_ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
+    await read_router.mark_write(current_user.email)
     return updated_ticket
 
 
-@router.get("/{ticket_id}", response_model=TicketResponse)
+@router.get("/{ticket_id}/similar", response_model=SimilarTicketsResponse)
+async def get_similar_tickets(
+    ticket_id: int,
+    limit: int = Query(5, ge=1, le=50),
+    ticket_service: TicketService = Depends(get_read_ticket_service),
+    role: UserRole = Depends(require_operator_or_admin),
+):
+    """Похожие ранее отвеченные тикеты для подготовки ответа (только ADMIN и OPERATOR)"""
+    similar = await ticket_service.get_similar_tickets(ticket_id, limit=limit)
+    if similar is None:
+        raise HTTPException(status_code=404, detail="Ticket not found")
+    return similar
+
+
+@router.get("/{ticket_id}/draft", response_model=TicketDraftResponse)
+async def get_ticket_draft(
+    ticket_id: int,
+    ticket_service: TicketService = Depends(get_read_ticket_service),
+    role: UserRole = Depends(require_operator_or_admin),
+):
+    """Черновик ответа на тикет (только ADMIN и OPERATOR)"""
+    draft = await ticket_service.get_ticket_draft(ticket_id)
+    if not draft:
+        raise HTTPException(status_code=404, detail="Draft not found")
+    return draft
+
+
+@router.get(
+    "/{ticket_id}",
+    response_model=TicketResponse,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "Тикет не изменился (If-None-Match)"}},
+)
 async def get_ticket(
     ticket_id: int,
-    ticket_service: TicketService = Depends(get_ticket_service),
+    if_none_match: Optional[str] = Header(None),
+    ticket_service: TicketService = Depends(get_read_ticket_service),
     current_user_id: int = Depends(get_current_user_id),
 ):
     """Получить тикет по ID (только свой)"""
-    ticket = await ticket_service.get_ticket(ticket_id, user_id=current_user_id)
+    ticket = await ticket_service.get_ticket_body(ticket_id, user_id=current_user_id, if_none_match=if_none_match)
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
-    return ticket
+    return conditional_response(ticket, "ticket")
 
-
-@router.get("/", response_model=TicketListResponse)
-async def get_my_tickets(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(10, ge=1, le=100),
-    ticket_service: TicketService = Depends(get_ticket_service),
-    current_user_id: int = Depends(get_current_user_id),
-):
-    """Получить список моих тикетов"""
-    return await ticket_service.get_user_tickets(
-        user_id=current_user_id, skip=skip, limit=limit
-    )
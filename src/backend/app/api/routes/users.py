@@ -1,10 +1,12 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 
-from app.schemas.user import UserCreate, UserUpdate, UserResponse, UsersListResponse
+from app.schemas.user import CurrentUser, UserCreate, UserUpdate, UserResponse, UsersListResponse
 
 from app.services.user import UserService
 
-from app.api.deps import get_current_user_id, get_user_service, get_current_user_role
+from app.api.deps import get_current_user, get_user_service, get_read_user_service
 
 from app.core.enums import UserRole
 
@@ -15,14 +17,21 @@ router = APIRouter(prefix="/users", tags=["Users"])
 async def get_all_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
-    user_service: UserService = Depends(get_user_service)
+    cursor: Optional[str] = Query(None, description="Курсор next_cursor из предыдущей страницы"),
+    with_total: bool = Query(True, description="false — не считать total, использовать has_more"),
+    user_service: UserService = Depends(get_read_user_service)
 ):
-    return await user_service.get_all_users(skip=skip, limit=limit)
+    try:
+        return await user_service.get_all_users(
+            skip=skip, limit=limit, cursor=cursor, with_total=with_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
-    user_service: UserService = Depends(get_user_service)
+    user_service: UserService = Depends(get_read_user_service)
 ):
     user = await user_service.get_user(user_id)
     if not user:
@@ -44,13 +53,12 @@ async def update_user(
     user_id: int,
     user_in: UserUpdate,
     user_service: UserService = Depends(get_user_service),
-    current_user_id: int = Depends(get_current_user_id),
-    current_role: UserRole = Depends(get_current_user_role)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    if current_role != UserRole.ADMIN and user_id != current_user_id:
+    if current_user.role != UserRole.ADMIN and user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    if current_role != UserRole.ADMIN and user_in.role is not None:
+    if current_user.role != UserRole.ADMIN and user_in.role is not None:
         raise HTTPException(status_code=403, detail="Cannot change role")
     
     user = await user_service.update_user(user_id, user_in)
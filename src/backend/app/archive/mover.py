@@ -0,0 +1,137 @@
+"""Фоновый перенос отвеченных тикетов в архив (tickets -> tickets_archive).
+
+Тикет переносится, если на него ответили (awaits_response = false) и он не
+менялся ARCHIVE_AFTER_DAYS. Порции берутся через FOR UPDATE SKIP LOCKED,
+поэтому перенос может работать в каждом процессе API и/или отдельно:
+
+    python -m app.archive.mover [--once]
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram, start_metrics_server
+from app.db.session import async_session_maker, create_engine_from_settings
+from app.repositories.ticket import TicketRepository
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_MOVED = Counter("archive_moved_tickets_total", "Tickets moved from tickets to tickets_archive")
+ARCHIVE_BATCH_SECONDS = Histogram(
+    "archive_batch_seconds",
+    "Time to move one batch of tickets to the archive",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+class ArchiveMover:
+    def __init__(
+        self,
+        session_maker: async_sessionmaker,
+        archive_after: timedelta,
+        batch_size: int = 1000,
+        interval_seconds: float = 300,
+    ):
+        self.session_maker = session_maker
+        self.archive_after = archive_after
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self) -> int:
+        """Переносит всё, что старше срока, порциями по batch_size; возвращает число тикетов"""
+        cutoff = datetime.now(timezone.utc) - self.archive_after
+        moved = 0
+        while True:
+            started = time.perf_counter()
+            async with self.session_maker() as session:
+                count = await TicketRepository(session).archive_batch(cutoff, self.batch_size)
+            ARCHIVE_BATCH_SECONDS.observe(time.perf_counter() - started)
+            ARCHIVE_MOVED.inc(count)
+            moved += count
+            # Неполная порция: кандидатов больше нет или остальные заняты другим процессом
+            if count < self.batch_size:
+                return moved
+
+    async def run(self) -> None:
+        while True:
+            try:
+                moved = await self.run_once()
+                if moved:
+                    logger.info("Archived %d tickets", moved)
+            except Exception:
+                logger.exception("Archive pass failed")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Прерывает проход; незавершённая порция откатывается целиком"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+
+archive_mover = ArchiveMover(
+    async_session_maker,
+    archive_after=timedelta(days=settings.ARCHIVE_AFTER_DAYS),
+    batch_size=settings.ARCHIVE_BATCH_SIZE,
+    interval_seconds=settings.ARCHIVE_INTERVAL_SECONDS,
+)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--once", action="store_true", help="один проход и выход")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    engine = create_engine_from_settings(settings.DATABASE_URL, name="archive", pool_size=1, max_overflow=0)
+    mover = ArchiveMover(
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+        archive_after=timedelta(days=settings.ARCHIVE_AFTER_DAYS),
+        batch_size=settings.ARCHIVE_BATCH_SIZE,
+        interval_seconds=settings.ARCHIVE_INTERVAL_SECONDS,
+    )
+    if args.once:
+        try:
+            logger.info("Archived %d tickets", await mover.run_once())
+        finally:
+            await engine.dispose()
+        return
+
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    metrics_server: Optional[asyncio.AbstractServer] = None
+    if settings.ARCHIVE_METRICS_PORT:
+        metrics_server = await start_metrics_server(settings.ARCHIVE_METRICS_PORT)
+    mover.start()
+    logger.info(
+        "Archive mover started: after=%s days, batch=%d, interval=%ss",
+        settings.ARCHIVE_AFTER_DAYS, settings.ARCHIVE_BATCH_SIZE, settings.ARCHIVE_INTERVAL_SECONDS,
+    )
+    try:
+        await stopping.wait()
+    finally:
+        await mover.stop()
+        if metrics_server is not None:
+            metrics_server.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""Профиль импорта: самые тяжёлые модули при холодном старте.
+
+    python -m app.cli.import_profile [app.main] [--top 25] [--sort self|cumulative] [--prefix app.]
+
+Модуль импортируется в новом интерпретаторе с python -X importtime, так что
+уже загруженные модули этого процесса не искажают результат. Печатает модули
+с наибольшим собственным (self) или накопленным (cumulative, вместе с тем,
+что модуль импортировал сам) временем и общее время импорта.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def _run(code: list[str]) -> subprocess.CompletedProcess:
+    result = subprocess.run([sys.executable, *code], cwd=BACKEND_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(code)} failed:\n{result.stderr[-2000:]}")
+    return result
+
+
+def profile_imports(module: str) -> list[ImportRecord]:
+    """Все модули, загруженные импортом module, в порядке вывода -X importtime"""
+    records = []
+    for line in _run(["-X", "importtime", "-c", f"import {module}"]).stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        records.append(ImportRecord(
+            module=name.strip(),
+            self_us=int(self_us),
+            cumulative_us=int(cumulative_us),
+            depth=(len(name) - len(name.lstrip()) - 1) // 2,
+        ))
+    return records
+
+
+def cold_import_seconds(module: str) -> float:
+    """Время import module в новом интерпретаторе, без накладных расходов -X importtime"""
+    code = f"import time; started = time.perf_counter(); import {module}; print(time.perf_counter() - started)"
+    return float(_run(["-c", code]).stdout.strip())
+
+
+def heaviest(records: list[ImportRecord], top: int, sort: str, prefix: Optional[str] = None) -> list[ImportRecord]:
+    if prefix:
+        records = [record for record in records if record.module.startswith(prefix)]
+    key = (lambda record: record.self_us) if sort == "self" else (lambda record: record.cumulative_us)
+    return sorted(records, key=key, reverse=True)[:top]
+
+
+def print_profile(records: list[ImportRecord], top: int, sort: str, prefix: Optional[str] = None) -> None:
+    rows = heaviest(records, top, sort, prefix)
+    width = max([len("module")] + [len(record.module) for record in rows])
+    print(f"{'module'.ljust(width)}  {'self ms':>9}  {'cumulative ms':>13}")
+    for record in rows:
+        print(f"{record.module.ljust(width)}  {record.self_us / 1000:9.1f}  {record.cumulative_us / 1000:13.1f}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Show the heaviest modules imported by a cold import")
+    parser.add_argument("module", nargs="?", default="app.main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--sort", choices=("self", "cumulative"), default="self")
+    parser.add_argument("--prefix", help="only modules whose name starts with this, e.g. app.")
+    args = parser.parse_args(argv)
+
+    records = profile_imports(args.module)
+    print_profile(records, args.top, args.sort, args.prefix)
+    # Верхний уровень вывода — модули, импортированные напрямую из -c, в том числе site
+    total = sum(record.cumulative_us for record in records if record.depth == 0 and record.module == args.module)
+    print(f"\n{len(records)} modules, import {args.module}: {total / 1000:.0f} ms (with -X importtime overhead)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Импорт тикетов из файла NDJSON или JSON-массива тем же путём, что POST /tickets/bulk.
+
+    python -m app.cli.import_tickets tickets.ndjson --user-email admin@example.com
+"""
+import argparse
+import asyncio
+import sys
+import time
+from typing import AsyncIterator
+
+from app.core.config import settings
+from app.core.streaming import iter_json_records
+from app.db.session import async_session_maker, get_engine
+from app.repositories.ticket import TicketRepository
+from app.repositories.user import UserRepository
+from app.services.ticket import TicketService
+
+
+async def read_chunks(path: str, chunk_size: int = 1 << 16) -> AsyncIterator[bytes]:
+    with (sys.stdin.buffer if path == "-" else open(path, "rb")) as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+async def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Import tickets from NDJSON or a JSON array")
+    parser.add_argument("file", help="path to the file, - for stdin")
+    parser.add_argument("--user-email", required=True, help="author of rows without user_email")
+    parser.add_argument("--batch-size", type=int, default=settings.TICKETS_BULK_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    try:
+        async with async_session_maker() as session:
+            user_repo = UserRepository(session)
+            user_ids = await user_repo.get_ids_by_emails({args.user_email})
+            if args.user_email not in user_ids:
+                print(f"Unknown user: {args.user_email}", file=sys.stderr)
+                return 2
+
+            service = TicketService(TicketRepository(session), user_repo)
+            started = time.perf_counter()
+            result = await service.bulk_create_tickets(
+                iter_json_records(read_chunks(args.file)),
+                default_user_id=user_ids[args.user_email],
+                batch_size=args.batch_size,
+            )
+            elapsed = time.perf_counter() - started
+    finally:
+        await get_engine().dispose()
+
+    for error in result.errors:
+        print(f"row {error.row}: {error.error}", file=sys.stderr)
+    rows = result.created + result.failed
+    print(f"created {result.created}, failed {result.failed} in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):.0f} rows/s)")
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,89 @@
+"""Запуск API в production: миграции один раз, затем воркеры uvicorn.
+
+    python -m app.cli.serve [--workers 4] [--host 0.0.0.0] [--port 8000] [--no-migrate]
+
+alembic upgrade head выполняется в этом процессе до запуска воркеров, воркеры
+стартуют с DB_CREATE_ALL=false и схему не трогают. Экземпляры, запущенные
+одновременно, применяют миграции по очереди (advisory lock в alembic/env.py).
+Упавший воркер перезапускает супервизор uvicorn. Каждый воркер после прогрева
+пишет в лог app.startup строку «Worker <pid> ready in ...» с длительностью фаз.
+"""
+import argparse
+import copy
+import logging
+import logging.config
+import os
+import sys
+import time
+from urllib.parse import urlparse
+
+import uvicorn
+from alembic import command
+from alembic.config import Config
+from uvicorn.config import LOGGING_CONFIG
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.serve")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def log_config() -> dict:
+    """Конфигурация логов uvicorn плюс логгеры app и alembic в тот же вывод"""
+    config = copy.deepcopy(LOGGING_CONFIG)
+    for name in ("app", "alembic"):
+        config["loggers"][name] = {"handlers": ["default"], "level": "INFO", "propagate": False}
+    return config
+
+
+def migrate() -> None:
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run migrations once, then serve the API with uvicorn workers")
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS)
+    parser.add_argument(
+        "--no-migrate", action="store_true", help="schema is migrated elsewhere (e.g. a separate release job)"
+    )
+    args = parser.parse_args(argv)
+
+    logging_config = log_config()
+    logging.config.dictConfig(logging_config)
+
+    if not args.no_migrate:
+        started = time.perf_counter()
+        migrate()
+        logger.info("Migrations applied in %.2fs", time.perf_counter() - started)
+
+    shared_cache_tier = settings.CACHE_ENABLED and urlparse(settings.CACHE_URL).scheme != "memory"
+    if args.workers > 1 and settings.read_database_urls and not shared_cache_tier:
+        logger.warning(
+            "Read replicas with %d workers and no networked cache: read-your-writes holds only within "
+            "the worker that took the write; set CACHE_URL=redis://... to share it",
+            args.workers,
+        )
+
+    # Воркеры наследуют окружение; при --workers 1 app.main импортируется в этом же процессе
+    os.environ["DB_CREATE_ALL"] = "false"
+    settings.DB_CREATE_ALL = False
+
+    uvicorn.run(
+        "app.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        log_config=logging_config,
+        timeout_graceful_shutdown=settings.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
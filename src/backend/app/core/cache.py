@@ -0,0 +1,405 @@
+import asyncio
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Hashable, Optional
+from urllib.parse import urlparse
+
+from sqlalchemy import DateTime, Enum, inspect
+
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_REQUESTS = Counter(
+    "response_cache_requests_total", "Serialized response cache lookups, by cache and result (hit, miss)"
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Shared cache lookups, by namespace and result (local_hit, remote_hit, miss)"
+)
+CACHE_COALESCED = Counter("cache_coalesced_total", "Lookups that waited for a load already running for the key")
+CACHE_ERRORS = Counter("cache_errors_total", "Failed calls to the networked cache tier, by operation")
+CACHE_SECONDS = Histogram(
+    "cache_operation_seconds",
+    "Shared cache latency: remote get and load from the database on a miss",
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+
+
+class TTLCache:
+    """Ограниченный LRU-кэш с временем жизни записей (в пределах одного процесса)"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        if self.maxsize <= 0 or ttl <= 0:
+            return
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def pop_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        for key in [key for key in self._data if predicate(key)]:
+            del self._data[key]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CurrentUserCache:
+    """Кэш текущего пользователя по subject токена.
+
+    Инвалидация локальна для процесса: в других воркерах запись живёт
+    не дольше AUTH_CACHE_TTL_SECONDS.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, claims_freshness: float):
+        self.claims_freshness = claims_freshness
+        self._users = TTLCache(maxsize, ttl)
+        # subject -> время последней инвалидации; нужно только в пределах окна свежести claims
+        self._invalidated_at = TTLCache(maxsize, claims_freshness)
+
+    def get(self, subject: str):
+        return self._users.get(subject)
+
+    def set(self, subject: str, user) -> None:
+        self._users.set(subject, user)
+
+    def invalidate(self, subject: str) -> None:
+        self._users.pop(subject)
+        self._invalidated_at.set(subject, time.time())
+
+    def claims_are_fresh(self, subject: str, issued_at: Optional[float]) -> bool:
+        """Можно ли доверять role/uid из токена без похода в БД"""
+        if issued_at is None or self.claims_freshness <= 0:
+            return False
+        if time.time() - issued_at > self.claims_freshness:
+            return False
+        invalidated_at = self._invalidated_at.get(subject)
+        return invalidated_at is None or issued_at > invalidated_at
+
+    def clear(self) -> None:
+        self._users.clear()
+        self._invalidated_at.clear()
+
+
+class ResponseCache:
+    """Кэш сериализованных ответов, разложенных по областям (scope).
+
+    ETag ответа включает версию данных области из row_counters, поэтому
+    после записи в другом процессе старые ответы просто перестают
+    запрашиваться; invalidate() освобождает память своего процесса сразу.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self._bodies = TTLCache(maxsize, ttl)
+
+    def get(self, scope: str, etag: str) -> Optional[bytes]:
+        body = self._bodies.get((scope, etag))
+        RESPONSE_CACHE_REQUESTS.inc(cache=self.name, result="miss" if body is None else "hit")
+        return body
+
+    def set(self, scope: str, etag: str, body: bytes) -> None:
+        self._bodies.set((scope, etag), body)
+
+    def invalidate(self, *scopes: str) -> None:
+        self._bodies.pop_where(lambda key: key[0] in scopes)
+
+    def clear(self) -> None:
+        self._bodies.clear()
+
+
+class CacheBackend(ABC):
+    """Сетевой уровень общего кэша: значения — байты, TTL задаётся на каждый ключ"""
+
+    async def close(self) -> None:
+        pass
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def add(self, key: str, value: bytes, ttl: float) -> None:
+        """Записывает значение, только если ключа нет (в том числе надгробия)"""
+
+    @abstractmethod
+    async def put(self, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis или совместимый сервер; client можно передать готовый (например, fakeredis)"""
+
+    def __init__(self, url: str, timeout: float = 0.1, client=None):
+        if client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError as e:
+                raise RuntimeError("redis:// cache requires the redis package") from e
+            client = redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self.client = client
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(key)
+
+    async def add(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(key, value, px=max(int(ttl * 1000), 1), nx=True)
+
+    async def put(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(key, value, px=max(int(ttl * 1000), 1))
+
+
+# Надгробие после инвалидации: пока оно живо, загруженное из БД не кэшируется,
+# иначе отстающая реплика вернула бы в кэш строку до записи
+_TOMBSTONE = object()
+_TOMBSTONE_BYTES = b"\x00"
+
+
+class SharedCache:
+    """Read-through кэш значений-dict из двух уровней: LRU в памяти процесса и
+    необязательный сетевой (Redis), общий для всех процессов.
+
+    Одновременные промахи по одному ключу в процессе ждут одну загрузку
+    (single-flight). Инвалидация с другого процесса видна через сетевой
+    уровень сразу, а через локальный — не позже local_ttl. Без сетевого
+    уровня значения живут только local_ttl: инвалидацию видит лишь
+    процесс, сделавший запись, а воркеров может быть несколько.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        prefix: str = "",
+        local_size: int = 10_000,
+        local_ttl: float = 5,
+        invalidation_hold: float = 5,
+        retry_seconds: float = 10,
+    ):
+        self.backend = backend
+        self.prefix = prefix
+        self.local_ttl = local_ttl
+        self.invalidation_hold = invalidation_hold
+        self.retry_seconds = retry_seconds
+        self._local = TTLCache(local_size, local_ttl)
+        self._loading: dict[str, asyncio.Future] = {}
+        # После ошибки сетевой уровень пропускается, чтобы не ждать таймаут на каждом запросе
+        self._backend_down_until = 0.0
+
+    def _backend_available(self) -> bool:
+        return self.backend is not None and time.monotonic() >= self._backend_down_until
+
+    def _backend_failed(self, operation: str, error: Exception) -> None:
+        CACHE_ERRORS.inc(operation=operation)
+        self._backend_down_until = time.monotonic() + self.retry_seconds
+        logger.warning("Cache backend %s failed, bypassing it for %ss: %s", operation, self.retry_seconds, error)
+
+    async def _remote_get(self, key: str) -> Any:
+        started = time.perf_counter()
+        try:
+            raw = await self.backend.get(self.prefix + key)
+        except Exception as e:
+            self._backend_failed("get", e)
+            return None
+        CACHE_SECONDS.observe(time.perf_counter() - started, operation="get")
+        if raw is None:
+            return None
+        return _TOMBSTONE if raw == _TOMBSTONE_BYTES else json.loads(raw)
+
+    async def get_or_load(
+        self, key: str, load: Callable[[], Awaitable[Optional[dict]]], ttl: float
+    ) -> Optional[dict]:
+        """Значение из кэша или из load(); None (нет строки) не кэшируется"""
+        namespace = key.partition(":")[0]
+        value = self._local.get(key)
+        if value is not None and value is not _TOMBSTONE:
+            CACHE_REQUESTS.inc(namespace=namespace, result="local_hit")
+            return value
+
+        loading = self._loading.get(key)
+        if loading is not None:
+            CACHE_COALESCED.inc(namespace=namespace)
+            try:
+                return await asyncio.shield(loading)
+            except asyncio.CancelledError:
+                # Прервали загружавший запрос, а не нас: загружаем сами
+                if not loading.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await self._lookup_or_load(key, namespace, load, ttl, tombstone=value is _TOMBSTONE)
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            if self._loading.get(key) is future:
+                del self._loading[key]
+        future.set_result(value)
+        return value
+
+    async def _lookup_or_load(
+        self, key: str, namespace: str, load: Callable[[], Awaitable[Optional[dict]]], ttl: float, tombstone: bool
+    ) -> Optional[dict]:
+        if not tombstone and self._backend_available():
+            value = await self._remote_get(key)
+            if value is _TOMBSTONE:
+                tombstone = True
+            elif value is not None:
+                CACHE_REQUESTS.inc(namespace=namespace, result="remote_hit")
+                self._local.set(key, value, min(ttl, self.local_ttl))
+                return value
+        CACHE_REQUESTS.inc(namespace=namespace, result="miss")
+        started = time.perf_counter()
+        value = await load()
+        CACHE_SECONDS.observe(time.perf_counter() - started, operation="load")
+        if value is not None and not tombstone:
+            await self._fill(key, value, ttl)
+        return value
+
+    async def _fill(self, key: str, value: dict, ttl: float) -> None:
+        if self._local.get(key) is _TOMBSTONE:
+            return
+        self._local.set(key, value, min(ttl, self.local_ttl))
+        if self._backend_available():
+            try:
+                await self.backend.add(self.prefix + key, json.dumps(value).encode(), ttl)
+            except Exception as e:
+                self._backend_failed("set", e)
+
+    async def put_flag(self, key: str, ttl: float) -> None:
+        """Флаг на ttl секунд в сетевом уровне: его видят все процессы; без сетевого уровня ничего не делает"""
+        if not self._backend_available():
+            return
+        try:
+            await self.backend.put(self.prefix + key, b"1", ttl)
+        except Exception as e:
+            self._backend_failed("set", e)
+
+    async def has_flag(self, key: str) -> bool:
+        if not self._backend_available():
+            return False
+        return await self._remote_get(key) is not None
+
+    async def invalidate(self, *keys: str) -> None:
+        """Вызывается после commit записи"""
+        for key in keys:
+            self._local.set(key, _TOMBSTONE, self.invalidation_hold)
+        if not keys or not self._backend_available():
+            return
+        try:
+            for key in keys:
+                await self.backend.put(self.prefix + key, _TOMBSTONE_BYTES, self.invalidation_hold)
+        except Exception as e:
+            self._backend_failed("invalidate", e)
+
+    def clear_local(self) -> None:
+        self._local.clear()
+
+    async def close(self) -> None:
+        if self.backend is not None:
+            await self.backend.close()
+
+
+def create_cache_backend(url: str) -> Optional[CacheBackend]:
+    """Сетевой уровень по схеме URL: memory:// — без него, redis://, rediss://, unix://"""
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return None
+    if scheme in ("redis", "rediss", "unix"):
+        return RedisCacheBackend(url, timeout=settings.CACHE_TIMEOUT_SECONDS)
+    raise ValueError(f"Unsupported cache URL scheme: {scheme}")
+
+
+class ModelCodec:
+    """Колонки ORM-объекта <-> dict, пригодный для JSON; отложенные и исключённые колонки не сохраняются"""
+
+    def __init__(self, model, exclude: tuple[str, ...] = ()):
+        self.model = model
+        self._datetimes: set[str] = set()
+        self._enums: dict[str, type] = {}
+        self.keys: list[str] = []
+        for attr in inspect(model).column_attrs:
+            if attr.deferred or attr.key in exclude:
+                continue
+            self.keys.append(attr.key)
+            column_type = attr.columns[0].type
+            if isinstance(column_type, DateTime):
+                self._datetimes.add(attr.key)
+            elif isinstance(column_type, Enum) and column_type.enum_class is not None:
+                self._enums[attr.key] = column_type.enum_class
+
+    @property
+    def columns(self) -> list:
+        """Атрибуты модели для select(): загружается только то, что попадёт в кэш"""
+        return [getattr(self.model, key) for key in self.keys]
+
+    def dump(self, obj) -> dict:
+        data = {key: getattr(obj, key) for key in self.keys}
+        for key in self._datetimes:
+            if data[key] is not None:
+                data[key] = data[key].isoformat()
+        return data
+
+    def load(self, data: dict):
+        """Новый объект вне сессии: его можно читать, но не сохранять"""
+        values = dict(data)
+        for key in self._datetimes:
+            if values.get(key) is not None:
+                values[key] = datetime.fromisoformat(values[key])
+        for key, enum_class in self._enums.items():
+            if values.get(key) is not None:
+                values[key] = enum_class(values[key])
+        return self.model(**values)
+
+
+current_user_cache = CurrentUserCache(
+    maxsize=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+    claims_freshness=settings.AUTH_CLAIMS_FRESHNESS_SECONDS,
+)
+
+ticket_page_cache = ResponseCache(
+    "ticket_pages",
+    maxsize=settings.TICKET_PAGE_CACHE_SIZE,
+    ttl=settings.TICKET_PAGE_CACHE_TTL_SECONDS,
+)
+
+shared_cache = SharedCache(
+    create_cache_backend(settings.CACHE_URL) if settings.CACHE_ENABLED else None,
+    prefix=settings.CACHE_PREFIX,
+    local_size=settings.CACHE_LOCAL_SIZE if settings.CACHE_ENABLED else 0,
+    local_ttl=settings.CACHE_LOCAL_TTL_SECONDS,
+    invalidation_hold=settings.CACHE_INVALIDATION_HOLD_SECONDS,
+)
@@ -1,5 +1,7 @@
 from pydantic_settings import BaseSettings
 
+from app.core.enums import TotalStrategy, SimilarityEncoderKind, EventsBackend
+
 
 class Settings(BaseSettings):
     POSTGRES_USER: str
@@ -10,6 +12,143 @@ class Settings(BaseSettings):
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    LIST_TOTAL_STRATEGY: TotalStrategy = TotalStrategy.EXACT
+
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    AUTH_CACHE_MAX_SIZE: int = 10_000
+    # Сколько секунд после выдачи токена доверять role/uid из его claims (0 — не доверять)
+    AUTH_CLAIMS_FRESHNESS_SECONDS: int = 60
+
+    # Параметры Argon2; при их изменении хеш пересчитывается при следующем логине
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_LIMIT: int = 32
+
+    # Лог медленных запросов (logger app.slow_requests) со списком SQL; 0 — порог выключен
+    SLOW_REQUEST_SECONDS: float = 1.0
+    SLOW_REQUEST_QUERIES: int = 20
+    SLOW_REQUEST_MAX_STATEMENTS: int = 50
+
+    # Запуск в production: python -m app.cli.serve применяет миграции один раз и запускает воркеры
+    # uvicorn с DB_CREATE_ALL=false. create_all при старте — для разработки и бенчмарков без миграций
+    DB_CREATE_ALL: bool = True
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 8000
+    SERVER_WORKERS: int = 1
+    # Потоки /tickets/stream не заканчиваются сами: не ждать их при остановке дольше
+    SERVER_GRACEFUL_SHUTDOWN_SECONDS: int = 5
+    # Сколько соединений пула открыть до приёма запросов (-1 — DB_POOL_SIZE, 0 — не прогревать)
+    STARTUP_WARM_CONNECTIONS: int = -1
+    # Сколько ждать SELECT 1 в /health/ready
+    READINESS_DB_TIMEOUT_SECONDS: float = 2
+
+    # Пул соединений на каждый процесс (uvicorn worker)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    # Режим для PgBouncer (pool_mode=transaction): без кэша prepared statements
+    DB_PGBOUNCER_MODE: bool = False
+
+    # Реплики для чтения через запятую; пусто — всё читается с primary
+    READ_DATABASE_URLS: str = ""
+    # Сколько секунд после записи чтения пользователя идут в primary. Между воркерами отметка
+    # о записи передаётся через сетевой уровень кэша (CACHE_URL=redis://...)
+    READ_YOUR_WRITES_SECONDS: int = 5
+    # Пауза перед повторной попыткой реплики, на которой был сбой
+    READ_REPLICA_RETRY_SECONDS: int = 10
+
+    # Массовая загрузка тикетов: строк в одном INSERT и сколько ошибок вернуть в ответе
+    TICKETS_BULK_BATCH_SIZE: int = 1000
+    TICKETS_BULK_MAX_ERRORS: int = 1000
+
+    # Кэш сериализованных страниц списков тикетов в памяти процесса (0 — выключен).
+    # Страница отдаётся из кэша, только пока версия списка в row_counters не изменилась
+    TICKET_PAGE_CACHE_SIZE: int = 1000
+    TICKET_PAGE_CACHE_TTL_SECONDS: int = 60
+
+    # Общий кэш чтений репозиториев (пользователь и тикет по id/email): LRU в памяти процесса
+    # и, для CACHE_URL=redis://..., общий для всех процессов Redis
+    CACHE_ENABLED: bool = True
+    CACHE_URL: str = "memory://"
+    CACHE_PREFIX: str = "support:"
+    CACHE_TIMEOUT_SECONDS: float = 0.1
+    CACHE_LOCAL_SIZE: int = 10_000
+    # Локальная копия живёт не дольше этого (и с Redis, и без): столько другой процесс может видеть старое значение
+    CACHE_LOCAL_TTL_SECONDS: float = 5
+    CACHE_USER_TTL_SECONDS: float = 300
+    CACHE_TICKET_TTL_SECONDS: float = 60
+    # После записи ключ столько не кэшируется: не меньше отставания реплик (READ_YOUR_WRITES_SECONDS)
+    CACHE_INVALIDATION_HOLD_SECONDS: float = 5
+
+    # Очередь операторов (POST /tickets/claim): на сколько секунд тикет закрепляется за оператором
+    TICKET_CLAIM_TTL_SECONDS: int = 900
+
+    # Выгрузки CSV/XLSX: строк за одну выборку из серверного курсора
+    EXPORT_BATCH_SIZE: int = 2000
+
+    # Воркер входящей почты (python -m app.ingest.worker)
+    INGEST_BROKER_URL: str = "memory://"
+    INGEST_QUEUE: str = "mail"
+    INGEST_CONCURRENCY: int = 2
+    INGEST_BATCH_SIZE: int = 200
+    # Сколько неподтверждённых сообщений воркер держит у себя
+    INGEST_PREFETCH: int = 1000
+    INGEST_MAX_ATTEMPTS: int = 5
+    # Redis Streams: сообщения упавшего воркера, не подтверждённые столько секунд, забирают другие
+    INGEST_VISIBILITY_TIMEOUT_SECONDS: float = 300
+    # Потолок скорости записи в БД, строк в секунду (0 — без ограничения)
+    INGEST_MAX_ROWS_PER_SECOND: float = 0
+    INGEST_METRICS_PORT: int = 9100
+
+    # Черновики ответов: задачи хранятся в ticket_drafts, исполнители — в каждом процессе API
+    # (DRAFT_WORKER_IN_API) или отдельно: python -m app.drafts.worker
+    DRAFTS_ENABLED: bool = True
+    DRAFT_WORKER_IN_API: bool = True
+    # "stub" или путь к классу Drafter: "package.module:ClassName"
+    DRAFTER: str = "stub"
+    DRAFT_CONCURRENCY: int = 2
+    DRAFT_TIMEOUT_SECONDS: float = 60
+    DRAFT_POLL_SECONDS: float = 2
+    DRAFT_METRICS_PORT: int = 9101
+
+    # Поток событий для операторов (/tickets/stream); с SQLite postgres заменяется на memory
+    EVENTS_BACKEND: EventsBackend = EventsBackend.POSTGRES
+    # LISTEN не работает через PgBouncer в transaction-режиме: тогда нужен прямой адрес Postgres
+    EVENTS_DATABASE_URL: str = ""
+    EVENTS_CHANNEL: str = "ticket_events"
+    # Сколько событий ждёт отправки одному клиенту; медленный клиент отключается
+    EVENTS_BUFFER_SIZE: int = 100
+    EVENTS_HEARTBEAT_SECONDS: float = 15
+
+    # Поиск похожих обращений (индекс в памяти каждого процесса)
+    SIMILARITY_ENABLED: bool = True
+    SIMILARITY_ENCODER: SimilarityEncoderKind = SimilarityEncoderKind.HASHING
+    SIMILARITY_MODEL_PATH: str = ""
+    SIMILARITY_DIM: int = 384
+    # До скольки векторов искать полным перебором; выше — IVF-индекс
+    SIMILARITY_BRUTE_FORCE_BELOW: int = 20_000
+    SIMILARITY_NPROBE: int = 8
+    # Как часто подтягивать изменения, сделанные другими процессами
+    SIMILARITY_SYNC_SECONDS: int = 30
+
+    # Архив: отвеченные тикеты, не менявшиеся ARCHIVE_AFTER_DAYS, переносятся из tickets в tickets_archive.
+    # Перенос работает в каждом процессе API (ARCHIVE_MOVER_IN_API) или отдельно: python -m app.archive.mover
+    ARCHIVE_ENABLED: bool = True
+    ARCHIVE_MOVER_IN_API: bool = True
+    ARCHIVE_AFTER_DAYS: float = 90
+    ARCHIVE_BATCH_SIZE: int = 1000
+    ARCHIVE_INTERVAL_SECONDS: float = 300
+    ARCHIVE_METRICS_PORT: int = 9102
+
+    @property
+    def read_database_urls(self) -> list[str]:
+        return [url.strip() for url in self.READ_DATABASE_URLS.split(",") if url.strip()]
+
     class Config:
         env_file = ".env"
 
@@ -8,4 +8,53 @@ class TicketPriority(StrEnum):
 class UserRole(StrEnum):
     USER = "user"
     OPERATOR = "operator"
-    ADMIN = "admin"
\ No newline at end of file
+    ADMIN = "admin"
+
+class TotalStrategy(StrEnum):
+    """Способ подсчёта total для списков"""
+    EXACT = "exact"          # SELECT count(*)
+    ESTIMATE = "estimate"    # оценка планировщика (pg_class.reltuples / EXPLAIN)
+    COUNTER = "counter"      # таблица row_counters, обновляется при create/delete
+    NONE = "none"            # total не считается, клиент смотрит на has_more
+
+class TicketSort(StrEnum):
+    """Порядок списка тикетов для операторов"""
+    NEWEST = "newest"        # новые первыми
+    OLDEST = "oldest"        # старые первыми
+    PRIORITY = "priority"    # срочные первыми, внутри приоритета — старые первыми
+
+class DraftStatus(StrEnum):
+    """Состояние черновика ответа; PENDING и RUNNING — задача ещё в очереди"""
+    PENDING = "pending"
+    RUNNING = "running"
+    READY = "ready"
+    FAILED = "failed"
+    CANCELLED = "cancelled"   # на тикет ответили раньше, чем черновик был готов
+
+class ExportFormat(StrEnum):
+    CSV = "csv"
+    XLSX = "xlsx"
+
+class StatsDimension(StrEnum):
+    """Разрез предрасчитанной статистики ответов"""
+    DAY = "day"              # key — дата ответа (UTC), YYYY-MM-DD
+    OPERATOR = "operator"    # key — id оператора
+    PRIORITY = "priority"    # key — приоритет тикета
+
+class TicketEventType(StrEnum):
+    """События для операторов в /tickets/stream"""
+    TICKET_CREATED = "ticket.created"
+    TICKETS_IMPORTED = "tickets.imported"   # порция из массовой загрузки или почты, без деталей по тикетам
+    TICKET_ANSWERED = "ticket.answered"
+    TICKET_CLAIMED = "ticket.claimed"
+    DRAFT_READY = "draft.ready"
+
+class EventsBackend(StrEnum):
+    """Как события доходят до подписчиков"""
+    MEMORY = "memory"        # только подписчики этого процесса
+    POSTGRES = "postgres"    # LISTEN/NOTIFY: все процессы API и воркеры
+
+class SimilarityEncoderKind(StrEnum):
+    """Кодировщик текста для поиска похожих обращений"""
+    HASHING = "hashing"                              # TF-IDF на хешированных признаках, без моделей
+    SENTENCE_TRANSFORMERS = "sentence-transformers"  # локальная модель из SIMILARITY_MODEL_PATH
\ No newline at end of file
@@ -0,0 +1,45 @@
+"""Условные GET: слабые ETag и ответ 304 без сериализации тела"""
+import hashlib
+from typing import Any, NamedTuple, Optional
+
+from fastapi import status
+from fastapi.responses import Response
+
+from app.core.metrics import Counter
+
+NOT_MODIFIED = Counter("http_not_modified_total", "Conditional GETs answered with 304, by endpoint")
+
+
+class CachedBody(NamedTuple):
+    etag: str
+    # None — у клиента актуальная версия, тело не сериализовалось
+    body: Optional[bytes]
+
+
+def weak_etag(*parts: Any) -> str:
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _opaque_tag(etag: str) -> str:
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Слабое сравнение, как требует If-None-Match (RFC 9110, 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tag = _opaque_tag(etag)
+    return any(_opaque_tag(candidate) == tag for candidate in if_none_match.split(","))
+
+
+def conditional_response(cached: CachedBody, endpoint: str) -> Response:
+    # no-cache: клиент может хранить ответ, но перед использованием переспрашивает с If-None-Match
+    headers = {"ETag": cached.etag, "Cache-Control": "private, no-cache"}
+    if cached.body is None:
+        NOT_MODIFIED.inc(endpoint=endpoint)
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(cached.body, media_type="application/json", headers=headers)
@@ -0,0 +1,170 @@
+"""Потоковая выгрузка строк в CSV и XLSX.
+
+Строки приходят асинхронным итератором (обычно серверный курсор БД), ответ
+отдаётся кусками по мере чтения, поэтому память не зависит от объёма выгрузки.
+XLSX собирается вручную: zipfile пишет в поток без seek (data descriptor),
+лист пишется строками с inline-строками, без sharedStrings.
+"""
+import csv
+import io
+import re
+import zipfile
+from datetime import datetime
+from typing import Any, AsyncIterator, Iterable, Sequence
+from xml.sax.saxutils import escape
+
+from app.core.enums import ExportFormat
+
+# Сколько байт копить перед отправкой очередного куска ответа
+CHUNK_BYTES = 64 * 1024
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.XLSX: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+# Символы, недопустимые в XML 1.0
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+# Начало ячейки, которое Excel и LibreOffice читают как формулу
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def export_filename(prefix: str, export_format: ExportFormat) -> str:
+    return f"{prefix}-{datetime.now():%Y%m%d-%H%M%S}.{export_format.value}"
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ", timespec="seconds")
+    if isinstance(value, bool):
+        return "да" if value else "нет"
+    return str(value)
+
+
+def _csv_cell(value: Any) -> str:
+    """Текст из писем клиентов (тема, описание, ответ) не должен стать формулой при открытии в Excel"""
+    text = _text(value)
+    if isinstance(value, str) and text.startswith(_FORMULA_PREFIXES):
+        return "'" + text
+    return text
+
+
+async def iter_csv(header: Sequence[str], rows: AsyncIterator[Sequence[Any]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM: иначе Excel открывает UTF-8 с кириллицей как cp1251
+    buffer.write("\ufeff")
+    writer.writerow(header)
+    async for row in rows:
+        writer.writerow([_csv_cell(value) for value in row])
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Файл без seek для zipfile: записанное забирается кусками через drain()"""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+_XLSX_STATIC = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="{sheet}" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+
+def _xlsx_row(values: Iterable[Any]) -> str:
+    cells = []
+    for value in values:
+        if value is None:
+            cells.append("<c/>")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            cells.append(f'<c t="n"><v>{value}</v></c>')
+        else:
+            text = escape(_XML_ILLEGAL.sub("", _text(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return "<row>" + "".join(cells) + "</row>"
+
+
+async def iter_xlsx(
+    header: Sequence[str], rows: AsyncIterator[Sequence[Any]], sheet: str = "Sheet1"
+) -> AsyncIterator[bytes]:
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC.items():
+            archive.writestr(name, content.replace("{sheet}", escape(sheet)))
+        # force_zip64: размер листа заранее неизвестен и может превысить 4 ГБ
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as worksheet:
+            worksheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            worksheet.write(_xlsx_row(header).encode())
+            async for row in rows:
+                worksheet.write(_xlsx_row(row).encode())
+                if sink.size >= CHUNK_BYTES:
+                    yield sink.drain()
+            worksheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+def iter_export(
+    export_format: ExportFormat, header: Sequence[str], rows: AsyncIterator[Sequence[Any]], sheet: str = "Sheet1"
+) -> AsyncIterator[bytes]:
+    if export_format == ExportFormat.XLSX:
+        return iter_xlsx(header, rows, sheet=sheet)
+    return iter_csv(header, rows)
@@ -0,0 +1,50 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Tuple
+
+
+def encode_cursor(*values: Any) -> str:
+    """Упаковывает ключ сортировки последней строки в непрозрачный курсор"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    """Распаковывает курсор, ValueError если он повреждён"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if not isinstance(payload, list):
+        raise ValueError("Invalid cursor")
+    return payload
+
+
+def decode_ticket_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Курсор тикетов: (created_at, id)"""
+    try:
+        created_at, ticket_id = decode_cursor(cursor)
+        return datetime.fromisoformat(created_at), int(ticket_id)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def decode_ticket_priority_cursor(cursor: str) -> Tuple[int, datetime, int]:
+    """Курсор тикетов при сортировке по срочности: (rank, created_at, id)"""
+    try:
+        rank, created_at, ticket_id = decode_cursor(cursor)
+        return int(rank), datetime.fromisoformat(created_at), int(ticket_id)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def decode_user_cursor(cursor: str) -> int:
+    """Курсор пользователей: (id,)"""
+    try:
+        (user_id,) = decode_cursor(cursor)
+        return int(user_id)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
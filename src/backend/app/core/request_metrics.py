@@ -0,0 +1,171 @@
+"""Метрики HTTP-запросов: время по маршрутам, SQL, ожидание пула и Argon2 на запрос.
+
+RequestMetricsMiddleware кладёт RequestStats в contextvar; события engine
+(instrument_engine), пул соединений и пул хеширования паролей дописывают в
+него свои замеры. Запрос дольше SLOW_REQUEST_SECONDS или с числом SQL больше
+SLOW_REQUEST_QUERIES пишется в лог app.slow_requests вместе со списком запросов.
+"""
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.metrics import Counter, Histogram
+
+slow_request_logger = logging.getLogger("app.slow_requests")
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by method, route and status (SSE streams are not counted)",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+HTTP_REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request, by method and route",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+HTTP_REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL per request, by method and route",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+HTTP_REQUEST_POOL_WAIT = Histogram(
+    "http_request_pool_wait_seconds",
+    "Time spent waiting for pooled connections per request, by method and route",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+HTTP_REQUEST_PASSWORD_HASH = Histogram(
+    "http_request_password_hash_seconds",
+    "Argon2 time (queue and hashing) per request that hashed or verified a password, by method and route",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+SLOW_REQUESTS = Counter(
+    "http_slow_requests_total", "Requests over the latency or query budget, by route and reason"
+)
+
+
+@dataclass
+class RequestStats:
+    max_statements: int = 50
+    queries: int = 0
+    query_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    password_hash_seconds: float = 0.0
+    # (секунды, SQL) первых max_statements запросов: для лога медленных запросов
+    statements: list[tuple[float, str]] = field(default_factory=list)
+
+    def add_query(self, statement: str, seconds: float) -> None:
+        self.queries += 1
+        self.query_seconds += seconds
+        if len(self.statements) < self.max_statements:
+            self.statements.append((seconds, statement))
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Замеры текущего HTTP-запроса; None вне запроса (воркеры, фоновые задачи)"""
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._request_query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "_request_query_started", None)
+    if stats is not None and started is not None:
+        stats.add_query(statement, time.perf_counter() - started)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Считает SQL-запросы engine в RequestStats текущего запроса"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _is_event_stream(headers) -> bool:
+    return any(name == b"content-type" and value.startswith(b"text/event-stream") for name, value in headers)
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware без BaseHTTPMiddleware: не буферизует потоковые ответы"""
+
+    def __init__(self, app, slow_seconds: float = 1.0, slow_queries: int = 20, max_statements: int = 50):
+        self.app = app
+        self.slow_seconds = slow_seconds
+        self.slow_queries = slow_queries
+        self.max_statements = max_statements
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(max_statements=self.max_statements)
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+        event_stream = False
+
+        async def send_with_status(message):
+            nonlocal status_code, event_stream
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                event_stream = _is_event_stream(message.get("headers", ()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current.reset(token)
+            # Поток событий живёт, пока оператор не закроет вкладку: это не время ответа
+            if not event_stream:
+                self._record(scope, status_code, time.perf_counter() - started, stats)
+
+    def _record(self, scope, status_code: int, seconds: float, stats: RequestStats) -> None:
+        route = scope.get("route")
+        route_path = getattr(route, "path", None) or "unmatched"
+        method = scope["method"]
+        HTTP_REQUEST_SECONDS.observe(seconds, method=method, route=route_path, status=status_code)
+        HTTP_REQUEST_QUERIES.observe(stats.queries, method=method, route=route_path)
+        HTTP_REQUEST_DB_SECONDS.observe(stats.query_seconds, method=method, route=route_path)
+        HTTP_REQUEST_POOL_WAIT.observe(stats.pool_wait_seconds, method=method, route=route_path)
+        if stats.password_hash_seconds:
+            HTTP_REQUEST_PASSWORD_HASH.observe(stats.password_hash_seconds, method=method, route=route_path)
+
+        reasons = []
+        if self.slow_seconds and seconds > self.slow_seconds:
+            reasons.append("latency")
+        if self.slow_queries and stats.queries > self.slow_queries:
+            reasons.append("queries")
+        if not reasons:
+            return
+        for reason in reasons:
+            SLOW_REQUESTS.inc(route=route_path, reason=reason)
+        statements = "\n".join(
+            f"  {statement_seconds * 1000:8.1f} ms  {' '.join(statement.split())[:500]}"
+            for statement_seconds, statement in stats.statements
+        )
+        if stats.queries > len(stats.statements):
+            statements += f"\n  ... and {stats.queries - len(stats.statements)} more"
+        slow_request_logger.warning(
+            "Slow request (%s) %s %s -> %d: %.3fs, %d queries in %.3fs, pool wait %.3fs, argon2 %.3fs\n%s",
+            ", ".join(reasons),
+            method,
+            scope["path"],
+            status_code,
+            seconds,
+            stats.queries,
+            stats.query_seconds,
+            stats.pool_wait_seconds,
+            stats.password_hash_seconds,
+            statements,
+        )
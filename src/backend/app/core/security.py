@@ -1,28 +1,140 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import jwt
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
 from app.core.config import settings
+from app.core.metrics import Histogram
+from app.core.request_metrics import current_request_stats
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds",
+    "Argon2 calls in the hashing pool including queueing, by operation",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+# passlib и jose импортируются при первом использовании, а не вместе с модулем;
+# API загружает их в прогреве до приёма запросов (preload_crypto)
+@lru_cache(maxsize=None)
+def get_password_context() -> "CryptContext":
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["argon2"],
+        deprecated="auto",
+        argon2__time_cost=settings.ARGON2_TIME_COST,
+        argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+        argon2__parallelism=settings.ARGON2_PARALLELISM,
+    )
+
+
+def preload_crypto() -> None:
+    """Загружает passlib с бэкендом Argon2 и jose, чтобы это не досталось первому запросу"""
+    get_password_context().handler().get_backend()
+    import jose.jwt  # noqa: F401
+
+
+# Хеш пользователей, созданных без пароля (например, по входящему письму): не совпадает ни с одним паролем
+UNUSABLE_PASSWORD = "!"
+
+
+class PasswordHashingOverloaded(Exception):
+    """Очередь на хеширование паролей переполнена"""
+
+
+class InvalidTokenError(Exception):
+    """Подпись или срок действия JWT не прошли проверку"""
+
+
+class PasswordHashPool:
+    """Выполняет Argon2 в отдельных потоках, чтобы не блокировать event loop.
+
+    argon2-cffi отпускает GIL, поэтому потоков достаточно. Если задач (в работе
+    и в очереди) больше, чем workers + queue_limit, новые сразу отклоняются.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.capacity = workers + queue_limit
+        self.pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def run(self, func, *args):
+        if self.pending >= self.capacity:
+            raise PasswordHashingOverloaded()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="argon2"
+            )
+        # Счётчик меняется только из потока event loop, блокировка не нужна
+        self.pending += 1
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+            elapsed = time.perf_counter() - started
+            PASSWORD_HASH_SECONDS.observe(elapsed, operation=func.__name__)
+            stats = current_request_stats()
+            if stats is not None:
+                stats.password_hash_seconds += elapsed
+
+
+password_hash_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_password_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_password_context().hash(password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """Проверяет пароль в пуле; второй элемент — новый хеш, если параметры Argon2 изменились"""
+    if hashed_password.startswith(UNUSABLE_PASSWORD):
+        return False, None
+    return await password_hash_pool.run(
+        get_password_context().verify_and_update, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hash_pool.run(get_password_context().hash, password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    from jose import jwt
+
     to_encode = data.copy()
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
+        expire = now + timedelta(minutes=15)
+    to_encode.update({"exp": expire, "iat": now})
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
     return encoded_jwt
+
+
+def decode_access_token(token: str) -> dict:
+    """Claims токена; InvalidTokenError, если подпись или срок не прошли проверку"""
+    from jose import JWTError, jwt
+
+    try:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError as e:
+        raise InvalidTokenError(str(e)) from e
@@ -0,0 +1,90 @@
+"""Старт процесса API: прогрев до приёма запросов и состояние для /health.
+
+uvicorn открывает приём соединений только после on_startup, поэтому всё, что
+иначе досталось бы первым запросам (конфигурация мапперов SQLAlchemy, загрузка
+бэкенда Argon2, соединения пула), делается там. Длительность каждой фазы
+пишется в метрику app_startup_seconds и одной строкой в лог app.startup.
+
+Модуль импортируется в app.main первым: от его импорта отсчитывается фаза import.
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from app.core.metrics import Gauge
+
+logger = logging.getLogger("app.startup")
+
+STARTUP_SECONDS = Gauge("app_startup_seconds", "Duration of each startup phase of this process")
+APP_READY = Gauge("app_ready", "1 while this process has finished startup and is not shutting down")
+
+IMPORT_STARTED = time.perf_counter()
+
+
+class StartupState:
+    """Фазы старта одного процесса и флаг готовности"""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.ready = False
+        self._started = IMPORT_STARTED
+        APP_READY.set_function(lambda: float(self.ready))
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = seconds
+        STARTUP_SECONDS.set(seconds, phase=name)
+
+    def imported(self) -> None:
+        self.record("import", time.perf_counter() - IMPORT_STARTED)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def mark_ready(self) -> None:
+        self.record("total", time.perf_counter() - self._started)
+        self.ready = True
+        logger.info(
+            "Worker %d ready in %.2fs (%s)",
+            os.getpid(),
+            self.phases["total"],
+            ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.phases.items() if name != "total"),
+        )
+
+    def mark_stopping(self) -> None:
+        self.ready = False
+
+
+async def _select_one(engine) -> None:
+    # sqlalchemy импортируется здесь, чтобы не выпасть из замера фазы import
+    from sqlalchemy import text
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def warm_pool(engine, connections: int) -> None:
+    """Открывает connections соединений и возвращает их в пул.
+
+    Соединения берутся одновременно, иначе пул раз за разом отдавал бы одно и то же.
+    """
+    await asyncio.gather(*(_select_one(engine) for _ in range(connections)))
+
+
+async def ping_database(engine, timeout: float) -> bool:
+    try:
+        await asyncio.wait_for(_select_one(engine), timeout)
+    except Exception as e:
+        logger.warning("Database is unavailable: %r", e)
+        return False
+    return True
+
+
+startup_state = StartupState()
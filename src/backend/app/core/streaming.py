@@ -0,0 +1,123 @@
+import codecs
+import json
+from typing import Any, AsyncIterator, Iterator, Union
+
+# Предел размера одной записи: защищает от строки без переводов или незакрытого объекта
+MAX_RECORD_CHARS = 1 << 20
+
+Record = tuple[int, Union[Any, ValueError]]
+
+
+class JsonRecordParser:
+    """Инкрементальный разбор NDJSON или JSON-массива объектов.
+
+    Формат определяется по первому непробельному символу: «[» — массив,
+    иначе NDJSON. Записи нумеруются с 1. Ошибка в строке NDJSON касается
+    только этой строки; синтаксическая ошибка в массиве завершает разбор,
+    потому что дальше границы записей уже не найти.
+    """
+
+    def __init__(self):
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._mode = None
+        self._count = 0
+        self._done = False
+        self._skip_line = False
+        self._expect_value = True
+
+    def feed(self, chunk: bytes, final: bool = False) -> Iterator[Record]:
+        try:
+            self._buffer += self._text.decode(chunk, final=final)
+        except UnicodeDecodeError:
+            self._done = True
+            yield self._error("Invalid UTF-8")
+            return
+        if self._done:
+            return
+        if self._mode is None:
+            stripped = self._buffer.lstrip()
+            if not stripped:
+                return
+            self._mode = "array" if stripped[0] == "[" else "ndjson"
+            self._buffer = stripped[1:] if self._mode == "array" else stripped
+        if self._mode == "array":
+            yield from self._feed_array(final)
+        else:
+            yield from self._feed_ndjson(final)
+
+    def close(self) -> Iterator[Record]:
+        yield from self.feed(b"", final=True)
+        if self._mode == "array" and not self._done:
+            yield self._error("Unterminated JSON array")
+
+    def _error(self, message: str) -> Record:
+        self._count += 1
+        return self._count, ValueError(message)
+
+    def _feed_ndjson(self, final: bool) -> Iterator[Record]:
+        lines = self._buffer.split("\n")
+        self._buffer = "" if final else lines.pop()
+        for line in lines:
+            if self._skip_line:
+                self._skip_line = False
+                continue
+            line = line.strip()
+            if not line:
+                continue
+            self._count += 1
+            try:
+                yield self._count, json.loads(line)
+            except ValueError as e:
+                yield self._count, ValueError(f"Invalid JSON: {e}")
+        if len(self._buffer) > MAX_RECORD_CHARS:
+            self._buffer = ""
+            if not self._skip_line:
+                self._skip_line = True
+                yield self._error("Record is too large")
+
+    def _feed_array(self, final: bool) -> Iterator[Record]:
+        buffer, pos = self._buffer, 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos == len(buffer):
+                break
+            if self._expect_value:
+                if buffer[pos] == "]" and self._count == 0:
+                    self._done = True
+                    break
+                try:
+                    value, pos = self._json.raw_decode(buffer, pos)
+                except json.JSONDecodeError as e:
+                    # Возможно, запись просто ещё не дочитана
+                    if not final and len(buffer) - pos <= MAX_RECORD_CHARS:
+                        break
+                    self._done = True
+                    yield self._error(f"Invalid JSON: {e}")
+                    break
+                self._count += 1
+                self._expect_value = False
+                yield self._count, value
+            elif buffer[pos] == ",":
+                pos += 1
+                self._expect_value = True
+            elif buffer[pos] == "]":
+                self._done = True
+                break
+            else:
+                self._done = True
+                yield self._error(f"Expected ',' or ']' after record {self._count}")
+                break
+        self._buffer = buffer[pos:]
+
+
+async def iter_json_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    """Записи из потока байтов по мере поступления: (номер, объект или ValueError)"""
+    parser = JsonRecordParser()
+    async for chunk in chunks:
+        for record in parser.feed(chunk):
+            yield record
+    for record in parser.close():
+        yield record
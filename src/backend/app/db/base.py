@@ -1,3 +1,25 @@
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.schema import CreateColumn
 
 Base = declarative_base()
+
+
+@compiles(CreateColumn, "sqlite")
+def _skip_postgresql_only_columns(element, compiler, **kw):
+    """Колонки с info={"postgresql_only": True} (tsvector и т.п.) не создаются в SQLite.
+
+    Для вычисляемых колонок с выражением только для PostgreSQL в
+    info["sqlite_computed"] задаётся его вариант для SQLite.
+    """
+    column = element.element
+    if column.info.get("postgresql_only"):
+        return None
+    sqlite_computed = column.info.get("sqlite_computed")
+    if sqlite_computed is not None:
+        return "{} {} GENERATED ALWAYS AS ({}) STORED".format(
+            compiler.preparer.format_column(column),
+            compiler.dialect.type_compiler_instance.process(column.type),
+            sqlite_computed,
+        )
+    return compiler.visit_create_column(element, **kw)
@@ -1,12 +1,113 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import asyncio
+import time
+from functools import lru_cache
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.core.cache import TTLCache, shared_cache
 from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
+from app.core.request_metrics import current_request_stats, instrument_engine
 from typing import AsyncGenerator
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False, future=True)
-
-async_session_maker = async_sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total", "Pool checkouts that failed with a timeout"
 )
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently in use")
+POOL_SIZE = Gauge("db_pool_size", "Configured pool size")
+POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections opened above pool_size")
+READ_ROUTING = Counter(
+    "db_read_routing_total", "Read-only sessions by target (replica, primary, fallback)"
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """QueuePool, который замеряет ожидание соединения"""
+
+    metrics_name = "primary"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.inc(pool=self.metrics_name)
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            POOL_CHECKOUT_WAIT.observe(waited, pool=self.metrics_name)
+            stats = current_request_stats()
+            if stats is not None:
+                stats.pool_wait_seconds += waited
+
+
+def _connect_args(url: str) -> dict:
+    if make_url(url).get_backend_name() != "postgresql":
+        return {}
+
+    connect_args: dict = {}
+    if settings.DB_PGBOUNCER_MODE:
+        # PgBouncer в transaction-режиме не сохраняет prepared statements между
+        # транзакциями: отключаем оба кэша (asyncpg и адаптера SQLAlchemy)
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        # За PgBouncer startup-параметры не передаются, там timeout задаётся на роли
+        connect_args["server_settings"] = {
+            "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)
+        }
+    return connect_args
+
+
+def create_engine_from_settings(url: str, name: str = "primary", **overrides) -> AsyncEngine:
+    """Создаёт async engine с параметрами пула из Settings и регистрирует метрики пула"""
+    options = dict(
+        echo=False,
+        future=True,
+        poolclass=type("InstrumentedPool", (InstrumentedPool,), {"metrics_name": name}),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=_connect_args(url),
+    )
+    options.update(overrides)
+    new_engine = create_async_engine(url, **options)
+
+    sync_engine = new_engine.sync_engine
+    instrument_engine(sync_engine)
+    POOL_CHECKED_OUT.set_function(lambda: sync_engine.pool.checkedout(), pool=name)
+    POOL_SIZE.set_function(lambda: sync_engine.pool.size(), pool=name)
+    POOL_OVERFLOW.set_function(lambda: max(sync_engine.pool.overflow(), 0), pool=name)
+    return new_engine
+
+
+# Engine создаётся при первом обращении, а не при импорте: импорт модулей приложения
+# (CLI, alembic, профилирование импорта) не загружает диалект asyncpg и не читает пул
+@lru_cache(maxsize=None)
+def get_engine() -> AsyncEngine:
+    return create_engine_from_settings(settings.DATABASE_URL)
+
+
+@lru_cache(maxsize=None)
+def get_session_maker() -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(get_engine(), class_=AsyncSession, expire_on_commit=False)
+
+
+def async_session_maker() -> AsyncSession:
+    """Новая сессия primary; вызывается так же, как экземпляр async_sessionmaker"""
+    return get_session_maker()()
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
@@ -15,3 +116,83 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
             yield session
         finally:
             await session.close()
+
+
+def recent_write_key(subject: str) -> str:
+    return f"recent_write:{subject}"
+
+
+class ReadReplicaRouter:
+    """Раздаёт сессии на чтение по репликам round-robin.
+
+    Реплика, к которой не удалось подключиться, пропускается на
+    READ_REPLICA_RETRY_SECONDS. Пользователи, недавно что-то записавшие,
+    читают из primary (read-your-writes). Отметка о записи хранится в процессе
+    и в сетевом уровне общего кэша, поэтому при CACHE_URL=redis://... её видят
+    и другие воркеры; с memory:// — только воркер, принявший запись.
+    """
+
+    def __init__(self, urls: list[str]):
+        self.urls = urls
+        self._session_makers: Optional[list[async_sessionmaker[AsyncSession]]] = None
+        self._next = 0
+        self._down_until = [0.0] * len(urls)
+        self._recent_writers = TTLCache(maxsize=100_000, ttl=settings.READ_YOUR_WRITES_SECONDS)
+
+    @property
+    def session_makers(self) -> list[async_sessionmaker[AsyncSession]]:
+        """Engine реплик создаются при первом обращении, как и engine primary"""
+        if self._session_makers is None:
+            self._session_makers = [
+                async_sessionmaker(
+                    create_engine_from_settings(url, name=f"replica{i}"),
+                    class_=AsyncSession,
+                    expire_on_commit=False,
+                )
+                for i, url in enumerate(self.urls)
+            ]
+        return self._session_makers
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.urls)
+
+    @property
+    def engines(self) -> list[AsyncEngine]:
+        return [session_maker.kw["bind"] for session_maker in self.session_makers]
+
+    async def mark_write(self, subject: str) -> None:
+        if not self.enabled:
+            return
+        self._recent_writers.set(subject, True)
+        await shared_cache.put_flag(recent_write_key(subject), settings.READ_YOUR_WRITES_SECONDS)
+
+    async def sticks_to_primary(self, subject: Optional[str]) -> bool:
+        if subject is None:
+            return False
+        if self._recent_writers.get(subject) is not None:
+            return True
+        return await shared_cache.has_flag(recent_write_key(subject))
+
+    async def open_session(self) -> Optional[AsyncSession]:
+        """Сессия на первой доступной реплике или None, если живых реплик нет"""
+        count = len(self.session_makers)
+        start = self._next
+        self._next = (self._next + 1) % max(count, 1)
+        now = time.monotonic()
+        for offset in range(count):
+            index = (start + offset) % count
+            if self._down_until[index] > now:
+                continue
+            session = self.session_makers[index]()
+            try:
+                await session.connection()
+            except (OSError, asyncio.TimeoutError, exc.DBAPIError):
+                await session.close()
+                self._down_until[index] = now + settings.READ_REPLICA_RETRY_SECONDS
+                continue
+            return session
+        return None
+
+
+read_router = ReadReplicaRouter(settings.read_database_urls)
@@ -0,0 +1,49 @@
+import importlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+
+
+@dataclass
+class DraftRequest:
+    ticket_id: int
+    topic: str
+    description: str
+
+
+class Drafter(ABC):
+    """Готовит черновик ответа оператора по тексту обращения"""
+
+    # Попадает в ticket_drafts.drafter; кэш черновиков раздельный для разных drafter
+    name: str
+
+    @abstractmethod
+    async def draft(self, request: DraftRequest) -> str:
+        ...
+
+
+class StubDrafter(Drafter):
+    """Детерминированный шаблон без внешних сервисов: для тестов и локального запуска"""
+
+    name = "stub"
+
+    async def draft(self, request: DraftRequest) -> str:
+        first_line = request.description.strip().splitlines()[0][:200]
+        return (
+            "Здравствуйте!\n\n"
+            f"Спасибо за обращение «{request.topic}». "
+            f"Мы получили описание проблемы: «{first_line}» и уже разбираемся.\n\n"
+            "С уважением, служба поддержки"
+        )
+
+
+def create_drafter(spec: str) -> Drafter:
+    """Drafter по настройке DRAFTER: stub или путь к классу package.module:ClassName"""
+    if spec == "stub":
+        return StubDrafter()
+    module_name, _, class_name = spec.partition(":")
+    if not class_name:
+        raise ValueError(f"DRAFTER must be 'stub' or 'package.module:ClassName', got {spec!r}")
+    drafter = getattr(importlib.import_module(module_name), class_name)()
+    if not isinstance(drafter, Drafter):
+        raise TypeError(f"{spec} is not a Drafter")
+    return drafter
@@ -0,0 +1,202 @@
+"""Пул исполнителей черновиков ответов.
+
+Очередь — таблица ticket_drafts: тикет создаётся вместе со строкой PENDING,
+исполнители забирают строки через SELECT ... FOR UPDATE SKIP LOCKED, поэтому
+пул может работать в каждом процессе API и/или отдельно:
+
+    python -m app.drafts.worker
+"""
+import asyncio
+import logging
+import signal
+import time
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.enums import TicketEventType
+from app.core.metrics import Counter, Gauge, Histogram, start_metrics_server
+from app.db.session import async_session_maker, create_engine_from_settings
+from app.drafts.drafters import Drafter, DraftRequest, create_drafter
+from app.events.hub import event_hub
+from app.repositories.draft import DraftRepository
+
+logger = logging.getLogger(__name__)
+
+DRAFT_JOBS = Counter("draft_jobs_total", "Draft jobs by outcome (ready, cached, failed, cancelled)")
+DRAFT_JOB_SECONDS = Histogram(
+    "draft_job_seconds",
+    "Time to produce a draft, by outcome",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+DRAFT_QUEUE_WAIT = Histogram(
+    "draft_queue_wait_seconds",
+    "Time a draft job spent in the queue before a worker took it",
+    buckets=(0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0),
+)
+DRAFT_RUNNING = Gauge("draft_jobs_running", "Draft jobs running in this process")
+
+
+class DraftWorker:
+    def __init__(
+        self,
+        session_maker: async_sessionmaker,
+        drafter: Optional[Drafter] = None,
+        concurrency: int = 2,
+        timeout: float = 60,
+        poll_seconds: float = 2,
+    ):
+        self.session_maker = session_maker
+        self.drafter = drafter
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.poll_seconds = poll_seconds
+        # RUNNING дольше этого — процесс-исполнитель умер, задачу можно забрать снова
+        self.stale_after = timedelta(seconds=2 * timeout + poll_seconds)
+        self._running: dict[int, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        DRAFT_RUNNING.set_function(lambda: len(self._running))
+
+    def notify(self) -> None:
+        """Новые задачи в очереди: не ждать следующего опроса"""
+        self._wakeup.set()
+
+    def cancel(self, ticket_id: int) -> None:
+        """Прерывает черновик, если он выполняется в этом процессе"""
+        task = self._running.get(ticket_id)
+        if task is not None:
+            task.cancel()
+
+    async def run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            free = self.concurrency - len(self._running)
+            jobs = []
+            if free > 0:
+                try:
+                    async with self.session_maker() as session:
+                        jobs = await DraftRepository(session).claim(free, self.stale_after)
+                except Exception:
+                    logger.exception("Failed to claim draft jobs")
+                for job in jobs:
+                    task = asyncio.create_task(self._run_job(job))
+                    self._running[job.ticket_id] = task
+                    task.add_done_callback(lambda _, ticket_id=job.ticket_id: self._job_done(ticket_id))
+            if jobs and len(jobs) == free:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def _job_done(self, ticket_id: int) -> None:
+        self._running.pop(ticket_id, None)
+        # Освободился слот: можно брать следующую задачу
+        self._wakeup.set()
+
+    async def _run_job(self, job: Row) -> None:
+        if job.started_at is not None and job.created_at is not None:
+            DRAFT_QUEUE_WAIT.observe(max((job.started_at - job.created_at).total_seconds(), 0))
+        started = time.perf_counter()
+        outcome = "failed"
+        try:
+            async with self.session_maker() as session:
+                cached = await DraftRepository(session).find_cached(job.content_hash, self.drafter.name)
+            if cached is not None:
+                text, outcome = cached, "cached"
+            else:
+                text = await asyncio.wait_for(
+                    self.drafter.draft(DraftRequest(job.ticket_id, job.topic, job.description)),
+                    self.timeout,
+                )
+                outcome = "ready"
+            async with self.session_maker() as session:
+                saved = await DraftRepository(session).complete(
+                    job.ticket_id, text, self.drafter.name, from_cache=outcome == "cached"
+                )
+            if not saved:
+                outcome = "cancelled"
+            else:
+                event_hub.publish(
+                    TicketEventType.DRAFT_READY, ticket_id=job.ticket_id, from_cache=outcome == "cached"
+                )
+        except asyncio.CancelledError:
+            # Тикет получил ответ (или процесс останавливается): статус уже выставлен в БД
+            outcome = "cancelled"
+            raise
+        except Exception as e:
+            error = "Timed out" if isinstance(e, asyncio.TimeoutError) else f"{type(e).__name__}: {e}"
+            if not isinstance(e, asyncio.TimeoutError):
+                logger.exception("Draft for ticket %s failed", job.ticket_id)
+            try:
+                async with self.session_maker() as session:
+                    await DraftRepository(session).fail(job.ticket_id, error, self.drafter.name)
+            except Exception:
+                logger.exception("Failed to record draft failure for ticket %s", job.ticket_id)
+        finally:
+            DRAFT_JOBS.inc(outcome=outcome)
+            DRAFT_JOB_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+
+    def start(self) -> None:
+        if self.drafter is None:
+            # Ошибка в DRAFTER должна остановить запуск, а не потеряться в фоновой задаче
+            self.drafter = create_drafter(settings.DRAFTER)
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Останавливает опрос и прерывает текущие задачи; их заберут повторно после stale_after"""
+        tasks = [self._task, *self._running.values()] if self._task else list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+
+
+draft_worker = DraftWorker(
+    async_session_maker,
+    concurrency=settings.DRAFT_CONCURRENCY,
+    timeout=settings.DRAFT_TIMEOUT_SECONDS,
+    poll_seconds=settings.DRAFT_POLL_SECONDS,
+)
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    # Соединение на каждую задачу плюс одно на выборку из очереди
+    engine = create_engine_from_settings(
+        settings.DATABASE_URL, name="drafts", pool_size=settings.DRAFT_CONCURRENCY + 1, max_overflow=0
+    )
+    worker = DraftWorker(
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+        concurrency=settings.DRAFT_CONCURRENCY,
+        timeout=settings.DRAFT_TIMEOUT_SECONDS,
+        poll_seconds=settings.DRAFT_POLL_SECONDS,
+    )
+    worker.start()
+    event_hub.start()
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    metrics_server: Optional[asyncio.AbstractServer] = None
+    if settings.DRAFT_METRICS_PORT:
+        metrics_server = await start_metrics_server(settings.DRAFT_METRICS_PORT)
+    logger.info("Draft worker started: drafter=%s concurrency=%d", settings.DRAFTER, settings.DRAFT_CONCURRENCY)
+    try:
+        await stopping.wait()
+    finally:
+        await worker.stop()
+        await event_hub.stop()
+        if metrics_server is not None:
+            metrics_server.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
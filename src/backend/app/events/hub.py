@@ -0,0 +1,216 @@
+"""События для операторов: новые тикеты, ответы, готовые черновики.
+
+Издатели (сервисы и воркеры) вызывают event_hub.publish() после commit.
+С EVENTS_BACKEND=postgres событие уходит в NOTIFY и через LISTEN приходит во
+все процессы, включая отправивший. Каждый процесс держит ровно одно
+соединение для LISTEN/NOTIFY и раздаёт события своим подписчикам из памяти,
+поэтому число подключённых операторов не меняет нагрузку на БД.
+"""
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Optional
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.enums import EventsBackend, TicketEventType
+from app.core.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+EVENTS_PUBLISHED = Counter("events_published_total", "Events published by this process, by type")
+EVENTS_DELIVERED = Counter("events_delivered_total", "Events put into subscriber buffers")
+EVENTS_LOST = Counter("events_lost_total", "Events dropped because the NOTIFY connection was down")
+EVENTS_DROPPED_SUBSCRIBERS = Counter(
+    "events_dropped_subscribers_total", "Subscribers disconnected for falling behind"
+)
+EVENTS_SUBSCRIBERS = Gauge("events_subscribers", "Open event streams in this process")
+
+# Сколько событий копится для NOTIFY, пока соединение с Postgres восстанавливается
+OUTBOX_LIMIT = 10_000
+NOTIFY_BATCH = 100
+RECONNECT_SECONDS = 1.0
+
+
+def format_sse(event_type: str, data: str) -> str:
+    return f"event: {event_type}\ndata: {data}\n\n"
+
+
+class Subscription:
+    """Буфер событий одного клиента; None в очереди — поток закрыт"""
+
+    def __init__(self, hub: "EventHub", buffer_size: int):
+        self._hub = hub
+        self.queue: asyncio.Queue[Optional[str]] = asyncio.Queue(buffer_size)
+        # Клиент не успевал читать и был отключён
+        self.dropped = False
+
+    def push(self, message: str) -> bool:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    def end(self) -> None:
+        """Выбрасывает непрочитанное и закрывает поток"""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._hub.unsubscribe(self)
+
+
+class EventHub:
+    def __init__(
+        self,
+        backend: EventsBackend,
+        channel: str,
+        database_url: str,
+        buffer_size: int = 100,
+        heartbeat: float = 15,
+    ):
+        self.backend = backend
+        self.channel = channel
+        self.database_url = database_url
+        self.buffer_size = buffer_size
+        self.heartbeat = heartbeat
+        self._subscribers: set[Subscription] = set()
+        self._outbox: asyncio.Queue[str] = asyncio.Queue(OUTBOX_LIMIT)
+        self._task: Optional[asyncio.Task] = None
+        EVENTS_SUBSCRIBERS.set_function(lambda: len(self._subscribers))
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self, self.buffer_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, event_type: TicketEventType, **data) -> None:
+        """Не ждёт БД: в режиме postgres NOTIFY отправляет фоновая задача"""
+        payload = json.dumps({"type": event_type.value, **data}, ensure_ascii=False, default=str)
+        EVENTS_PUBLISHED.inc(type=event_type.value)
+        if self.backend == EventsBackend.POSTGRES and self._task is not None:
+            try:
+                self._outbox.put_nowait(payload)
+            except asyncio.QueueFull:
+                EVENTS_LOST.inc()
+        else:
+            self._dispatch(payload)
+
+    def _dispatch(self, payload: str) -> None:
+        """Раздаёт событие подписчикам процесса; SSE-сообщение собирается один раз"""
+        try:
+            event_type = json.loads(payload)["type"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Malformed event payload: %.200s", payload)
+            return
+        message = format_sse(event_type, payload)
+        for subscription in list(self._subscribers):
+            if not subscription.push(message):
+                self._drop(subscription)
+        EVENTS_DELIVERED.inc(len(self._subscribers))
+
+    def _drop(self, subscription: Subscription) -> None:
+        # Медленный клиент не должен копить память процесса: он переподключится и перечитает список
+        self.unsubscribe(subscription)
+        subscription.dropped = True
+        subscription.end()
+        EVENTS_DROPPED_SUBSCRIBERS.inc()
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        self._dispatch(payload)
+
+    async def run(self) -> None:
+        """LISTEN и отправка NOTIFY через одно соединение; переподключается при обрыве"""
+        import asyncpg
+
+        dsn = make_url(self.database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                connection = await asyncpg.connect(dsn)
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError) as e:
+                logger.warning("Event connection failed: %s", e)
+                await asyncio.sleep(RECONNECT_SECONDS)
+                continue
+            try:
+                await connection.add_listener(self.channel, self._on_notify)
+                await self._send_notifications(connection)
+            except (OSError, asyncio.TimeoutError, asyncpg.PostgresError, asyncpg.InterfaceError) as e:
+                logger.warning("Event connection lost: %s", e)
+            finally:
+                connection.terminate()
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    async def _send_notifications(self, connection) -> None:
+        while True:
+            try:
+                payloads = [await asyncio.wait_for(self._outbox.get(), self.heartbeat)]
+            except asyncio.TimeoutError:
+                # Без событий обрыв LISTEN иначе не заметить
+                await connection.execute("SELECT 1")
+                continue
+            while len(payloads) < NOTIFY_BATCH and not self._outbox.empty():
+                payloads.append(self._outbox.get_nowait())
+            try:
+                await connection.execute(
+                    "SELECT pg_notify($1, payload) FROM unnest($2::text[]) AS payload",
+                    self.channel,
+                    payloads,
+                )
+            except BaseException:
+                EVENTS_LOST.inc(len(payloads))
+                raise
+
+    async def stream(self) -> AsyncIterator[str]:
+        """SSE-поток одного клиента; заканчивается при отключении клиента или если он отстал"""
+        with self.subscribe() as subscription:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if message is None:
+                    if subscription.dropped:
+                        yield format_sse("overflow", json.dumps({"type": "overflow"}))
+                    return
+                yield message
+
+    def start(self) -> None:
+        if self.backend == EventsBackend.POSTGRES and make_url(self.database_url).get_backend_name() != "postgresql":
+            # SQLite при разработке: LISTEN/NOTIFY нет, события раздаются внутри процесса
+            logger.warning("EVENTS_BACKEND=postgres needs a PostgreSQL database URL, falling back to memory")
+            self.backend = EventsBackend.MEMORY
+        if self.backend == EventsBackend.POSTGRES and self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Закрывает потоки клиентов и соединение LISTEN"""
+        for subscription in list(self._subscribers):
+            self.unsubscribe(subscription)
+            subscription.end()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+event_hub = EventHub(
+    settings.EVENTS_BACKEND,
+    settings.EVENTS_CHANNEL,
+    settings.EVENTS_DATABASE_URL or settings.DATABASE_URL,
+    buffer_size=settings.EVENTS_BUFFER_SIZE,
+    heartbeat=settings.EVENTS_HEARTBEAT_SECONDS,
+)
@@ -0,0 +1,330 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+ATTEMPTS_HEADER = "x-attempts"
+ENQUEUED_AT_HEADER = "x-enqueued-at"
+
+
+@dataclass
+class BrokerMessage:
+    """Сообщение из очереди; delivery — служебный хэндл брокера для ack"""
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+    delivery: Any = None
+
+    @property
+    def attempts(self) -> int:
+        return int(self.headers.get(ATTEMPTS_HEADER, 0))
+
+    @property
+    def enqueued_at(self) -> Optional[float]:
+        value = self.headers.get(ENQUEUED_AT_HEADER)
+        return float(value) if value else None
+
+
+def _retry_headers(message: BrokerMessage) -> dict[str, str]:
+    return {**message.headers, ATTEMPTS_HEADER: str(message.attempts + 1)}
+
+
+class Broker(ABC):
+    """Очередь писем. Сообщение считается обработанным только после ack;
+    retry возвращает его в конец очереди с увеличенным счётчиком попыток,
+    dead_letter перекладывает в очередь «<queue>.dead».
+    """
+
+    async def connect(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    @abstractmethod
+    async def publish(self, body: bytes, headers: Optional[dict[str, str]] = None) -> None:
+        ...
+
+    @abstractmethod
+    async def fetch(self, max_messages: int, timeout: float) -> list[BrokerMessage]:
+        """До max_messages сообщений; ждёт не дольше timeout, если очередь пуста"""
+
+    @abstractmethod
+    async def ack(self, messages: list[BrokerMessage]) -> None:
+        ...
+
+    @abstractmethod
+    async def retry(self, message: BrokerMessage) -> None:
+        ...
+
+    @abstractmethod
+    async def dead_letter(self, message: BrokerMessage, reason: str) -> None:
+        ...
+
+    @abstractmethod
+    async def lag(self) -> int:
+        """Сколько сообщений ждут обработки (без уже выданных воркеру)"""
+
+
+class InMemoryBroker(Broker):
+    """Очередь в памяти процесса: для тестов и локального запуска воркера"""
+
+    def __init__(self, prefetch: int = 1000):
+        self.queue: asyncio.Queue[BrokerMessage] = asyncio.Queue()
+        self.dead: list[tuple[BrokerMessage, str]] = []
+        self.unacked = 0
+        self.prefetch = prefetch
+
+    async def publish(self, body: bytes, headers: Optional[dict[str, str]] = None) -> None:
+        headers = {ENQUEUED_AT_HEADER: str(time.time()), **(headers or {})}
+        self.queue.put_nowait(BrokerMessage(body, headers))
+
+    async def fetch(self, max_messages: int, timeout: float) -> list[BrokerMessage]:
+        max_messages = min(max_messages, self.prefetch - self.unacked)
+        if max_messages <= 0:
+            await asyncio.sleep(timeout)
+            return []
+        try:
+            messages = [await asyncio.wait_for(self.queue.get(), timeout)]
+        except asyncio.TimeoutError:
+            return []
+        while len(messages) < max_messages and not self.queue.empty():
+            messages.append(self.queue.get_nowait())
+        self.unacked += len(messages)
+        return messages
+
+    async def ack(self, messages: list[BrokerMessage]) -> None:
+        self.unacked -= len(messages)
+
+    async def retry(self, message: BrokerMessage) -> None:
+        self.unacked -= 1
+        self.queue.put_nowait(BrokerMessage(message.body, _retry_headers(message)))
+
+    async def dead_letter(self, message: BrokerMessage, reason: str) -> None:
+        self.unacked -= 1
+        self.dead.append((message, reason))
+
+    async def lag(self) -> int:
+        return self.queue.qsize()
+
+
+class RedisStreamsBroker(Broker):
+    """Redis Streams: consumer group на потоке <queue>, мёртвые письма — в <queue>.dead.
+
+    Сообщения consumer'а, который упал и не вернулся (другой hostname), остаются
+    в pending группы. Раз в reclaim_interval воркер забирает себе те из них, что
+    не подтверждены дольше visibility_timeout (XAUTOCLAIM). visibility_timeout
+    должен быть больше времени обработки порции: иначе сообщение, которое ещё
+    обрабатывается, будет выдано повторно (тикет не задвоится — его защищает
+    уникальный message_id, но работа будет сделана дважды).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        queue: str,
+        prefetch: int,
+        consumer: str,
+        visibility_timeout: float = 300,
+        reclaim_interval: float = 30,
+        client=None,
+    ):
+        self.url = url
+        self.stream = queue
+        self.dead_stream = f"{queue}.dead"
+        self.group = "ingest"
+        self.consumer = consumer
+        self.prefetch = prefetch
+        self.visibility_timeout = visibility_timeout
+        self.reclaim_interval = reclaim_interval
+        self.unacked = 0
+        self.redis = client
+        # Сообщения, выданные этому consumer до перезапуска и не подтверждённые:
+        # сначала дочитываем их (XREADGROUP с id), потом берём новые (">")
+        self._pending_from: Optional[str] = "0"
+        # Курсор XAUTOCLAIM по pending группы; новый проход — через reclaim_interval
+        self._reclaim_from = "0-0"
+        self._next_reclaim = 0.0
+
+    async def connect(self) -> None:
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("redis:// broker requires the redis package") from e
+        if self.redis is None:
+            self.redis = redis.from_url(self.url)
+        try:
+            await self.redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def close(self) -> None:
+        if self.redis is not None:
+            await self.redis.aclose()
+
+    @staticmethod
+    def _fields(body: bytes, headers: dict[str, str]) -> dict:
+        return {"body": body, **{f"h:{k}": v for k, v in headers.items()}}
+
+    async def publish(self, body: bytes, headers: Optional[dict[str, str]] = None) -> None:
+        headers = {ENQUEUED_AT_HEADER: str(time.time()), **(headers or {})}
+        await self.redis.xadd(self.stream, self._fields(body, headers))
+
+    async def fetch(self, max_messages: int, timeout: float) -> list[BrokerMessage]:
+        max_messages = min(max_messages, self.prefetch - self.unacked)
+        if max_messages <= 0:
+            await asyncio.sleep(timeout)
+            return []
+        entries = []
+        if self._pending_from is not None:
+            entries = await self._read(self._pending_from, max_messages)
+            self._pending_from = entries[-1][0] if entries else None
+        if not entries and time.monotonic() >= self._next_reclaim:
+            entries = await self._reclaim(max_messages)
+        if not entries:
+            entries = await self._read(">", max_messages, block=int(timeout * 1000))
+
+        messages = []
+        for entry_id, fields in entries:
+            headers = {k.decode()[2:]: v.decode() for k, v in fields.items() if k.startswith(b"h:")}
+            messages.append(BrokerMessage(fields[b"body"], headers, delivery=entry_id))
+        self.unacked += len(messages)
+        return messages
+
+    async def _read(self, start: str, count: int, block: Optional[int] = None) -> list:
+        response = await self.redis.xreadgroup(
+            self.group, self.consumer, {self.stream: start}, count=count, block=block
+        )
+        return response[0][1] if response else []
+
+    async def _reclaim(self, count: int) -> list:
+        """Забирает сообщения, которые другие consumer'ы не подтвердили дольше visibility_timeout"""
+        response = await self.redis.xautoclaim(
+            self.stream,
+            self.group,
+            self.consumer,
+            min_idle_time=int(self.visibility_timeout * 1000),
+            start_id=self._reclaim_from,
+            count=count,
+        )
+        self._reclaim_from = response[0]
+        if self._reclaim_from in (b"0-0", "0-0"):
+            self._next_reclaim = time.monotonic() + self.reclaim_interval
+        # Записи, удалённые из потока (XTRIM), Redis 6.2 возвращает без полей: снимаем их из pending
+        trimmed = [entry_id for entry_id, fields in response[1] if not fields]
+        if trimmed:
+            await self.redis.xack(self.stream, self.group, *trimmed)
+        return [(entry_id, fields) for entry_id, fields in response[1] if fields]
+
+    async def ack(self, messages: list[BrokerMessage]) -> None:
+        if messages:
+            await self.redis.xack(self.stream, self.group, *[m.delivery for m in messages])
+            self.unacked -= len(messages)
+
+    async def _move(self, stream: str, message: BrokerMessage, headers: dict[str, str]) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xadd(stream, self._fields(message.body, headers))
+            pipe.xack(self.stream, self.group, message.delivery)
+            await pipe.execute()
+        self.unacked -= 1
+
+    async def retry(self, message: BrokerMessage) -> None:
+        await self._move(self.stream, message, _retry_headers(message))
+
+    async def dead_letter(self, message: BrokerMessage, reason: str) -> None:
+        await self._move(self.dead_stream, message, {**message.headers, "x-dead-reason": reason})
+
+    async def lag(self) -> int:
+        for group in await self.redis.xinfo_groups(self.stream):
+            if group["name"].decode() == self.group:
+                return int(group.get("lag") or 0)
+        return 0
+
+
+class AmqpBroker(Broker):
+    """AMQP 0-9-1 (RabbitMQ) через aio-pika; prefetch — это basic.qos канала"""
+
+    def __init__(self, url: str, queue: str, prefetch: int):
+        self.url = url
+        self.queue_name = queue
+        self.prefetch = prefetch
+        self.connection = None
+        self.channel = None
+        self.queue = None
+        self._incoming: asyncio.Queue = asyncio.Queue()
+
+    async def connect(self) -> None:
+        try:
+            import aio_pika
+        except ImportError as e:
+            raise RuntimeError("amqp:// broker requires the aio-pika package") from e
+        self._aio_pika = aio_pika
+        self.connection = await aio_pika.connect_robust(self.url)
+        self.channel = await self.connection.channel()
+        await self.channel.set_qos(prefetch_count=self.prefetch)
+        self.queue = await self.channel.declare_queue(self.queue_name, durable=True)
+        await self.channel.declare_queue(f"{self.queue_name}.dead", durable=True)
+        await self.queue.consume(self._incoming.put)
+
+    async def close(self) -> None:
+        if self.connection is not None:
+            await self.connection.close()
+
+    async def _send(self, routing_key: str, body: bytes, headers: dict[str, str]) -> None:
+        await self.channel.default_exchange.publish(
+            self._aio_pika.Message(
+                body, headers=headers, delivery_mode=self._aio_pika.DeliveryMode.PERSISTENT
+            ),
+            routing_key=routing_key,
+        )
+
+    async def publish(self, body: bytes, headers: Optional[dict[str, str]] = None) -> None:
+        await self._send(self.queue_name, body, {ENQUEUED_AT_HEADER: str(time.time()), **(headers or {})})
+
+    async def fetch(self, max_messages: int, timeout: float) -> list[BrokerMessage]:
+        try:
+            deliveries = [await asyncio.wait_for(self._incoming.get(), timeout)]
+        except asyncio.TimeoutError:
+            return []
+        while len(deliveries) < max_messages and not self._incoming.empty():
+            deliveries.append(self._incoming.get_nowait())
+        return [
+            BrokerMessage(
+                d.body,
+                {k: v.decode() if isinstance(v, bytes) else str(v) for k, v in (d.headers or {}).items()},
+                delivery=d,
+            )
+            for d in deliveries
+        ]
+
+    async def ack(self, messages: list[BrokerMessage]) -> None:
+        for message in messages:
+            await message.delivery.ack()
+
+    async def retry(self, message: BrokerMessage) -> None:
+        await self._send(self.queue_name, message.body, _retry_headers(message))
+        await message.delivery.ack()
+
+    async def dead_letter(self, message: BrokerMessage, reason: str) -> None:
+        await self._send(f"{self.queue_name}.dead", message.body, {**message.headers, "x-dead-reason": reason})
+        await message.delivery.ack()
+
+    async def lag(self) -> int:
+        declared = await self.channel.declare_queue(self.queue_name, passive=True)
+        return declared.declaration_result.message_count
+
+
+def create_broker(
+    url: str, queue: str, prefetch: int, consumer: str = "worker", visibility_timeout: float = 300
+) -> Broker:
+    """Брокер по схеме URL: memory://, redis://, rediss://, amqp://, amqps://"""
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return InMemoryBroker(prefetch=prefetch)
+    if scheme in ("redis", "rediss"):
+        return RedisStreamsBroker(url, queue, prefetch, consumer, visibility_timeout=visibility_timeout)
+    if scheme in ("amqp", "amqps"):
+        return AmqpBroker(url, queue, prefetch)
+    raise ValueError(f"Unsupported broker URL scheme: {scheme}")
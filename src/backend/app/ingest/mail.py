@@ -0,0 +1,103 @@
+import hashlib
+import html
+import re
+from dataclasses import dataclass
+from email import message_from_bytes
+from email.header import decode_header, make_header
+from email.message import Message
+from email.utils import parseaddr
+
+from pydantic.networks import validate_email
+
+from app.core.enums import TicketPriority
+from app.schemas.ticket import TicketCreate
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACES_RE = re.compile(r"[ \t]+")
+_BLANK_LINES_RE = re.compile(r"\n\s*\n+")
+
+
+class InvalidMail(ValueError):
+    """Письмо нельзя превратить в тикет; повторная попытка не поможет"""
+
+
+@dataclass
+class MailTicket:
+    message_id: str
+    sender: str
+    ticket: TicketCreate
+
+
+def _header(msg: Message, name: str) -> str:
+    """Значение заголовка с раскодированными RFC 2047 словами (=?utf-8?b?...?=)"""
+    value = msg.get(name)
+    if value is None:
+        return ""
+    try:
+        return str(make_header(decode_header(value)))
+    except (LookupError, ValueError):
+        return str(value)
+
+
+def _message_id(msg: Message, raw: bytes) -> str:
+    message_id = _header(msg, "Message-ID").strip().strip("<>")
+    # Без Message-ID (или со слишком длинным) дедуплицируем по содержимому письма
+    if not message_id or len(message_id) > 255:
+        return "sha256:" + hashlib.sha256(raw).hexdigest()
+    return message_id
+
+
+def _priority(msg: Message) -> TicketPriority:
+    x_priority = _header(msg, "X-Priority").strip()[:1]
+    importance = _header(msg, "Importance").strip().lower()
+    if x_priority in ("1", "2") or importance == "high":
+        return TicketPriority.HIGH
+    if x_priority == "3" or importance == "normal":
+        return TicketPriority.MIDDLE
+    return TicketPriority.LOW
+
+
+def _body_text(msg: Message) -> str:
+    """Первая text/plain часть письма, иначе первая text/html без тегов; вложения пропускаются"""
+    parts = {}
+    for part in msg.walk():
+        if part.is_multipart() or part.get_content_disposition() == "attachment":
+            continue
+        parts.setdefault(part.get_content_type(), part)
+    part = parts.get("text/plain") or parts.get("text/html")
+    if part is None:
+        return ""
+    payload = part.get_payload(decode=True) or b""
+    try:
+        text = payload.decode(part.get_content_charset() or "utf-8", errors="replace")
+    except LookupError:
+        # Неизвестная кодировка
+        text = payload.decode("utf-8", errors="replace")
+    if part.get_content_subtype() == "html":
+        text = _SPACES_RE.sub(" ", html.unescape(_TAG_RE.sub(" ", text)))
+    return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def parse_mail(raw: bytes) -> MailTicket:
+    """Разбирает письмо (RFC 5322) в тикет: тема — Subject, описание — текст письма"""
+    # compat32 вместо policy.default: объектные заголовки в разы медленнее, а нужны нам четыре строки
+    msg = message_from_bytes(raw)
+    _, sender = parseaddr(_header(msg, "From"))
+    if not sender:
+        raise InvalidMail("No sender address")
+    # Та же проверка и нормализация, что у EmailStr при регистрации: иначе John@Example.COM
+    # не совпал бы с John@example.com в users, а невалидный адрес ломал бы UserResponse
+    try:
+        _, sender = validate_email(sender)
+    except ValueError as e:
+        raise InvalidMail(f"Invalid sender address: {sender}") from e
+
+    topic = " ".join(_header(msg, "Subject").split())[:255]
+    if len(topic) < 3:
+        topic = "(без темы)"
+    description = _body_text(msg) or topic
+    try:
+        ticket = TicketCreate(topic=topic, description=description, priority=_priority(msg))
+    except ValueError as e:
+        raise InvalidMail(str(e)) from e
+    return MailTicket(message_id=_message_id(msg, raw), sender=sender, ticket=ticket)
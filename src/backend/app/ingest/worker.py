@@ -0,0 +1,229 @@
+"""Воркер входящей почты: брокер → тикеты.
+
+    python -m app.ingest.worker
+
+Берёт письма из INGEST_BROKER_URL порциями, пишет их в БД через собственный
+небольшой пул (INGEST_CONCURRENCY соединений), поэтому всплеск почты не
+отнимает соединения у API, а скорость записи ограничена INGEST_MAX_ROWS_PER_SECOND.
+"""
+import asyncio
+import logging
+import signal
+import socket
+import time
+from typing import Optional
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.enums import TicketEventType
+from app.core.metrics import Counter, Gauge, Histogram, start_metrics_server
+from app.db.session import create_engine_from_settings
+from app.events.hub import event_hub
+from app.ingest.broker import Broker, BrokerMessage, create_broker
+from app.ingest.mail import InvalidMail, MailTicket, parse_mail
+from app.repositories.ticket import TicketRepository
+from app.repositories.user import UserRepository
+
+logger = logging.getLogger(__name__)
+
+INGEST_MESSAGES = Counter(
+    "ingest_messages_total", "Mail messages by outcome (created, duplicate, retried, dead_lettered)"
+)
+INGEST_BATCH_SECONDS = Histogram("ingest_batch_seconds", "Time to write one batch of mail tickets")
+INGEST_MESSAGE_AGE = Histogram(
+    "ingest_message_age_seconds",
+    "Time from enqueue to ticket creation",
+    buckets=(1, 5, 15, 60, 300, 900, 3600, 4 * 3600, 24 * 3600),
+)
+INGEST_LAG = Gauge("ingest_queue_lag", "Messages waiting in the broker queue")
+
+
+class RateLimiter:
+    """Не больше rate строк в секунду: каждая порция резервирует своё окно времени"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._next = 0.0
+
+    async def acquire(self, rows: int) -> None:
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        start = max(self._next, now)
+        self._next = start + rows / self.rate
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class MailIngestWorker:
+    def __init__(
+        self,
+        broker: Broker,
+        session_maker: async_sessionmaker,
+        concurrency: int = 2,
+        batch_size: int = 200,
+        max_attempts: int = 5,
+        max_rows_per_second: float = 0,
+    ):
+        self.broker = broker
+        self.session_maker = session_maker
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.limiter = RateLimiter(max_rows_per_second)
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run(self) -> None:
+        """Работает до stop(); начатые порции дописываются"""
+        consumers = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+        lag_task = asyncio.create_task(self._track_lag())
+        try:
+            await asyncio.gather(*consumers)
+        finally:
+            lag_task.cancel()
+
+    async def _track_lag(self) -> None:
+        while True:
+            try:
+                INGEST_LAG.set(await self.broker.lag())
+            except Exception:
+                logger.exception("Failed to read broker lag")
+            await asyncio.sleep(5)
+
+    async def _consume(self) -> None:
+        backoff = 0.0
+        while not self._stopping.is_set():
+            messages = await self.broker.fetch(self.batch_size, timeout=1.0)
+            if not messages:
+                continue
+            await self.limiter.acquire(len(messages))
+            if await self.process(messages):
+                backoff = 0.0
+            else:
+                # БД недоступна: не сжигаем попытки остальных писем в быстром цикле
+                backoff = min(max(backoff * 2, 1.0), 30.0)
+                await asyncio.sleep(backoff)
+
+    async def _retry(self, message: BrokerMessage, reason: str) -> None:
+        if message.attempts + 1 >= self.max_attempts:
+            await self.broker.dead_letter(message, reason)
+            INGEST_MESSAGES.inc(outcome="dead_lettered")
+        else:
+            await self.broker.retry(message)
+            INGEST_MESSAGES.inc(outcome="retried")
+
+    async def process(self, messages: list[BrokerMessage]) -> bool:
+        """Пишет порцию писем; False — порция целиком не записана (сообщения отправлены на retry)"""
+        batch: dict[str, tuple[BrokerMessage, MailTicket]] = {}
+        repeated: list[BrokerMessage] = []
+        for message in messages:
+            try:
+                mail = parse_mail(message.body)
+            except InvalidMail as e:
+                await self.broker.dead_letter(message, str(e))
+                INGEST_MESSAGES.inc(outcome="dead_lettered")
+                continue
+            if mail.message_id in batch:
+                repeated.append(message)
+            else:
+                batch[mail.message_id] = (message, mail)
+        if not batch:
+            await self.broker.ack(repeated)
+            return True
+
+        started = time.perf_counter()
+        try:
+            async with self.session_maker() as session:
+                user_ids = await UserRepository(session).get_or_create_ids(
+                    {mail.sender for _, mail in batch.values()}
+                )
+                outcomes = await TicketRepository(session).create_many(
+                    [
+                        {
+                            "user_id": user_ids[mail.sender],
+                            "topic": mail.ticket.topic,
+                            "description": mail.ticket.description,
+                            "priority": mail.ticket.priority,
+                            "message_id": mail.message_id,
+                        }
+                        for _, mail in batch.values()
+                    ],
+                    skip_duplicates=True,
+                )
+        except (DBAPIError, OSError) as e:
+            logger.warning("Mail batch of %d failed: %s", len(messages), e)
+            for message in [m for m, _ in batch.values()] + repeated:
+                await self._retry(message, f"Batch failed: {e}")
+            return False
+        INGEST_BATCH_SECONDS.observe(time.perf_counter() - started)
+
+        processed = list(repeated)
+        INGEST_MESSAGES.inc(len(repeated), outcome="duplicate")
+        now = time.time()
+        created = 0
+        for (message, _), outcome in zip(batch.values(), outcomes):
+            if isinstance(outcome, DBAPIError):
+                await self._retry(message, f"Database error: {str(outcome.orig).splitlines()[0]}")
+                continue
+            processed.append(message)
+            if outcome is None:
+                INGEST_MESSAGES.inc(outcome="duplicate")
+            else:
+                INGEST_MESSAGES.inc(outcome="created")
+                created += 1
+                if message.enqueued_at:
+                    INGEST_MESSAGE_AGE.observe(max(now - message.enqueued_at, 0))
+        await self.broker.ack(processed)
+        if created:
+            event_hub.publish(TicketEventType.TICKETS_IMPORTED, created=created)
+        return True
+
+
+async def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    # Свой пул: не больше одного соединения на параллельную порцию
+    engine = create_engine_from_settings(
+        settings.DATABASE_URL, name="ingest", pool_size=settings.INGEST_CONCURRENCY, max_overflow=0
+    )
+    broker = create_broker(
+        settings.INGEST_BROKER_URL,
+        settings.INGEST_QUEUE,
+        prefetch=settings.INGEST_PREFETCH,
+        consumer=socket.gethostname(),
+        visibility_timeout=settings.INGEST_VISIBILITY_TIMEOUT_SECONDS,
+    )
+    await broker.connect()
+    event_hub.start()
+    worker = MailIngestWorker(
+        broker,
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+        concurrency=settings.INGEST_CONCURRENCY,
+        batch_size=settings.INGEST_BATCH_SIZE,
+        max_attempts=settings.INGEST_MAX_ATTEMPTS,
+        max_rows_per_second=settings.INGEST_MAX_ROWS_PER_SECOND,
+    )
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+
+    metrics_server: Optional[asyncio.AbstractServer] = None
+    if settings.INGEST_METRICS_PORT:
+        metrics_server = await start_metrics_server(settings.INGEST_METRICS_PORT)
+    logger.info("Mail ingest worker started: %s", settings.INGEST_BROKER_URL.split("@")[-1])
+    try:
+        await worker.run()
+    finally:
+        if metrics_server is not None:
+            metrics_server.close()
+        await broker.close()
+        await event_hub.stop()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
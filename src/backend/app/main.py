@@ -1,11 +1,32 @@
-from fastapi import FastAPI
+import logging
+
+# Первым: от этого импорта отсчитывается фаза import в app_startup_seconds
+from app.core.startup import startup_state, warm_pool
+
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy.orm import configure_mappers
 
-from app.api.routes import auth, users, tickets
+from app.api.routes import auth, users, tickets, stats, health
 
 from app.db.base import Base
 
-from app.db.session import engine
+from app.db.session import get_engine, read_router
+
+from app.core.security import PasswordHashingOverloaded, preload_crypto
+from app.core.metrics import REGISTRY, CONTENT_TYPE_LATEST
+from app.core.cache import shared_cache
+from app.core.request_metrics import RequestMetricsMiddleware
+
+from app.similarity.engine import similarity_engine, SimilarityIndexNotReady
+from app.drafts.worker import draft_worker
+from app.archive.mover import archive_mover
+from app.events.hub import event_hub
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.startup")
 
 app = FastAPI(title="MaksosTeam Project API")
 
@@ -22,16 +43,92 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Последним, чтобы быть внешним слоем и учитывать время всех остальных
+app.add_middleware(
+    RequestMetricsMiddleware,
+    slow_seconds=settings.SLOW_REQUEST_SECONDS,
+    slow_queries=settings.SLOW_REQUEST_QUERIES,
+    max_statements=settings.SLOW_REQUEST_MAX_STATEMENTS,
+)
+
+@app.exception_handler(PasswordHashingOverloaded)
+async def password_hashing_overloaded_handler(request: Request, exc: PasswordHashingOverloaded):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Too many concurrent password operations, retry later"},
+        headers={"Retry-After": "1"},
+    )
+
+@app.exception_handler(SimilarityIndexNotReady)
+async def similarity_index_not_ready_handler(request: Request, exc: SimilarityIndexNotReady):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Similarity index is warming up, retry later"},
+        headers={"Retry-After": "5"},
+    )
+
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(tickets.router)
+app.include_router(stats.router)
+app.include_router(health.router)
+
+startup_state.imported()
+
+
+async def warm_up() -> None:
+    """То, что иначе досталось бы первым запросам; uvicorn примет соединения только после этого"""
+    with startup_state.phase("mappers"):
+        configure_mappers()
+    with startup_state.phase("crypto"):
+        preload_crypto()
+
+    connections = settings.DB_POOL_SIZE if settings.STARTUP_WARM_CONNECTIONS < 0 else settings.STARTUP_WARM_CONNECTIONS
+    # Соединения сверх pool_size закрываются при возврате в пул, прогревать их бесполезно
+    connections = min(connections, settings.DB_POOL_SIZE)
+    if not connections:
+        return
+    with startup_state.phase("pool"):
+        for pool_engine in (get_engine(), *read_router.engines):
+            try:
+                await warm_pool(pool_engine, connections)
+            except Exception as e:
+                # Не падаем: недоступная БД видна в /health/ready, реплики роутер пропускает сам
+                logger.warning("Pool warm-up failed for %s: %r", pool_engine.url.render_as_string(), e)
+
 
 @app.on_event("startup")
 async def on_startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Схему создают миграции (python -m app.cli.serve); create_all — для разработки без них
+    if settings.DB_CREATE_ALL:
+        with startup_state.phase("create_all"):
+            async with get_engine().begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+    await warm_up()
+    similarity_engine.start()
+    event_hub.start()
+    if settings.DRAFTS_ENABLED and settings.DRAFT_WORKER_IN_API:
+        draft_worker.start()
+    if settings.ARCHIVE_ENABLED and settings.ARCHIVE_MOVER_IN_API:
+        archive_mover.start()
+    startup_state.mark_ready()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    startup_state.mark_stopping()
+    await similarity_engine.stop()
+    await draft_worker.stop()
+    await archive_mover.stop()
+    await event_hub.stop()
+    await shared_cache.close()
 
 
 @app.get("/")
 async def root():
     return {"message": "API is running"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE_LATEST)
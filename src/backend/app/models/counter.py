@@ -0,0 +1,10 @@
+from sqlalchemy import Column, String, BigInteger
+from app.db.base import Base
+
+
+class RowCounter(Base):
+    """Денормализованные счётчики строк для TotalStrategy.COUNTER"""
+    __tablename__ = "row_counters"
+
+    key = Column(String(128), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Text, Enum, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+from app.core.enums import DraftStatus
+
+
+class TicketDraft(Base):
+    """Автоматический черновик ответа на тикет; строка в статусе PENDING — задача в очереди"""
+    __tablename__ = "ticket_drafts"
+    __table_args__ = (
+        # Выборка задач: WHERE status = 'PENDING' ORDER BY created_at
+        Index("ix_ticket_drafts_status_created_at", "status", "created_at"),
+    )
+
+    ticket_id = Column(Integer, ForeignKey("tickets.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(Enum(DraftStatus), nullable=False, default=DraftStatus.PENDING)
+
+    # sha256 нормализованных темы и описания: одинаковые письма получают один черновик
+    content_hash = Column(String(64), nullable=False, index=True)
+    drafter = Column(String(64), nullable=True)
+    draft = Column(Text, nullable=True)
+    from_cache = Column(Boolean, nullable=False, default=False)
+    error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Computed, Integer, BigInteger, Float, String, Text, Enum, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+from app.core.enums import TicketPriority, StatsDimension
+
+
+class TicketStat(Base):
+    """Запись таблицы статистики: кто, с какой проблемой, что ответили и как быстро.
+
+    Пишется при первом ответе оператора. Тема и ответ копируются, а ticket_id
+    не ссылается на tickets, чтобы статистика не зависела от судьбы тикета.
+    Удаление клиента или оператора запись тоже не удаляет и не блокирует:
+    client_id и operator_id становятся NULL, агрегаты не меняются.
+    """
+    __tablename__ = "ticket_stats"
+    __table_args__ = (
+        # Лента записей: ORDER BY answered_at DESC, id DESC
+        Index("ix_ticket_stats_answered_at_id", "answered_at", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    ticket_id = Column(Integer, nullable=False, unique=True)
+    client_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+    # NULL ещё у записей, перенесённых из тикетов, отвеченных до появления статистики
+    operator_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+    priority = Column(Enum(TicketPriority), nullable=False)
+
+    problem = Column(String(255), nullable=False)
+    solution = Column(Text, nullable=False)
+
+    ticket_created_at = Column(DateTime(timezone=True), nullable=False)
+    answered_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    first_response_seconds = Column(
+        Float,
+        Computed("EXTRACT(EPOCH FROM answered_at - ticket_created_at)::double precision", persisted=True),
+        info={"sqlite_computed": "(julianday(answered_at) - julianday(ticket_created_at)) * 86400.0"},
+    )
+
+
+class StatsRollup(Base):
+    """Агрегаты по ticket_stats, обновляются в той же транзакции, что и запись статистики"""
+    __tablename__ = "ticket_stats_rollups"
+
+    dimension = Column(Enum(StatsDimension), primary_key=True)
+    key = Column(String(64), primary_key=True)
+    answered = Column(BigInteger, nullable=False, default=0)
+    first_response_seconds_sum = Column(Float, nullable=False, default=0)
+    first_response_seconds_max = Column(Float, nullable=False, default=0)
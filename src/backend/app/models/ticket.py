@@ -1,10 +1,65 @@
-from sqlalchemy import Column, Integer, String, Text, Enum, Boolean, DateTime, ForeignKey
-from sqlalchemy.sql import func
+from sqlalchemy import (
+    Column, Computed, Integer, String, Text, Enum, Boolean, DateTime, ForeignKey, Index, case, literal_column, null
+)
+from sqlalchemy.sql.elements import Grouping
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
+from sqlalchemy.sql import func, text
 from app.db.base import Base
 from app.core.enums import TicketPriority
 
+# Конфигурация russian разбирает латиницу стеммером english_stem,
+# поэтому одного вектора хватает для русских и английских писем
+SEARCH_CONFIG = "russian"
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('russian', coalesce(topic, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('russian', coalesce(response, '')), 'C')"
+)
+
+# Срочность: 0 — самый срочный. Сортировка «срочные, затем старые» по (rank, created_at, id)
+# идёт в одном направлении, поэтому её обслуживают обычный keyset-курсор и индекс
+PRIORITY_RANK = {TicketPriority.HIGH: 0, TicketPriority.MIDDLE: 1, TicketPriority.LOW: 2}
+
+
+def priority_rank(priority):
+    """Выражение срочности для колонки priority.
+
+    Значения — литералы, а не параметры: иначе выражение в запросе не совпало
+    бы с выражением индекса и планировщик не смог бы его использовать. Скобки
+    нужны CREATE INDEX, ELSE NULL — alembic check: так Postgres хранит выражение.
+    """
+    return Grouping(case(
+        *((priority == literal_column(f"'{value.name}'"), literal_column(str(rank)))
+          for value, rank in PRIORITY_RANK.items()),
+        else_=null(),
+    ))
+
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        # Keyset-пагинация: ORDER BY created_at DESC, id DESC
+        Index("ix_tickets_created_at_id", "created_at", "id"),
+        Index("ix_tickets_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Досинхронизация индекса похожих обращений: WHERE created_at > :t OR updated_at > :t
+        Index("ix_tickets_updated_at", "updated_at"),
+        Index("ix_tickets_search_vector", "search_vector", postgresql_using="gin").ddl_if(dialect="postgresql"),
+        # Фильтры списка операторов: priority = :p и/или awaits_response, порядок по (created_at, id)
+        Index("ix_tickets_priority_created_at_id", "priority", "created_at", "id"),
+        Index(
+            "ix_tickets_awaiting_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("awaits_response"),
+            sqlite_where=text("awaits_response"),
+        ),
+        # id перенесённых в архив тикетов не должны достаться новым: без AUTOINCREMENT
+        # SQLite выдаёт max(rowid) + 1 (в PostgreSQL id из последовательности и так не повторяются)
+        {"sqlite_autoincrement": True},
+    )
+    # Без RETURNING серверных значений: иначе INSERT и UPDATE возвращали бы search_vector
+    # целиком, а в SQLite этой колонки нет. create и update_response всё равно делают refresh
+    __mapper_args__ = {"eager_defaults": False}
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -16,6 +71,80 @@ class Ticket(Base):
     awaits_response = Column(Boolean, default=True, nullable=False)
 
     response = Column(Text, nullable=True)
+
+    # Оператор, взявший тикет из очереди, и до какого момента он закреплён за ним
+    claimed_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    claimed_until = Column(DateTime(timezone=True), nullable=True)
+
+    # Message-ID письма, из которого создан тикет; уникальность защищает от повторной доставки
+    message_id = Column(String(255), nullable=True, unique=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Генерируемая колонка для полнотекстового поиска; не загружается вместе с тикетом
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True), info={"postgresql_only": True})
+    )
+
+
+# Выражения индексов ссылаются на колонки, поэтому объявлены после класса.
+# Сортировка «срочные, затем старые»; частичный индекс — ещё и очередь операторов (claim_next)
+Index("ix_tickets_priority_rank_created_at_id", priority_rank(Ticket.priority), Ticket.created_at, Ticket.id)
+Index(
+    "ix_tickets_work_queue",
+    priority_rank(Ticket.priority),
+    Ticket.created_at,
+    Ticket.id,
+    postgresql_where=text("awaits_response"),
+    sqlite_where=text("awaits_response"),
+)
+
+
+class ArchivedTicket(Base):
+    """Отвеченный тикет, перенесённый из tickets фоновым переносом (app.archive.mover).
+
+    Колонки те же, что у Ticket, кроме закрепления за оператором (в очереди
+    архивные тикеты не бывают); id сохраняется. Списки по умолчанию читают
+    только tickets, история подключается через include_archived.
+    """
+    __tablename__ = "tickets_archive"
+    __table_args__ = (
+        Index("ix_tickets_archive_created_at_id", "created_at", "id"),
+        Index("ix_tickets_archive_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_tickets_archive_priority_created_at_id", "priority", "created_at", "id"),
+        Index("ix_tickets_archive_search_vector", "search_vector", postgresql_using="gin").ddl_if(
+            dialect="postgresql"
+        ),
+    )
+    __mapper_args__ = {"eager_defaults": False}
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+
+    topic = Column(String(255), nullable=False)
+    description = Column(Text, nullable=False)
+    priority = Column(Enum(TicketPriority), nullable=False)
+
+    awaits_response = Column(Boolean, nullable=False)
+
+    response = Column(Text, nullable=True)
+
+    # Уникален только внутри архива: повторная доставка письма приходит раньше, чем тикет сюда попадёт
+    message_id = Column(String(255), nullable=True, unique=True)
+
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True), info={"postgresql_only": True})
+    )
+
+
+Index(
+    "ix_tickets_archive_priority_rank_created_at_id",
+    priority_rank(ArchivedTicket.priority),
+    ArchivedTicket.created_at,
+    ArchivedTicket.id,
+)
@@ -0,0 +1,132 @@
+import json
+import random
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select, func, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.enums import TotalStrategy
+from app.models.counter import RowCounter
+
+
+class Total(NamedTuple):
+    value: Optional[int]
+    strategy: TotalStrategy
+
+
+TICKETS_KEY = "tickets"
+USERS_KEY = "users"
+# Тикеты в tickets_archive; TICKETS_KEY и user_tickets_key считают только tickets
+TICKETS_ARCHIVED_KEY = "tickets:archived"
+
+
+# Версии списков тикетов: растут при любом изменении, на них построены ETag и кэш страниц
+TICKETS_VERSION_KEY = "tickets:version"
+
+# Счётчики, которые меняет почти каждая запись тикета, и число долей каждого. Одну строку
+# такая транзакция держала бы заблокированной до commit, и параллельные записи всех
+# процессов шли бы за ней по очереди. Поэтому значение разбито на строки-доли: приращение
+# уходит в одну случайную, значение — их сумма (так же транзакционно и так же на репликах).
+# Доля 0 — сама строка key, поэтому прежнее значение продолжается без миграции
+SHARDED_KEYS = {
+    TICKETS_KEY: 16,
+    TICKETS_VERSION_KEY: 16,
+}
+
+
+def user_tickets_key(user_id: int) -> str:
+    return f"tickets:user:{user_id}"
+
+
+def user_archived_tickets_key(user_id: int) -> str:
+    return f"tickets:user:{user_id}:archived"
+
+
+def user_tickets_version_key(user_id: int) -> str:
+    return f"tickets:user:{user_id}:version"
+
+
+def shard_keys(key: str) -> list[str]:
+    """Строки row_counters, в которых хранится счётчик key"""
+    return [key] + [f"{key}:{shard}" for shard in range(1, SHARDED_KEYS.get(key, 1))]
+
+
+class CounterRepository:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @property
+    def _dialect(self):
+        return self.session.bind.dialect
+
+    async def increment(self, key: str, delta: int = 1) -> None:
+        """Изменяет счётчик в текущей транзакции, commit делает вызывающий"""
+        await self.increment_many({key: delta})
+
+    async def increment_many(self, deltas: dict[str, int]) -> None:
+        """Меняет несколько счётчиков одним upsert; ключи сортируются, чтобы параллельные
+        транзакции брали блокировки строк в одном порядке и не ловили deadlock"""
+        if not deltas:
+            return
+        deltas = {random.choice(shard_keys(key)): delta for key, delta in deltas.items()}
+        insert = sqlite.insert if self._dialect.name == "sqlite" else postgresql.insert
+        stmt = insert(RowCounter).values([{"key": key, "value": deltas[key]} for key in sorted(deltas)])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[RowCounter.key],
+            set_={"value": RowCounter.value + stmt.excluded.value},
+        )
+        await self.session.execute(stmt)
+
+    async def get(self, key: str) -> Optional[int]:
+        """Значение счётчика; None — счётчика ещё нет"""
+        if key in SHARDED_KEYS:
+            result = await self.session.execute(
+                select(func.sum(RowCounter.value)).where(RowCounter.key.in_(shard_keys(key)))
+            )
+            value = result.scalar()
+            return None if value is None else int(value)
+        result = await self.session.execute(
+            select(RowCounter.value).where(RowCounter.key == key)
+        )
+        return result.scalar()
+
+    async def total(
+        self, model, *criteria, strategy: TotalStrategy, counter_key: str
+    ) -> Total:
+        """Считает total выбранной стратегией; если она недоступна — падает до точного COUNT"""
+        if strategy == TotalStrategy.NONE:
+            return Total(None, strategy)
+
+        if strategy == TotalStrategy.COUNTER:
+            value = await self.get(counter_key)
+            if value is not None:
+                return Total(value, strategy)
+
+        if strategy == TotalStrategy.ESTIMATE and self._dialect.name == "postgresql":
+            value = await self._estimate(model, *criteria)
+            if value is not None:
+                return Total(value, strategy)
+
+        result = await self.session.execute(
+            select(func.count()).select_from(model).where(*criteria)
+        )
+        return Total(result.scalar(), TotalStrategy.EXACT)
+
+    async def _estimate(self, model, *criteria) -> Optional[int]:
+        if not criteria:
+            result = await self.session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+                {"table": model.__tablename__},
+            )
+            value = result.scalar()
+            # -1: таблица ещё ни разу не анализировалась
+            return value if value is not None and value >= 0 else None
+
+        query = select(*model.__table__.primary_key.columns).where(*criteria)
+        compiled = query.compile(dialect=self._dialect, compile_kwargs={"literal_binds": True})
+        result = await self.session.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,131 @@
+import hashlib
+from datetime import timedelta
+from typing import List, Optional
+
+from sqlalchemy import select, update, insert, func, or_, and_
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.enums import DraftStatus
+from app.models.draft import TicketDraft
+from app.models.ticket import Ticket
+
+
+def draft_content_hash(topic: str, description: str) -> str:
+    """Хеш текста обращения без учёта регистра, «ё» и пробелов"""
+    normalized = " ".join(f"{topic}\n{description}".lower().replace("ё", "е").split())
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+class DraftRepository:
+    def __init__(self, session: AsyncSession, read_session: Optional[AsyncSession] = None):
+        self.session = session
+        self.read_session = read_session or session
+
+    async def enqueue(self, tickets: List[tuple[int, str, str]]) -> None:
+        """Ставит черновики (ticket_id, topic, description) в очередь; commit делает вызывающий"""
+        if not settings.DRAFTS_ENABLED or not tickets:
+            return
+        await self.session.execute(
+            insert(TicketDraft),
+            [
+                {
+                    "ticket_id": ticket_id,
+                    "status": DraftStatus.PENDING,
+                    "content_hash": draft_content_hash(topic, description),
+                }
+                for ticket_id, topic, description in tickets
+            ],
+        )
+
+    async def get(self, ticket_id: int) -> Optional[TicketDraft]:
+        result = await self.read_session.execute(select(TicketDraft).where(TicketDraft.ticket_id == ticket_id))
+        return result.scalars().first()
+
+    async def claim(self, limit: int, stale_after: timedelta) -> List[Row]:
+        """Забирает до limit задач: PENDING и зависшие RUNNING (процесс упал посреди задачи).
+
+        SKIP LOCKED позволяет нескольким процессам разбирать очередь без
+        конфликтов. Возвращает строки (ticket_id, content_hash, topic,
+        description, created_at, started_at).
+        """
+        candidates = (
+            select(TicketDraft.ticket_id)
+            .where(or_(
+                TicketDraft.status == DraftStatus.PENDING,
+                and_(TicketDraft.status == DraftStatus.RUNNING, TicketDraft.started_at < func.now() - stale_after),
+            ))
+            .order_by(TicketDraft.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.session.execute(
+            update(TicketDraft)
+            .where(TicketDraft.ticket_id.in_(candidates.scalar_subquery()))
+            .values(status=DraftStatus.RUNNING, started_at=func.now())
+            .returning(TicketDraft.ticket_id)
+        )
+        ticket_ids = result.scalars().all()
+        if not ticket_ids:
+            await self.session.commit()
+            return []
+
+        result = await self.session.execute(
+            select(
+                TicketDraft.ticket_id,
+                TicketDraft.content_hash,
+                Ticket.topic,
+                Ticket.description,
+                # Разность считает вызывающий: SQLite вычитает метки времени как числа
+                TicketDraft.created_at,
+                TicketDraft.started_at,
+            )
+            .join(Ticket, Ticket.id == TicketDraft.ticket_id)
+            .where(TicketDraft.ticket_id.in_(ticket_ids))
+        )
+        jobs = result.all()
+        await self.session.commit()
+        return jobs
+
+    async def find_cached(self, content_hash: str, drafter: str) -> Optional[str]:
+        """Готовый черновик того же drafter для обращения с тем же текстом"""
+        result = await self.session.execute(
+            select(TicketDraft.draft)
+            .where(
+                TicketDraft.content_hash == content_hash,
+                TicketDraft.status == DraftStatus.READY,
+                TicketDraft.drafter == drafter,
+            )
+            .limit(1)
+        )
+        return result.scalar()
+
+    async def _finish(self, ticket_id: int, **values) -> bool:
+        """Закрывает задачу, если её не отменили; False — результат уже не нужен"""
+        result = await self.session.execute(
+            update(TicketDraft)
+            .where(TicketDraft.ticket_id == ticket_id, TicketDraft.status == DraftStatus.RUNNING)
+            .values(finished_at=func.now(), **values)
+        )
+        await self.session.commit()
+        return result.rowcount > 0
+
+    async def complete(self, ticket_id: int, draft: str, drafter: str, from_cache: bool) -> bool:
+        return await self._finish(
+            ticket_id, status=DraftStatus.READY, draft=draft, drafter=drafter, from_cache=from_cache
+        )
+
+    async def fail(self, ticket_id: int, error: str, drafter: str) -> bool:
+        return await self._finish(ticket_id, status=DraftStatus.FAILED, error=error, drafter=drafter)
+
+    async def cancel(self, ticket_id: int) -> None:
+        """Отменяет незавершённый черновик; commit делает вызывающий"""
+        await self.session.execute(
+            update(TicketDraft)
+            .where(
+                TicketDraft.ticket_id == ticket_id,
+                TicketDraft.status.in_([DraftStatus.PENDING, DraftStatus.RUNNING]),
+            )
+            .values(status=DraftStatus.CANCELLED, finished_at=func.now())
+        )
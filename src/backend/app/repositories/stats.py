@@ -0,0 +1,178 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import AsyncIterator, List, Optional, Tuple
+
+from sqlalchemy import select, update, func, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.enums import StatsDimension
+from app.models.stats import TicketStat, StatsRollup
+from app.models.ticket import Ticket
+from app.models.user import User
+
+
+def stats_day(moment: datetime) -> str:
+    """Ключ дневного агрегата: дата в UTC"""
+    return moment.astimezone(timezone.utc).date().isoformat()
+
+
+class StatsRepository:
+    def __init__(self, session: AsyncSession, read_session: Optional[AsyncSession] = None):
+        self.session = session
+        self.read_session = read_session or session
+
+    def _insert(self, table):
+        dialect_insert = sqlite.insert if self.session.bind.dialect.name == "sqlite" else postgresql.insert
+        return dialect_insert(table)
+
+    async def record_answer(self, ticket: Ticket, operator_id: Optional[int]) -> None:
+        """Пишет ответ в статистику; commit делает вызывающий.
+
+        Первый ответ создаёт запись и обновляет агрегаты, повторный только
+        меняет текст решения: время первого ответа и исполнитель остаются.
+        """
+        result = await self.session.execute(
+            self._insert(TicketStat)
+            .values(
+                ticket_id=ticket.id,
+                client_id=ticket.user_id,
+                operator_id=operator_id,
+                priority=ticket.priority,
+                problem=ticket.topic,
+                solution=ticket.response,
+                ticket_created_at=ticket.created_at,
+            )
+            .on_conflict_do_nothing(index_elements=[TicketStat.ticket_id])
+            .returning(TicketStat.answered_at, TicketStat.first_response_seconds)
+        )
+        inserted = result.first()
+        if inserted is None:
+            await self.session.execute(
+                update(TicketStat).where(TicketStat.ticket_id == ticket.id).values(solution=ticket.response)
+            )
+            return
+
+        keys = [
+            (StatsDimension.DAY, stats_day(inserted.answered_at)),
+            (StatsDimension.PRIORITY, ticket.priority.value),
+        ]
+        if operator_id is not None:
+            keys.append((StatsDimension.OPERATOR, str(operator_id)))
+        await self._add_to_rollups(keys, inserted.first_response_seconds)
+
+    async def _add_to_rollups(self, keys: List[Tuple[StatsDimension, str]], first_response_seconds: float) -> None:
+        """Один upsert на все разрезы; строки сортируются, чтобы параллельные ответы не ловили deadlock"""
+        stmt = self._insert(StatsRollup).values([
+            {
+                "dimension": dimension,
+                "key": key,
+                "answered": 1,
+                "first_response_seconds_sum": first_response_seconds,
+                "first_response_seconds_max": first_response_seconds,
+            }
+            for dimension, key in sorted(keys)
+        ])
+        # greatest() в SQLite нет, там max() с двумя аргументами — скалярная функция
+        greatest = func.max if self.session.bind.dialect.name == "sqlite" else func.greatest
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[StatsRollup.dimension, StatsRollup.key],
+            set_={
+                "answered": StatsRollup.answered + stmt.excluded.answered,
+                "first_response_seconds_sum": (
+                    StatsRollup.first_response_seconds_sum + stmt.excluded.first_response_seconds_sum
+                ),
+                "first_response_seconds_max": greatest(
+                    StatsRollup.first_response_seconds_max, stmt.excluded.first_response_seconds_max
+                ),
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def get_records(
+        self, skip: int = 0, limit: int = 10, after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Row]:
+        """Записи статистики от новых к старым с email клиента и исполнителя: (TicketStat, client_email, operator_email)"""
+        client = aliased(User)
+        operator = aliased(User)
+        query = (
+            select(TicketStat, client.email, operator.email)
+            .outerjoin(client, client.id == TicketStat.client_id)
+            .outerjoin(operator, operator.id == TicketStat.operator_id)
+        )
+        if after is not None:
+            query = query.where(tuple_(TicketStat.answered_at, TicketStat.id) < tuple_(*after))
+        result = await self.read_session.execute(
+            query.order_by(TicketStat.answered_at.desc(), TicketStat.id.desc()).offset(skip).limit(limit)
+        )
+        return result.all()
+
+    async def stream_for_export(
+        self, date_from: Optional[date] = None, date_to: Optional[date] = None, batch_size: int = 2000
+    ) -> AsyncIterator[Row]:
+        """Записи статистики за дни (UTC) по возрастанию answered_at через серверный курсор"""
+        client = aliased(User)
+        operator = aliased(User)
+        query = (
+            select(
+                TicketStat.ticket_id,
+                TicketStat.answered_at,
+                client.email,
+                operator.email,
+                TicketStat.priority,
+                TicketStat.problem,
+                TicketStat.solution,
+                TicketStat.first_response_seconds,
+            )
+            .outerjoin(client, client.id == TicketStat.client_id)
+            .outerjoin(operator, operator.id == TicketStat.operator_id)
+        )
+        if date_from is not None:
+            query = query.where(TicketStat.answered_at >= datetime.combine(date_from, time.min, timezone.utc))
+        if date_to is not None:
+            query = query.where(
+                TicketStat.answered_at < datetime.combine(date_to + timedelta(days=1), time.min, timezone.utc)
+            )
+        result = await self.read_session.stream(
+            query.order_by(TicketStat.answered_at, TicketStat.id).execution_options(yield_per=batch_size)
+        )
+        try:
+            async for row in result:
+                yield row
+        finally:
+            await result.close()
+
+    async def get_daily(self, date_from: date, date_to: date) -> List[StatsRollup]:
+        result = await self.read_session.execute(
+            select(StatsRollup)
+            .where(
+                StatsRollup.dimension == StatsDimension.DAY,
+                StatsRollup.key.between(date_from.isoformat(), date_to.isoformat()),
+            )
+            .order_by(StatsRollup.key)
+        )
+        return result.scalars().all()
+
+    async def get_by_operator(self) -> List[Tuple[StatsRollup, Optional[str]]]:
+        """Агрегаты по исполнителям с их email: (StatsRollup, email)"""
+        result = await self.read_session.execute(
+            select(StatsRollup)
+            .where(StatsRollup.dimension == StatsDimension.OPERATOR)
+            .order_by(StatsRollup.answered.desc())
+        )
+        rollups = result.scalars().all()
+        if not rollups:
+            return []
+        # Отдельным запросом: key — строка, и приводить его к id в JOIN небезопасно для других разрезов
+        result = await self.read_session.execute(
+            select(User.id, User.email).where(User.id.in_([int(rollup.key) for rollup in rollups]))
+        )
+        emails = dict(result.all())
+        return [(rollup, emails.get(int(rollup.key))) for rollup in rollups]
+
+    async def get_by_priority(self) -> List[StatsRollup]:
+        result = await self.read_session.execute(
+            select(StatsRollup).where(StatsRollup.dimension == StatsDimension.PRIORITY)
+        )
+        return result.scalars().all()
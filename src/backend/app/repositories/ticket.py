@@ -1,12 +1,125 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
-from app.models.ticket import Ticket
+from collections import Counter
+from functools import lru_cache
+from sqlalchemy import Select, select, insert, update, delete, func, tuple_, or_, null, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import aliased
+from app.models.ticket import Ticket, ArchivedTicket, SEARCH_CONFIG, priority_rank
+from app.models.user import User
 from app.schemas.ticket import TicketCreate
-from typing import List, Tuple, Optional
+from app.repositories.counter import (
+    CounterRepository, Total, TICKETS_KEY, TICKETS_ARCHIVED_KEY, TICKETS_VERSION_KEY,
+    user_tickets_key, user_archived_tickets_key, user_tickets_version_key,
+)
+from app.repositories.draft import DraftRepository
+from app.repositories.stats import StatsRepository
+from app.core.cache import ticket_page_cache, shared_cache, ModelCodec
+from app.core.config import settings
+from app.core.enums import TicketPriority, TicketSort, TotalStrategy
+from typing import AsyncIterator, Iterable, List, Tuple, Optional, Union
+from datetime import datetime, timedelta, timezone
+
+TICKET_CODEC = ModelCodec(Ticket)
+# Колонки, которые переносятся между tickets и tickets_archive; search_vector пересчитывается сам
+MOVED_COLUMNS = [
+    column.name for column in ArchivedTicket.__table__.c if column.name != "archived_at" and not column.computed
+]
+# Тикет из архива в формате TICKET_CODEC: закреплений у архивных тикетов нет
+ARCHIVED_CODEC_COLUMNS = [
+    ArchivedTicket.__table__.c[key] if key in ArchivedTicket.__table__.c else null().label(key)
+    for key in TICKET_CODEC.keys
+]
+
+
+def ticket_cache_key(ticket_id: int) -> str:
+    return f"ticket:{ticket_id}"
+
+
+@lru_cache
+def ticket_history(with_search_vector: bool = True):
+    """Ticket поверх UNION ALL tickets и tickets_archive — для запросов с include_archived.
+
+    Postgres раскрывает UNION ALL: условия уходят в обе таблицы, а
+    ORDER BY ... LIMIT становится Merge Append по их индексам, архив целиком
+    не читается. Колонки закрепления в архиве — NULL; в SQLite нет search_vector.
+    """
+    hot, archive = Ticket.__table__, ArchivedTicket.__table__
+    names = [column.name for column in hot.c if with_search_vector or not column.info.get("postgresql_only")]
+    rows = union_all(
+        select(*(hot.c[name] for name in names)),
+        select(*(
+            archive.c[name] if name in archive.c else null().cast(hot.c[name].type).label(name)
+            for name in names
+        )),
+    ).subquery("tickets_history")
+    return aliased(Ticket, rows, name="ticket_history")
+
+
+def _sum_totals(*totals: Total) -> Total:
+    """Total по нескольким таблицам: неизвестен, если неизвестен хотя бы один"""
+    if any(total.value is None for total in totals):
+        return Total(None, totals[0].strategy)
+    strategies = {total.strategy for total in totals}
+    # Точный COUNT плюс счётчик — уже не точный
+    strategy = strategies.pop() if len(strategies) == 1 else (strategies - {TotalStrategy.EXACT}).pop()
+    return Total(sum(total.value for total in totals), strategy)
+
 
 class TicketRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, read_session: Optional[AsyncSession] = None):
         self.session = session
+        # Чтения списков и карточек можно отправить в реплику; записи всегда в primary
+        self.read_session = read_session or session
+        self.counters = CounterRepository(session)
+        self.read_counters = CounterRepository(self.read_session)
+        self.drafts = DraftRepository(session, self.read_session)
+        self.stats = StatsRepository(session, self.read_session)
+
+    def _source(self, include_archived: bool):
+        """Ticket или ticket_history(): откуда читать списки"""
+        if not include_archived:
+            return Ticket
+        return ticket_history(self.read_session.bind.dialect.name == "postgresql")
+
+    @staticmethod
+    def _paginate(
+        query: Select,
+        skip: int,
+        limit: int,
+        after: Optional[tuple],
+        model=Ticket,
+        sort: TicketSort = TicketSort.NEWEST,
+    ) -> Select:
+        """Keyset-пагинация; after — ключ сортировки последней строки предыдущей страницы.
+
+        NEWEST и OLDEST идут по (created_at, id), PRIORITY — по (rank, created_at, id)
+        по возрастанию, см. priority_rank.
+        """
+        if sort == TicketSort.PRIORITY:
+            key = (priority_rank(model.priority), model.created_at, model.id)
+        else:
+            key = (model.created_at, model.id)
+        if sort == TicketSort.NEWEST:
+            if after is not None:
+                query = query.where(tuple_(*key) < tuple_(*after))
+            query = query.order_by(*(column.desc() for column in key))
+        else:
+            if after is not None:
+                query = query.where(tuple_(*key) > tuple_(*after))
+            query = query.order_by(*key)
+        return query.offset(skip).limit(limit)
+
+    @staticmethod
+    def _version_keys(user_ids: Iterable[int]) -> List[str]:
+        """Версии списков, которые меняет запись тикетов этих пользователей"""
+        return [TICKETS_VERSION_KEY, *(user_tickets_version_key(user_id) for user_id in set(user_ids))]
+
+    async def get_list_version(self, user_id: Optional[int] = None) -> Tuple[str, int]:
+        """Ключ и текущая версия списка: всех тикетов или тикетов пользователя"""
+        key = TICKETS_VERSION_KEY if user_id is None else user_tickets_version_key(user_id)
+        return key, await self.read_counters.get(key) or 0
 
     async def create(self, ticket_in: TicketCreate, user_id: int) -> Ticket:
         db_ticket = Ticket(
@@ -17,59 +130,568 @@ class TicketRepository:
             awaits_response=True
         )
         self.session.add(db_ticket)
+        await self.session.flush()
+        await self.drafts.enqueue([(db_ticket.id, db_ticket.topic, db_ticket.description)])
+        version_keys = self._version_keys([user_id])
+        await self.counters.increment_many({
+            TICKETS_KEY: 1,
+            user_tickets_key(user_id): 1,
+            **dict.fromkeys(version_keys, 1),
+        })
         await self.session.commit()
+        ticket_page_cache.invalidate(*version_keys)
         await self.session.refresh(db_ticket)
         return db_ticket
 
+    async def create_many(
+        self, rows: List[dict], skip_duplicates: bool = False
+    ) -> List[Union[int, None, DBAPIError]]:
+        """Вставляет порцию тикетов одним INSERT ... RETURNING и коммитит её.
+
+        Если порция не вставилась целиком, строки повторяются по одной в
+        SAVEPOINT, чтобы отбросить только ошибочные. Возвращает id или ошибку
+        для каждой строки, в порядке rows. С skip_duplicates строки с уже
+        известным message_id пропускаются (ON CONFLICT DO NOTHING) и дают None;
+        известным считается и message_id тикета, уже перенесённого в архив.
+        """
+        if skip_duplicates:
+            # ON CONFLICT видит только tickets: поздняя повторная доставка после переноса
+            # в архив иначе создала бы второй тикет
+            message_ids = [row["message_id"] for row in rows if row.get("message_id")]
+            if message_ids:
+                result = await self.session.execute(
+                    select(ArchivedTicket.message_id).where(ArchivedTicket.message_id.in_(message_ids))
+                )
+                archived = set(result.scalars().all())
+                if archived:
+                    fresh = [row for row in rows if row.get("message_id") not in archived]
+                    outcomes = iter(await self.create_many(fresh, skip_duplicates=True) if fresh else [])
+                    return [None if row.get("message_id") in archived else next(outcomes) for row in rows]
+            dialect_insert = sqlite.insert if self.session.bind.dialect.name == "sqlite" else postgresql.insert
+            stmt = (
+                dialect_insert(Ticket)
+                .on_conflict_do_nothing(index_elements=[Ticket.message_id])
+                .returning(Ticket.message_id, Ticket.id)
+            )
+        else:
+            stmt = insert(Ticket).returning(Ticket.id, sort_by_parameter_order=True)
+
+        async def execute(batch: List[dict]) -> list:
+            result = await self.session.execute(stmt, batch)
+            if not skip_duplicates:
+                return list(result.scalars().all())
+            # Пропущенные строки RETURNING не возвращает, сопоставляем по message_id
+            inserted = dict(result.all())
+            return [inserted.get(row["message_id"]) for row in batch]
+
+        try:
+            async with self.session.begin_nested():
+                outcomes = await execute(rows)
+        except DBAPIError:
+            outcomes = []
+            for row in rows:
+                try:
+                    async with self.session.begin_nested():
+                        outcomes.extend(await execute([row]))
+                except DBAPIError as e:
+                    outcomes.append(e)
+
+        per_user = Counter(row["user_id"] for row, outcome in zip(rows, outcomes) if isinstance(outcome, int))
+        if per_user:
+            deltas = {user_tickets_key(user_id): count for user_id, count in per_user.items()}
+            deltas[TICKETS_KEY] = sum(per_user.values())
+            deltas.update(dict.fromkeys(self._version_keys(per_user), 1))
+            await self.counters.increment_many(deltas)
+            await self.drafts.enqueue([
+                (outcome, row["topic"], row["description"])
+                for row, outcome in zip(rows, outcomes)
+                if isinstance(outcome, int)
+            ])
+        await self.session.commit()
+        if per_user:
+            ticket_page_cache.invalidate(*self._version_keys(per_user))
+        return outcomes
+
     async def get_by_id(self, ticket_id: int, user_id: Optional[int] = None) -> Optional[Ticket]:
-        query = select(Ticket).where(Ticket.id == ticket_id)
-        if user_id:
-            query = query.where(Ticket.user_id == user_id)
-        result = await self.session.execute(query)
-        return result.scalars().first()
+        """Тикет через общий кэш; с user_id — только если он принадлежит этому пользователю"""
+        data = await shared_cache.get_or_load(
+            ticket_cache_key(ticket_id), lambda: self._load_cached(ticket_id), settings.CACHE_TICKET_TTL_SECONDS
+        )
+        if data is None or (user_id and data["user_id"] != user_id):
+            return None
+        return TICKET_CODEC.load(data)
+
+    async def _load_cached(self, ticket_id: int) -> Optional[dict]:
+        result = await self.read_session.execute(select(*TICKET_CODEC.columns).where(Ticket.id == ticket_id))
+        row = result.first()
+        if row is None:
+            # Карточка открывается по id и для архивных тикетов
+            result = await self.read_session.execute(
+                select(*ARCHIVED_CODEC_COLUMNS).where(ArchivedTicket.id == ticket_id)
+            )
+            row = result.first()
+        return TICKET_CODEC.dump(row) if row else None
 
-    async def get_by_user(self, user_id: int, skip: int = 0, limit: int = 10) -> Tuple[List[Ticket], int]:
-        count_result = await self.session.execute(
-            select(func.count(Ticket.id)).where(Ticket.user_id == user_id)
+    async def get_by_user(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 10,
+        after: Optional[Tuple[datetime, int]] = None,
+        total_strategy: TotalStrategy = TotalStrategy.EXACT,
+        include_archived: bool = False,
+    ) -> Tuple[List[Ticket], Total]:
+        total = await self.read_counters.total(
+            Ticket,
+            Ticket.user_id == user_id,
+            strategy=total_strategy,
+            counter_key=user_tickets_key(user_id),
         )
-        total = count_result.scalar()
-        
-        result = await self.session.execute(
-            select(Ticket)
-            .where(Ticket.user_id == user_id)
-            .order_by(Ticket.created_at.desc())
-            .offset(skip)
-            .limit(limit)
+        if include_archived:
+            total = _sum_totals(total, await self.read_counters.total(
+                ArchivedTicket,
+                ArchivedTicket.user_id == user_id,
+                strategy=total_strategy,
+                counter_key=user_archived_tickets_key(user_id),
+            ))
+
+        model = self._source(include_archived)
+        result = await self.read_session.execute(
+            self._paginate(select(model).where(model.user_id == user_id), skip, limit, after, model)
         )
         tickets = result.scalars().all()
         return tickets, total
 
-    async def get_all_tickets(self, skip: int = 0, limit: int = 10) -> Tuple[List[Ticket], int]:
+    async def get_all_tickets(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        after: Optional[Tuple[datetime, int]] = None,
+        total_strategy: TotalStrategy = TotalStrategy.EXACT,
+    ) -> Tuple[List[Ticket], Total]:
         """Получает все тикеты с пагинацией"""
-        count_result = await self.session.execute(
-            select(func.count(Ticket.id))
+        total = await self.read_counters.total(Ticket, strategy=total_strategy, counter_key=TICKETS_KEY)
+
+        result = await self.read_session.execute(
+            self._paginate(select(Ticket), skip, limit, after)
         )
-        total = count_result.scalar()
-        
-        result = await self.session.execute(
-            select(Ticket)
-            .order_by(Ticket.created_at.desc())
+        tickets = result.scalars().all()
+        return tickets, total
+
+    def all_tickets_query(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        after: Optional[tuple] = None,
+        priority: Optional[TicketPriority] = None,
+        awaits_response: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        user_email: Optional[str] = None,
+        sort: TicketSort = TicketSort.NEWEST,
+        include_archived: bool = False,
+    ) -> Select:
+        """Страница списка операторов: тикеты вместе с email и ролью автора.
+
+        Каждое сочетание фильтров и сортировки обслуживает индекс; проверка
+        планов — python -m benchmarks.listing. В архиве только отвеченные
+        тикеты, поэтому с awaits_response=true он не читается. При фильтре по
+        приоритету ранг один на всю выборку, и PRIORITY совпадает с OLDEST:
+        так план идёт по (priority, created_at, id), а не фильтрует индекс ранга.
+        """
+        if sort == TicketSort.PRIORITY and priority is not None:
+            sort, after = TicketSort.OLDEST, after and after[1:]
+        model = self._source(include_archived and awaits_response is not True)
+        query = self._filter(
+            select(model, User.email, User.role).outerjoin(User, User.id == model.user_id),
+            priority=priority,
+            awaits_response=awaits_response,
+            created_from=created_from,
+            created_to=created_to,
+            user_email=user_email,
+            model=model,
+        )
+        return self._paginate(query, skip, limit, after, model, sort)
+
+    async def get_all_tickets_with_users(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        after: Optional[tuple] = None,
+        total_strategy: TotalStrategy = TotalStrategy.EXACT,
+        priority: Optional[TicketPriority] = None,
+        awaits_response: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        user_email: Optional[str] = None,
+        sort: TicketSort = TicketSort.NEWEST,
+        include_archived: bool = False,
+    ) -> Tuple[List[Row], Total]:
+        """Получает тикеты вместе с email и ролью автора одним запросом (без N+1), с фильтрами"""
+        filters = {
+            "priority": priority,
+            "awaits_response": awaits_response,
+            "created_from": created_from,
+            "created_to": created_to,
+            "user_email": user_email,
+        }
+        if total_strategy == TotalStrategy.COUNTER and any(value is not None for value in filters.values()):
+            # Счётчики ведутся только по таблицам целиком
+            total_strategy = TotalStrategy.EXACT
+        total = await self.read_counters.total(
+            Ticket, *self._criteria(Ticket, **filters), strategy=total_strategy, counter_key=TICKETS_KEY
+        )
+        if include_archived and awaits_response is not True:
+            total = _sum_totals(total, await self.read_counters.total(
+                ArchivedTicket,
+                *self._criteria(ArchivedTicket, **filters),
+                strategy=total_strategy,
+                counter_key=TICKETS_ARCHIVED_KEY,
+            ))
+
+        result = await self.read_session.execute(
+            self.all_tickets_query(
+                skip=skip, limit=limit, after=after, sort=sort, include_archived=include_archived, **filters
+            )
+        )
+        rows = result.all()
+        return rows, total
+
+    async def get_by_ids(self, ticket_ids: List[int], include_archived: bool = False) -> List[Ticket]:
+        if not ticket_ids:
+            return []
+        model = self._source(include_archived)
+        result = await self.read_session.execute(select(model).where(model.id.in_(ticket_ids)))
+        return result.scalars().all()
+
+    @staticmethod
+    def _index_columns(model=Ticket) -> Select:
+        """Поля для индекса похожих обращений, без загрузки ответа целиком"""
+        return select(
+            model.id,
+            model.topic,
+            model.description,
+            model.response.isnot(None).label("answered"),
+            model.created_at,
+            model.updated_at,
+        )
+
+    async def get_index_batch(self, after_id: int = 0, limit: int = 1000) -> List[Row]:
+        """Порция тикетов для построения индекса похожих обращений (по возрастанию id), включая архив"""
+        model = self._source(include_archived=True)
+        result = await self.read_session.execute(
+            self._index_columns(model).where(model.id > after_id).order_by(model.id).limit(limit)
+        )
+        return result.all()
+
+    async def get_index_changes(self, since: datetime) -> List[Row]:
+        """Тикеты, созданные или изменённые после since; перенос в архив тикет не меняет"""
+        result = await self.read_session.execute(
+            self._index_columns().where(or_(Ticket.created_at > since, Ticket.updated_at > since))
+        )
+        return result.all()
+
+    @staticmethod
+    def _criteria(
+        model=Ticket,
+        priority: Optional[TicketPriority] = None,
+        awaits_response: Optional[bool] = None,
+        answered: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        user_email: Optional[str] = None,
+    ) -> list:
+        criteria = []
+        if priority is not None:
+            criteria.append(model.priority == priority)
+        if awaits_response is not None:
+            criteria.append(model.awaits_response == awaits_response)
+        if answered is not None:
+            criteria.append(model.response.isnot(None) if answered else model.response.is_(None))
+        if created_from is not None:
+            criteria.append(model.created_at >= created_from)
+        if created_to is not None:
+            criteria.append(model.created_at < created_to)
+        if user_email is not None:
+            # Подзапрос по уникальному email: дальше работает индекс (user_id, created_at, id).
+            # Без корреляции: в списке операторов users уже присоединена к тикетам
+            owner = select(User.id).where(User.email == user_email).correlate(None).scalar_subquery()
+            criteria.append(model.user_id == owner)
+        return criteria
+
+    @classmethod
+    def _filter(
+        cls,
+        query: Select,
+        priority: Optional[TicketPriority] = None,
+        awaits_response: Optional[bool] = None,
+        answered: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        user_email: Optional[str] = None,
+        model=Ticket,
+    ) -> Select:
+        return query.where(*cls._criteria(
+            model,
+            priority=priority,
+            awaits_response=awaits_response,
+            answered=answered,
+            created_from=created_from,
+            created_to=created_to,
+            user_email=user_email,
+        ))
+
+    async def stream_for_export(
+        self,
+        priority: Optional[TicketPriority] = None,
+        awaits_response: Optional[bool] = None,
+        answered: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        batch_size: int = 2000,
+        include_archived: bool = False,
+    ) -> AsyncIterator[Row]:
+        """Тикеты с email автора по возрастанию (created_at, id) через серверный курсор.
+
+        Выбираются колонки, а не объекты Ticket: строки не попадают в identity
+        map сессии, и память не растёт с объёмом выгрузки.
+        """
+        model = self._source(include_archived)
+        query = self._filter(
+            select(
+                model.id,
+                model.created_at,
+                model.updated_at,
+                User.email,
+                model.priority,
+                model.awaits_response,
+                model.topic,
+                model.description,
+                model.response,
+            ).outerjoin(User, User.id == model.user_id),
+            priority=priority,
+            awaits_response=awaits_response,
+            answered=answered,
+            created_from=created_from,
+            created_to=created_to,
+            model=model,
+        )
+        result = await self.read_session.stream(
+            query.order_by(model.created_at, model.id).execution_options(yield_per=batch_size)
+        )
+        try:
+            async for row in result:
+                yield row
+        finally:
+            await result.close()
+
+    async def search(
+        self,
+        query: str,
+        priority: Optional[TicketPriority] = None,
+        awaits_response: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        skip: int = 0,
+        limit: int = 10,
+        include_archived: bool = False,
+    ) -> List[Row]:
+        """Полнотекстовый поиск по теме, описанию и ответу (GIN по search_vector).
+
+        Возвращает строки (Ticket, rank, snippet); ts_headline считается
+        только для строк текущей страницы.
+        """
+        model = self._source(include_archived)
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        rank = func.ts_rank_cd(model.search_vector, ts_query)
+
+        matches = self._filter(
+            select(model.id, rank.label("rank")).where(model.search_vector.op("@@")(ts_query)),
+            priority=priority,
+            awaits_response=awaits_response,
+            created_from=created_from,
+            created_to=created_to,
+            model=model,
+        )
+        page = (
+            matches.order_by(rank.desc(), model.id.desc())
             .offset(skip)
             .limit(limit)
+            .subquery()
         )
-        tickets = result.scalars().all()
-        return tickets, total
-    
-    async def update_response(self, ticket_id: int, response: str, awaits_response: Optional[bool] = None) -> Optional[Ticket]:
-        """Обновляет ответ поддержки и флаг awaits_response"""
-        ticket = await self.get_by_id(ticket_id)
+
+        snippet = func.ts_headline(
+            SEARCH_CONFIG,
+            model.description,
+            ts_query,
+            "StartSel=<b>, StopSel=</b>, MaxWords=35, MinWords=15, MaxFragments=2",
+        )
+        result = await self.read_session.execute(
+            select(model, page.c.rank, snippet.label("snippet"))
+            .join(page, page.c.id == model.id)
+            .order_by(page.c.rank.desc(), model.id.desc())
+        )
+        return result.all()
+
+    async def claim_next(self, operator_id: int, ttl: timedelta) -> Optional[Ticket]:
+        """Закрепляет за оператором самый приоритетный и старый тикет, ждущий ответа.
+
+        FOR UPDATE SKIP LOCKED: параллельные операторы не ждут друг друга и не
+        получают один и тот же тикет. Закрепление с истёкшим сроком можно перехватить.
+        Время считается в Python: на SQLite func.now() + interval даёт число, а не дату.
+        """
+        now = datetime.now(timezone.utc)
+        next_ticket = (
+            select(Ticket.id)
+            .where(
+                Ticket.awaits_response,
+                or_(Ticket.claimed_until.is_(None), Ticket.claimed_until < now),
+            )
+            .order_by(priority_rank(Ticket.priority), Ticket.created_at, Ticket.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = await self.session.execute(
+            update(Ticket)
+            .where(Ticket.id == next_ticket)
+            # Закрепление не считается изменением тикета: updated_at не трогаем
+            .values(claimed_by=operator_id, claimed_until=now + ttl, updated_at=Ticket.updated_at)
+            .returning(Ticket)
+        )
+        ticket = result.scalars().first()
+        await self.session.commit()
+        if ticket:
+            await shared_cache.invalidate(ticket_cache_key(ticket.id))
+        return ticket
+
+    async def release_claim(self, ticket_id: int, operator_id: Optional[int] = None) -> bool:
+        """Снимает закрепление; с operator_id — только своё"""
+        query = update(Ticket).where(Ticket.id == ticket_id, Ticket.claimed_until.isnot(None))
+        if operator_id is not None:
+            query = query.where(Ticket.claimed_by == operator_id)
+        result = await self.session.execute(
+            query.values(claimed_by=None, claimed_until=None, updated_at=Ticket.updated_at)
+        )
+        await self.session.commit()
+        if result.rowcount:
+            await shared_cache.invalidate(ticket_cache_key(ticket_id))
+        return result.rowcount > 0
+
+    async def update_response(
+        self,
+        ticket_id: int,
+        response: str,
+        awaits_response: Optional[bool] = None,
+        operator_id: Optional[int] = None,
+    ) -> Optional[Ticket]:
+        """Обновляет ответ поддержки и флаг awaits_response, записывает ответ в статистику.
+
+        Архивный тикет сначала возвращается в tickets. Блокировка строки не даёт
+        переносу в архив забрать тикет, пока ответ не записан.
+        """
+        query = select(Ticket).where(Ticket.id == ticket_id).with_for_update()
+        ticket = (await self.session.execute(query)).scalars().first()
+        restored: dict = {}
         if not ticket:
-            return None
+            user_id = await self._restore(ticket_id)
+            if user_id is not None:
+                restored = self._move_deltas({user_id: 1}, archived=-1)
+            # Если тикет вернул параллельный ответ, он уже в tickets
+            ticket = (await self.session.execute(query)).scalars().first()
+            if not ticket:
+                return None
         
         ticket.response = response
         if awaits_response is not None:
             ticket.awaits_response = awaits_response
+        ticket.claimed_by = None
+        ticket.claimed_until = None
+        # Ответ уже есть: недописанный черновик больше не нужен
+        await self.drafts.cancel(ticket_id)
+        await self.stats.record_answer(ticket, operator_id)
+        version_keys = self._version_keys([ticket.user_id])
+        await self.counters.increment_many({**restored, **dict.fromkeys(version_keys, 1)})
         
         await self.session.commit()
+        ticket_page_cache.invalidate(*version_keys)
+        await shared_cache.invalidate(ticket_cache_key(ticket_id))
         await self.session.refresh(ticket)
-        return ticket
\ No newline at end of file
+        return ticket
+
+    @staticmethod
+    def _move_deltas(per_user: dict, archived: int) -> dict:
+        """Изменения счётчиков, когда archived тикетов уходят в архив (или возвращаются из него при < 0)"""
+        sign = 1 if archived > 0 else -1
+        deltas = {TICKETS_KEY: -archived, TICKETS_ARCHIVED_KEY: archived}
+        for user_id, count in per_user.items():
+            deltas[user_tickets_key(user_id)] = -sign * count
+            deltas[user_archived_tickets_key(user_id)] = sign * count
+        return deltas
+
+    async def archive_batch(self, cutoff: datetime, limit: int = 1000) -> int:
+        """Переносит в tickets_archive до limit отвеченных тикетов, созданных и изменённых до cutoff.
+
+        Кандидаты берутся FOR UPDATE SKIP LOCKED: параллельные переносы делят
+        работу, а тикет, на который сейчас отвечают, останется до следующего
+        прохода. Перенос, счётчики и версии списков — одна транзакция.
+        Возвращает число перенесённых тикетов.
+        """
+        result = await self.session.execute(
+            select(Ticket.id, Ticket.user_id)
+            .where(
+                Ticket.created_at < cutoff,
+                Ticket.response.isnot(None),
+                Ticket.awaits_response.is_(False),
+                func.coalesce(Ticket.updated_at, Ticket.created_at) < cutoff,
+            )
+            .order_by(Ticket.created_at, Ticket.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        rows = result.all()
+        if not rows:
+            await self.session.rollback()
+            return 0
+
+        ticket_ids = [row.id for row in rows]
+        hot = Ticket.__table__
+        await self.session.execute(
+            insert(ArchivedTicket).from_select(
+                MOVED_COLUMNS, select(*(hot.c[name] for name in MOVED_COLUMNS)).where(hot.c.id.in_(ticket_ids))
+            )
+        )
+        # Черновики удаляются каскадом: у отвеченного тикета они уже отменены
+        await self.session.execute(delete(Ticket).where(Ticket.id.in_(ticket_ids)))
+
+        per_user = Counter(row.user_id for row in rows)
+        version_keys = self._version_keys(per_user)
+        await self.counters.increment_many({
+            **self._move_deltas(per_user, archived=len(rows)),
+            **dict.fromkeys(version_keys, 1),
+        })
+        await self.session.commit()
+        # Карточки в shared_cache остаются верными: содержимое тикетов не изменилось
+        ticket_page_cache.invalidate(*version_keys)
+        return len(rows)
+
+    async def _restore(self, ticket_id: int) -> Optional[int]:
+        """Возвращает тикет из архива в tickets в текущей транзакции; user_id автора или None, если в архиве нет"""
+        archive = ArchivedTicket.__table__
+        result = await self.session.execute(
+            delete(ArchivedTicket)
+            .where(ArchivedTicket.id == ticket_id)
+            .returning(*(archive.c[name] for name in MOVED_COLUMNS))
+        )
+        row = result.first()
+        if row is None:
+            return None
+        values = dict(row._mapping)
+        if values["message_id"] is not None:
+            # Письмо, доставленное повторно во время переноса, могло создать тикет с тем же
+            # message_id: он остаётся за новым тикетом, уникальный индекс tickets не нарушается
+            taken = await self.session.execute(select(Ticket.id).where(Ticket.message_id == values["message_id"]))
+            if taken.first() is not None:
+                values["message_id"] = None
+        await self.session.execute(insert(Ticket).values(**values))
+        return row.user_id
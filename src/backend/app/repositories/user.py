@@ -1,40 +1,121 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, func
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects import postgresql, sqlite
 from typing import Optional
 
 from app.models.user import User
 
 from app.schemas.user import UserCreate, UserUpdate
 
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async, UNUSABLE_PASSWORD
+from app.core.cache import current_user_cache, ticket_page_cache, shared_cache, ModelCodec
+from app.core.config import settings
+from app.core.enums import TotalStrategy
+
+from app.repositories.counter import CounterRepository, Total, USERS_KEY, TICKETS_VERSION_KEY
+
+
+# Хеш пароля в общий кэш не попадает: логин читает его из БД (get_by_email(cached=False))
+USER_CODEC = ModelCodec(User, exclude=("hashed_password",))
+
+
+def user_id_cache_key(user_id: int) -> str:
+    return f"user:id:{user_id}"
+
+
+def user_email_cache_key(email: str) -> str:
+    return f"user:email:{email}"
 
 
 class UserRepository:
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, read_session: Optional[AsyncSession] = None):
         self.session = session
+        # Чтения можно отправить в реплику; записи и чтения после записи — в primary
+        self.read_session = read_session or session
+        self.counters = CounterRepository(session)
+        self.read_counters = CounterRepository(self.read_session)
 
-    async def get_by_email(self, email: str) -> Optional[User]:
-        result = await self.session.execute(select(User).where(User.email == email))
-        return result.scalars().first()
+    async def get_by_email(self, email: str, cached: bool = True) -> Optional[User]:
+        """Из кэша приходит пользователь без hashed_password; для проверки пароля нужен cached=False"""
+        if not cached:
+            result = await self.read_session.execute(select(User).where(User.email == email))
+            return result.scalars().first()
+        data = await shared_cache.get_or_load(
+            user_email_cache_key(email), lambda: self._load_cached(User.email == email), settings.CACHE_USER_TTL_SECONDS
+        )
+        return USER_CODEC.load(data) if data else None
 
     async def get_by_id(self, user_id: int) -> Optional[User]:
-        result = await self.session.execute(select(User).where(User.id == user_id))
+        data = await shared_cache.get_or_load(
+            user_id_cache_key(user_id), lambda: self._load_cached(User.id == user_id), settings.CACHE_USER_TTL_SECONDS
+        )
+        return USER_CODEC.load(data) if data else None
+
+    async def _load_cached(self, *criteria) -> Optional[dict]:
+        result = await self.read_session.execute(select(*USER_CODEC.columns).where(*criteria))
+        row = result.first()
+        return USER_CODEC.dump(row) if row else None
+
+    async def _get_by_id(self, session: AsyncSession, user_id: int) -> Optional[User]:
+        result = await session.execute(select(User).where(User.id == user_id))
         return result.scalars().first()
 
-    async def get_all(self, skip: int = 0, limit: int = 10) -> tuple[list[User], int]:
-        count_result = await self.session.execute(select(func.count(User.id)))
-        total = count_result.scalar()
-        
-        result = await self.session.execute(select(User).offset(skip).limit(limit))
+    async def get_ids_by_emails(self, emails: set[str]) -> dict[str, int]:
+        if not emails:
+            return {}
+        result = await self.read_session.execute(select(User.email, User.id).where(User.email.in_(emails)))
+        return dict(result.all())
+
+    async def get_or_create_ids(self, emails: set[str]) -> dict[str, int]:
+        """id пользователей по email; недостающие создаются без пароля (роль USER).
+
+        Коммит делает вызывающий: пользователи появляются вместе с их тикетами.
+        """
+        if not emails:
+            return {}
+        dialect_insert = sqlite.insert if self.session.bind.dialect.name == "sqlite" else postgresql.insert
+        result = await self.session.execute(
+            dialect_insert(User)
+            .on_conflict_do_nothing(index_elements=[User.email])
+            .returning(User.id),
+            [{"email": email, "hashed_password": UNUSABLE_PASSWORD} for email in sorted(emails)],
+        )
+        created = len(result.all())
+        if created:
+            await self.counters.increment(USERS_KEY, created)
+        result = await self.session.execute(select(User.email, User.id).where(User.email.in_(emails)))
+        return dict(result.all())
+
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        after_id: Optional[int] = None,
+        total_strategy: TotalStrategy = TotalStrategy.EXACT,
+    ) -> tuple[list[User], Total]:
+        total = await self.read_counters.total(User, strategy=total_strategy, counter_key=USERS_KEY)
+
+        query = select(User)
+        if after_id is not None:
+            query = query.where(User.id > after_id)
+        result = await self.read_session.execute(
+            query.order_by(User.id).offset(skip).limit(limit)
+        )
         users = result.scalars().all()
         return users, total
 
+    async def release_connection(self) -> None:
+        """Завершает текущую читающую транзакцию, чтобы не держать соединение во время хеширования"""
+        await self.session.commit()
+
     async def create(self, user_in: UserCreate) -> User:
+        await self.release_connection()
         db_user = User(
             email=user_in.email,
-            hashed_password=get_password_hash(user_in.password)
+            hashed_password=await get_password_hash_async(user_in.password)
         )
         self.session.add(db_user)
+        await self.counters.increment(USERS_KEY)
         await self.session.commit()
         await self.session.refresh(db_user)
         return db_user
@@ -43,22 +124,57 @@ class UserRepository:
         update_data = user_in.model_dump(exclude_unset=True)
         
         if "password" in update_data:
-            update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+            await self.release_connection()
+            update_data["hashed_password"] = await get_password_hash_async(update_data.pop("password"))
         
         if not update_data:
-            return await self.get_by_id(user_id)
+            return await self._get_by_id(self.session, user_id)
+
+        # Поля, которые видит CurrentUser: после изменения кэш авторизации сбрасывается
+        stale_email = None
+        if update_data.keys() & {"email", "is_active", "role"}:
+            existing = await self._get_by_id(self.session, user_id)
+            stale_email = existing.email if existing else None
+        # Email и роль автора показываются в /tickets/all
+        author_changed = bool(update_data.keys() & {"email", "role"})
         
         await self.session.execute(
             update(User)
             .where(User.id == user_id)
             .values(**update_data)
         )
+        if author_changed:
+            await self.counters.increment(TICKETS_VERSION_KEY)
+        await self.session.commit()
+        if stale_email:
+            current_user_cache.invalidate(stale_email)
+            await shared_cache.invalidate(
+                user_id_cache_key(user_id),
+                user_email_cache_key(stale_email),
+                *([user_email_cache_key(update_data["email"])] if "email" in update_data else []),
+            )
+        if author_changed:
+            ticket_page_cache.invalidate(TICKETS_VERSION_KEY)
+        return await self._get_by_id(self.session, user_id)
+
+    async def update_password_hash(self, user_id: int, hashed_password: str) -> None:
+        """Сохраняет пересчитанный хеш пароля (после смены параметров Argon2)"""
+        await self.session.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(hashed_password=hashed_password)
+        )
         await self.session.commit()
-        return await self.get_by_id(user_id)
 
     async def delete(self, user_id: int) -> bool:
         result = await self.session.execute(
-            delete(User).where(User.id == user_id)
+            delete(User).where(User.id == user_id).returning(User.email)
         )
+        deleted_emails = result.scalars().all()
+        if deleted_emails:
+            await self.counters.increment(USERS_KEY, -len(deleted_emails))
         await self.session.commit()
-        return result.rowcount > 0
+        for email in deleted_emails:
+            current_user_cache.invalidate(email)
+            await shared_cache.invalidate(user_id_cache_key(user_id), user_email_cache_key(email))
+        return bool(deleted_emails)
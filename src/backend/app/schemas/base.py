@@ -0,0 +1,22 @@
+from typing import Self
+
+from pydantic import BaseModel
+
+
+class DBResponse(BaseModel):
+    """Схема ответа, собираемая из ORM-объекта или строки БД за одну валидацию"""
+
+    @classmethod
+    def from_db(cls, obj, **extra) -> Self:
+        """Как model_validate(obj) с from_attributes, но в несколько раз быстрее.
+
+        Загруженные колонки ORM-объекта лежат в его __dict__: валидация dict идёт
+        целиком в pydantic-core, без getattr через дескрипторы SQLAlchemy на
+        каждое поле. Чего нет в __dict__ (не загружено), берётся через getattr.
+        Поля, которых у obj нет вовсе, передаются в extra.
+        """
+        data = vars(obj)
+        missing = [name for name in cls.model_fields if name not in data and name not in extra]
+        if missing or extra:
+            data = {**data, **{name: getattr(obj, name) for name in missing}, **extra}
+        return cls.model_validate(data)
@@ -0,0 +1,56 @@
+from datetime import date, datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.core.enums import TicketPriority
+from app.schemas.base import DBResponse
+
+
+class TicketStatResponse(DBResponse):
+    """Запись таблицы статистики: клиент, проблема, решение, дата, исполнитель"""
+    id: int
+    ticket_id: int
+    client_id: Optional[int] = None
+    client_email: Optional[str] = None
+    operator_id: Optional[int] = None
+    operator_email: Optional[str] = None
+    priority: TicketPriority
+    problem: str
+    solution: str
+    ticket_created_at: datetime
+    answered_at: datetime
+    first_response_seconds: float
+
+    class Config:
+        from_attributes = True
+
+class TicketStatListResponse(BaseModel):
+    records: list[TicketStatResponse]
+    has_more: bool = False
+    next_cursor: Optional[str] = None
+
+class StatsBucket(BaseModel):
+    """Число первых ответов и время до первого ответа в секундах"""
+    answered: int = 0
+    avg_first_response_seconds: Optional[float] = None
+    max_first_response_seconds: Optional[float] = None
+
+class DailyStats(StatsBucket):
+    day: date
+
+class OperatorStats(StatsBucket):
+    operator_id: int
+    operator_email: Optional[str] = None
+
+class PriorityStats(StatsBucket):
+    priority: TicketPriority
+
+class DailyStatsResponse(BaseModel):
+    days: list[DailyStats]
+
+class OperatorStatsResponse(BaseModel):
+    operators: list[OperatorStats]
+
+class PriorityStatsResponse(BaseModel):
+    priorities: list[PriorityStats]
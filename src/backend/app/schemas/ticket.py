@@ -1,15 +1,30 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, EmailStr, Field
 from datetime import datetime
 from typing import Optional
 
-from app.core.enums import TicketPriority, UserRole
+from app.core.enums import TicketPriority, UserRole, TotalStrategy, DraftStatus
+from app.schemas.base import DBResponse
 
 class TicketCreate(BaseModel):
     topic: str = Field(..., min_length=3, max_length=255, description="Тема обращения")
     description: str = Field(..., min_length=10, description="Описание проблемы")
     priority: TicketPriority = Field(default=TicketPriority.LOW, description="Приоритет: low/middle/high")
 
-class TicketResponse(BaseModel):
+class TicketBulkItem(TicketCreate):
+    """Строка массовой загрузки; без user_email тикет создаётся от имени загружающего"""
+    user_email: Optional[EmailStr] = Field(default=None, description="Автор обращения")
+
+class TicketBulkError(BaseModel):
+    row: int
+    error: str
+
+class TicketBulkResult(BaseModel):
+    """Итог массовой загрузки: ошибки не прерывают обработку остальных строк"""
+    created: int = 0
+    failed: int = 0
+    errors: list[TicketBulkError] = []
+
+class TicketResponse(DBResponse):
     id: int
     user_id: int
     topic: str
@@ -23,9 +38,17 @@ class TicketResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class TicketClaimResponse(TicketResponse):
+    """Тикет из очереди, закреплённый за оператором до claimed_until"""
+    claimed_by: int
+    claimed_until: datetime
+
 class TicketListResponse(BaseModel):
     tickets: list[TicketResponse]
-    total: int
+    total: Optional[int] = None
+    total_strategy: TotalStrategy = TotalStrategy.EXACT
+    has_more: bool = False
+    next_cursor: Optional[str] = None
 
 class TicketResponseWithUser(TicketResponse):
     """Расширенная схема тикета с информацией о пользователе (для ADMIN/OPERATOR)"""
@@ -35,7 +58,41 @@ class TicketResponseWithUser(TicketResponse):
 class TicketListResponseWithUser(BaseModel):
     """Расширенный список тикетов с информацией о пользователях"""
     tickets: list[TicketResponseWithUser]
-    total: int
+    total: Optional[int] = None
+    total_strategy: TotalStrategy = TotalStrategy.EXACT
+    has_more: bool = False
+    next_cursor: Optional[str] = None
+
+class TicketSearchHit(TicketResponse):
+    """Результат полнотекстового поиска: тикет, релевантность и фрагмент с подсветкой"""
+    rank: float
+    snippet: str
+
+class TicketSearchResponse(BaseModel):
+    tickets: list[TicketSearchHit]
+    has_more: bool = False
+
+class SimilarTicket(TicketResponse):
+    """Ранее отвеченный тикет и его близость к запрошенному (косинусная, 0..1)"""
+    score: float
+
+class SimilarTicketsResponse(BaseModel):
+    tickets: list[SimilarTicket]
+
+class TicketDraftResponse(BaseModel):
+    """Автоматический черновик ответа; draft заполнен в статусе ready"""
+    ticket_id: int
+    status: DraftStatus
+    draft: Optional[str] = None
+    drafter: Optional[str] = None
+    from_cache: bool = False
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
 
 class TicketUpdateResponse(BaseModel):
     """Схема для добавления ответа поддержки"""
@@ -2,7 +2,7 @@ from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, EmailStr
 
-from app.core.enums import UserRole
+from app.core.enums import UserRole, TotalStrategy
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -25,6 +25,17 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+class CurrentUser(BaseModel):
+    """Пользователь текущего запроса (из кэша, claims токена или БД)"""
+    id: int
+    email: str
+    is_active: bool
+    role: UserRole
+
+    class Config:
+        from_attributes = True
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -42,4 +53,7 @@ class UserUpdate(BaseModel):
 
 class UsersListResponse(BaseModel):
     users: list[UserResponse]
-    total: int
\ No newline at end of file
+    total: Optional[int] = None
+    total_strategy: TotalStrategy = TotalStrategy.EXACT
+    has_more: bool = False
+    next_cursor: Optional[str] = None
\ No newline at end of file
@@ -1,6 +1,6 @@
 from app.repositories.user import UserRepository
 from app.schemas.user import UserLogin, Token
-from app.core.security import verify_password, create_access_token
+from app.core.security import verify_and_update_password, create_access_token
 from app.core.config import settings
 from datetime import timedelta
 
@@ -10,16 +10,24 @@ class AuthService:
         self.user_repo = user_repo
 
     async def authenticate_user(self, login_data: UserLogin) -> Token:
-        user = await self.user_repo.get_by_email(login_data.email)
-        if not user or not verify_password(login_data.password, user.hashed_password):
+        user = await self.user_repo.get_by_email(login_data.email, cached=False)
+        if not user:
+            raise ValueError("Incorrect email or password")
+
+        await self.user_repo.release_connection()
+        is_valid, new_hash = await verify_and_update_password(login_data.password, user.hashed_password)
+        if not is_valid:
             raise ValueError("Incorrect email or password")
 
         if not user.is_active:
             raise ValueError("Inactive user")
 
+        if new_hash:
+            await self.user_repo.update_password_hash(user.id, new_hash)
+
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": user.email, "role": user.role.value}, 
+            data={"sub": user.email, "role": user.role.value, "uid": user.id},
             expires_delta=access_token_expires
         )
         return Token(access_token=access_token, 
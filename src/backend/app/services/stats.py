@@ -0,0 +1,91 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
+
+from app.core.config import settings
+from app.core.export import iter_export
+from app.core.pagination import encode_cursor, decode_ticket_cursor
+from app.core.enums import TicketPriority, ExportFormat
+from app.models.stats import StatsRollup
+from app.repositories.stats import StatsRepository
+from app.schemas.stats import (TicketStatResponse, TicketStatListResponse,
+                               DailyStats, DailyStatsResponse, OperatorStats, OperatorStatsResponse,
+                               PriorityStats, PriorityStatsResponse)
+
+# Дневная статистика отдаётся не больше чем за год за запрос
+MAX_DAILY_RANGE_DAYS = 366
+
+
+def _bucket(rollup: Optional[StatsRollup]) -> dict:
+    """Поля StatsBucket; пустой dict — значения по умолчанию (нет ответов)"""
+    if rollup is None or not rollup.answered:
+        return {}
+    return {
+        "answered": rollup.answered,
+        "avg_first_response_seconds": rollup.first_response_seconds_sum / rollup.answered,
+        "max_first_response_seconds": rollup.first_response_seconds_max,
+    }
+
+
+class StatsService:
+    def __init__(self, stats_repo: StatsRepository):
+        self.stats_repo = stats_repo
+
+    async def get_records(
+        self, skip: int = 0, limit: int = 10, cursor: Optional[str] = None
+    ) -> TicketStatListResponse:
+        """Таблица решённых обращений, новые сверху"""
+        after = decode_ticket_cursor(cursor) if cursor else None
+        rows = await self.stats_repo.get_records(skip=skip, limit=limit + 1, after=after)
+
+        has_more = len(rows) > limit
+        next_cursor = None
+        if has_more:
+            rows = rows[:limit]
+            last = rows[-1][0]
+            next_cursor = encode_cursor(last.answered_at, last.id)
+
+        records = [
+            TicketStatResponse.from_db(record, client_email=client_email, operator_email=operator_email)
+            for record, client_email, operator_email in rows
+        ]
+        return TicketStatListResponse(records=records, has_more=has_more, next_cursor=next_cursor)
+
+    def export_records(
+        self, export_format: ExportFormat, date_from: Optional[date] = None, date_to: Optional[date] = None
+    ) -> AsyncIterator[bytes]:
+        """Выгрузка таблицы статистики в CSV/XLSX потоком"""
+        rows = self.stats_repo.stream_for_export(date_from, date_to, batch_size=settings.EXPORT_BATCH_SIZE)
+        header = ["Тикет", "Дата ответа", "Клиент", "Исполнитель", "Приоритет", "Проблема", "Решение",
+                  "Время до ответа, с"]
+        return iter_export(export_format, header, rows, sheet="Статистика")
+
+    async def get_daily(self, date_from: Optional[date] = None, date_to: Optional[date] = None) -> DailyStatsResponse:
+        """По дням (UTC) за период, по умолчанию за последние 30 дней; дни без ответов — нули"""
+        date_to = date_to or datetime.now(timezone.utc).date()
+        date_from = date_from or date_to - timedelta(days=29)
+        if date_from > date_to:
+            raise ValueError("date_from must not be after date_to")
+        if (date_to - date_from).days >= MAX_DAILY_RANGE_DAYS:
+            raise ValueError(f"Period must not exceed {MAX_DAILY_RANGE_DAYS} days")
+
+        by_day = {rollup.key: rollup for rollup in await self.stats_repo.get_daily(date_from, date_to)}
+        days = []
+        for offset in range((date_to - date_from).days + 1):
+            day = date_from + timedelta(days=offset)
+            days.append(DailyStats(day=day, **_bucket(by_day.get(day.isoformat()))))
+        return DailyStatsResponse(days=days)
+
+    async def get_by_operator(self) -> OperatorStatsResponse:
+        """По исполнителям за всё время, самые активные сверху"""
+        return OperatorStatsResponse(operators=[
+            OperatorStats(operator_id=int(rollup.key), operator_email=email, **_bucket(rollup))
+            for rollup, email in await self.stats_repo.get_by_operator()
+        ])
+
+    async def get_by_priority(self) -> PriorityStatsResponse:
+        """По приоритетам за всё время"""
+        by_priority = {rollup.key: rollup for rollup in await self.stats_repo.get_by_priority()}
+        return PriorityStatsResponse(priorities=[
+            PriorityStats(priority=priority, **_bucket(by_priority.get(priority.value)))
+            for priority in TicketPriority
+        ])
@@ -1,57 +1,415 @@
 from app.repositories.ticket import TicketRepository
+from pydantic import ValidationError
+
 from app.schemas.ticket import (TicketCreate, TicketListResponseWithUser, 
                                 TicketResponse, TicketListResponse, TicketResponseWithUser,
-                                TicketUpdateResponse)
-from typing import Optional
+                                TicketUpdateResponse, TicketSearchHit, TicketSearchResponse,
+                                SimilarTicket, SimilarTicketsResponse,
+                                TicketBulkItem, TicketBulkError, TicketBulkResult,
+                                TicketDraftResponse, TicketClaimResponse)
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from pydantic import BaseModel
+
+from app.core.pagination import encode_cursor, decode_ticket_cursor, decode_ticket_priority_cursor
+from app.core.streaming import Record
+from app.core.export import iter_export
+from app.core.config import settings
+from app.core.cache import ticket_page_cache
+from app.core.etag import CachedBody, weak_etag, etag_matches
+from app.core.enums import TicketPriority, TicketSort, TotalStrategy, TicketEventType, ExportFormat, UserRole
 
+from app.models.ticket import PRIORITY_RANK
 from app.repositories.user import UserRepository
 
+from app.similarity.engine import similarity_engine
+from app.drafts.worker import draft_worker
+from app.events.hub import event_hub
+
 class TicketService:
     def __init__(self, ticket_repo: TicketRepository, user_repo: UserRepository):
         self.ticket_repo = ticket_repo
         self.user_repo = user_repo
 
+    @staticmethod
+    def _total_strategy(with_total: bool) -> TotalStrategy:
+        return settings.LIST_TOTAL_STRATEGY if with_total else TotalStrategy.NONE
+
     async def create_ticket(self, ticket_in: TicketCreate, user_id: int) -> TicketResponse:
         ticket = await self.ticket_repo.create(ticket_in, user_id)
-        return TicketResponse.model_validate(ticket)
+        similarity_engine.upsert_ticket(ticket)
+        draft_worker.notify()
+        event_hub.publish(
+            TicketEventType.TICKET_CREATED,
+            ticket_id=ticket.id,
+            user_id=ticket.user_id,
+            topic=ticket.topic,
+            priority=ticket.priority,
+            created_at=ticket.created_at,
+        )
+        return TicketResponse.from_db(ticket)
+
+    async def bulk_create_tickets(
+        self, records: AsyncIterator[Record], default_user_id: int, batch_size: Optional[int] = None
+    ) -> TicketBulkResult:
+        """Массовая загрузка: строки проверяются по мере чтения и вставляются порциями"""
+        batch_size = batch_size or settings.TICKETS_BULK_BATCH_SIZE
+        result = TicketBulkResult()
+        batch: list[tuple[int, TicketBulkItem]] = []
+        async for row, record in records:
+            if isinstance(record, ValueError):
+                self._bulk_error(result, row, str(record))
+                continue
+            try:
+                batch.append((row, TicketBulkItem.model_validate(record)))
+            except ValidationError as e:
+                self._bulk_error(result, row, "; ".join(
+                    f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+                ))
+                continue
+            if len(batch) >= batch_size:
+                await self._insert_bulk_batch(batch, default_user_id, result)
+                batch = []
+        if batch:
+            await self._insert_bulk_batch(batch, default_user_id, result)
+        result.errors.sort(key=lambda error: error.row)
+        if result.created:
+            draft_worker.notify()
+        # Индекс похожих обращений подхватит новые тикеты при ближайшей синхронизации
+        return result
+
+    @staticmethod
+    def _bulk_error(result: TicketBulkResult, row: int, error: str) -> None:
+        result.failed += 1
+        if len(result.errors) < settings.TICKETS_BULK_MAX_ERRORS:
+            result.errors.append(TicketBulkError(row=row, error=error))
+
+    async def _insert_bulk_batch(
+        self, batch: list[tuple[int, TicketBulkItem]], default_user_id: int, result: TicketBulkResult
+    ) -> None:
+        user_ids = await self.user_repo.get_ids_by_emails({item.user_email for _, item in batch if item.user_email})
+        row_numbers, rows = [], []
+        for row, item in batch:
+            user_id = user_ids.get(item.user_email) if item.user_email else default_user_id
+            if user_id is None:
+                self._bulk_error(result, row, f"Unknown user: {item.user_email}")
+                continue
+            row_numbers.append(row)
+            rows.append({
+                "user_id": user_id,
+                "topic": item.topic,
+                "description": item.description,
+                "priority": item.priority,
+            })
+        if not rows:
+            return
+
+        outcomes = await self.ticket_repo.create_many(rows)
+        created = 0
+        for row, outcome in zip(row_numbers, outcomes):
+            if isinstance(outcome, int):
+                created += 1
+            else:
+                self._bulk_error(result, row, f"Database error: {str(outcome.orig).splitlines()[0]}")
+        if created:
+            result.created += created
+            event_hub.publish(TicketEventType.TICKETS_IMPORTED, created=created)
 
     async def get_ticket(self, ticket_id: int, user_id: int) -> Optional[TicketResponse]:
         ticket = await self.ticket_repo.get_by_id(ticket_id, user_id)
         if ticket:
-            return TicketResponse.model_validate(ticket)
+            return TicketResponse.from_db(ticket)
         return None
 
-    async def get_user_tickets(self, user_id: int, skip: int = 0, limit: int = 10) -> TicketListResponse:
-        tickets, total = await self.ticket_repo.get_by_user(user_id, skip=skip, limit=limit)
+    async def get_ticket_body(
+        self, ticket_id: int, user_id: int, if_none_match: Optional[str] = None
+    ) -> Optional[CachedBody]:
+        """Тикет с ETag по времени последнего изменения; при совпадении ETag тело не собирается"""
+        ticket = await self.ticket_repo.get_by_id(ticket_id, user_id)
+        if not ticket:
+            return None
+        etag = weak_etag("ticket", ticket.id, ticket.updated_at or ticket.created_at)
+        if etag_matches(if_none_match, etag):
+            return CachedBody(etag, None)
+        return CachedBody(etag, TicketResponse.from_db(ticket).model_dump_json().encode())
+
+    async def _cached_page(
+        self,
+        user_id: Optional[int],
+        params: tuple,
+        if_none_match: Optional[str],
+        build: Callable[[], Awaitable[BaseModel]],
+    ) -> CachedBody:
+        """Страница списка с ETag по версии списка; тело берётся из кэша, пока версия не изменилась"""
+        # Версия читается до страницы: запись между ними лишь сделает ETag устаревшим раньше времени
+        scope, version = await self.ticket_repo.get_list_version(user_id)
+        etag = weak_etag(scope, version, params)
+        if etag_matches(if_none_match, etag):
+            return CachedBody(etag, None)
+        body = ticket_page_cache.get(scope, etag)
+        if body is None:
+            body = (await build()).model_dump_json().encode()
+            ticket_page_cache.set(scope, etag, body)
+        return CachedBody(etag, body)
+
+    async def get_user_tickets_body(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        if_none_match: Optional[str] = None,
+        include_archived: bool = False,
+    ) -> CachedBody:
+        return await self._cached_page(
+            user_id,
+            (skip, limit, cursor, with_total, include_archived),
+            if_none_match,
+            lambda: self.get_user_tickets(
+                user_id,
+                skip=skip,
+                limit=limit,
+                cursor=cursor,
+                with_total=with_total,
+                include_archived=include_archived,
+            ),
+        )
+
+    async def get_all_tickets_body(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        if_none_match: Optional[str] = None,
+        include_archived: bool = False,
+        priority: Optional[TicketPriority] = None,
+        awaits_response: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        user_email: Optional[str] = None,
+        sort: TicketSort = TicketSort.NEWEST,
+    ) -> CachedBody:
+        filters = {
+            "priority": priority,
+            "awaits_response": awaits_response,
+            "created_from": created_from,
+            "created_to": created_to,
+            "user_email": user_email,
+            "sort": sort,
+        }
+        return await self._cached_page(
+            None,
+            (skip, limit, cursor, with_total, include_archived, *filters.values()),
+            if_none_match,
+            lambda: self.get_all_tickets(
+                skip=skip,
+                limit=limit,
+                cursor=cursor,
+                with_total=with_total,
+                include_archived=include_archived,
+                **filters,
+            ),
+        )
+
+    async def get_user_tickets(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        include_archived: bool = False,
+    ) -> TicketListResponse:
+        after = decode_ticket_cursor(cursor) if cursor else None
+        tickets, total = await self.ticket_repo.get_by_user(
+            user_id,
+            skip=skip,
+            limit=limit + 1,
+            after=after,
+            total_strategy=self._total_strategy(with_total),
+            include_archived=include_archived,
+        )
+
+        has_more = len(tickets) > limit
+        next_cursor = None
+        if has_more:
+            tickets = tickets[:limit]
+            next_cursor = encode_cursor(tickets[-1].created_at, tickets[-1].id)
+
         return TicketListResponse(
-            tickets=[TicketResponse.model_validate(t) for t in tickets],
-            total=total
+            tickets=[TicketResponse.from_db(t) for t in tickets],
+            total=total.value,
+            total_strategy=total.strategy,
+            has_more=has_more,
+            next_cursor=next_cursor
         )
     
-    async def get_all_tickets(self, skip: int = 0, limit: int = 10) -> TicketListResponseWithUser:
-        """Получает все тикеты системы с информацией о пользователях"""
-        tickets, total = await self.ticket_repo.get_all_tickets(skip=skip, limit=limit)
-        
-        tickets_with_user = []
-        for ticket in tickets:
-            user = await self.user_repo.get_by_id(ticket.user_id)
-            ticket_dict = TicketResponse.model_validate(ticket).model_dump()
-            ticket_dict['user_email'] = user.email if user else "unknown"
-            ticket_dict['user_role'] = user.role.value if user else "user"
-            tickets_with_user.append(TicketResponseWithUser(**ticket_dict))
+    async def get_all_tickets(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        include_archived: bool = False,
+        priority: Optional[TicketPriority] = None,
+        awaits_response: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        user_email: Optional[str] = None,
+        sort: TicketSort = TicketSort.NEWEST,
+    ) -> TicketListResponseWithUser:
+        """Получает тикеты системы с информацией о пользователях, с фильтрами и сортировкой"""
+        after = None
+        if cursor:
+            decode = decode_ticket_priority_cursor if sort == TicketSort.PRIORITY else decode_ticket_cursor
+            after = decode(cursor)
+        rows, total = await self.ticket_repo.get_all_tickets_with_users(
+            skip=skip,
+            limit=limit + 1,
+            after=after,
+            total_strategy=self._total_strategy(with_total),
+            priority=priority,
+            awaits_response=awaits_response,
+            created_from=created_from,
+            created_to=created_to,
+            user_email=user_email,
+            sort=sort,
+            include_archived=include_archived,
+        )
+
+        has_more = len(rows) > limit
+        next_cursor = None
+        if has_more:
+            rows = rows[:limit]
+            last = rows[-1][0]
+            if sort == TicketSort.PRIORITY:
+                next_cursor = encode_cursor(PRIORITY_RANK[last.priority], last.created_at, last.id)
+            else:
+                next_cursor = encode_cursor(last.created_at, last.id)
+
+        tickets_with_user = [
+            TicketResponseWithUser.from_db(
+                ticket, user_email=owner_email or "unknown", user_role=owner_role or UserRole.USER
+            )
+            for ticket, owner_email, owner_role in rows
+        ]
         
         return TicketListResponseWithUser(
             tickets=tickets_with_user,
-            total=total
+            total=total.value,
+            total_strategy=total.strategy,
+            has_more=has_more,
+            next_cursor=next_cursor
         )
     
-    async def update_ticket_response(self, ticket_id: int, response_in: TicketUpdateResponse) -> Optional[TicketResponse]:
+    async def search_tickets(
+        self,
+        query: str,
+        priority: Optional[TicketPriority] = None,
+        awaits_response: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        skip: int = 0,
+        limit: int = 10,
+        include_archived: bool = False,
+    ) -> TicketSearchResponse:
+        """Поиск по базе обращений с ранжированием и подсветкой"""
+        rows = await self.ticket_repo.search(
+            query,
+            priority=priority,
+            awaits_response=awaits_response,
+            created_from=created_from,
+            created_to=created_to,
+            skip=skip,
+            limit=limit + 1,
+            include_archived=include_archived,
+        )
+        has_more = len(rows) > limit
+        hits = [TicketSearchHit.from_db(ticket, rank=rank, snippet=snippet) for ticket, rank, snippet in rows[:limit]]
+        return TicketSearchResponse(tickets=hits, has_more=has_more)
+
+    def export_tickets(
+        self,
+        export_format: ExportFormat,
+        priority: Optional[TicketPriority] = None,
+        awaits_response: Optional[bool] = None,
+        answered: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        include_archived: bool = False,
+    ) -> AsyncIterator[bytes]:
+        """Выгрузка тикетов в CSV/XLSX потоком, без загрузки всех строк в память"""
+        rows = self.ticket_repo.stream_for_export(
+            priority=priority,
+            awaits_response=awaits_response,
+            answered=answered,
+            created_from=created_from,
+            created_to=created_to,
+            batch_size=settings.EXPORT_BATCH_SIZE,
+            include_archived=include_archived,
+        )
+        header = ["ID", "Создан", "Изменён", "Клиент", "Приоритет", "Ждёт ответа", "Тема", "Описание", "Ответ"]
+        return iter_export(export_format, header, rows, sheet="Тикеты")
+
+    async def get_similar_tickets(self, ticket_id: int, limit: int = 5) -> Optional[SimilarTicketsResponse]:
+        """Ранее отвеченные тикеты, похожие на данный (по теме и описанию)"""
+        ticket = await self.ticket_repo.get_by_id(ticket_id)
+        if not ticket:
+            return None
+        hits = similarity_engine.similar(ticket, limit)
+        # Похожие — отвеченные тикеты, многие из них уже в архиве
+        similar_ids = [hit_id for hit_id, _ in hits]
+        by_id = {t.id: t for t in await self.ticket_repo.get_by_ids(similar_ids, include_archived=True)}
+        similar = []
+        for similar_id, score in hits:
+            # Индекс может отставать от реплики на пару секунд
+            if similar_id in by_id:
+                similar.append(SimilarTicket.from_db(by_id[similar_id], score=score))
+        return SimilarTicketsResponse(tickets=similar)
+
+    async def claim_next_ticket(self, operator_id: int) -> Optional[TicketClaimResponse]:
+        """Следующий тикет из очереди: высокий приоритет и более старые первыми"""
+        ticket = await self.ticket_repo.claim_next(
+            operator_id, timedelta(seconds=settings.TICKET_CLAIM_TTL_SECONDS)
+        )
+        if not ticket:
+            return None
+        event_hub.publish(
+            TicketEventType.TICKET_CLAIMED,
+            ticket_id=ticket.id,
+            operator_id=operator_id,
+            claimed_until=ticket.claimed_until,
+        )
+        return TicketClaimResponse.from_db(ticket)
+
+    async def release_ticket_claim(self, ticket_id: int, operator_id: Optional[int] = None) -> bool:
+        return await self.ticket_repo.release_claim(ticket_id, operator_id)
+
+    async def get_ticket_draft(self, ticket_id: int) -> Optional[TicketDraftResponse]:
+        """Черновик ответа, подготовленный в фоне после создания тикета"""
+        draft = await self.ticket_repo.drafts.get(ticket_id)
+        if draft:
+            return TicketDraftResponse.model_validate(draft)
+        return None
+
+    async def update_ticket_response(
+        self, ticket_id: int, response_in: TicketUpdateResponse, operator_id: Optional[int] = None
+    ) -> Optional[TicketResponse]:
         """Добавляет ответ поддержки к тикету"""
         ticket = await self.ticket_repo.update_response(
             ticket_id=ticket_id,
             response=response_in.response,
-            awaits_response=response_in.awaits_response
+            awaits_response=response_in.awaits_response,
+            operator_id=operator_id,
         )
         if ticket:
-            return TicketResponse.model_validate(ticket)
+            similarity_engine.upsert_ticket(ticket)
+            draft_worker.cancel(ticket_id)
+            event_hub.publish(
+                TicketEventType.TICKET_ANSWERED, ticket_id=ticket.id, awaits_response=ticket.awaits_response
+            )
+            return TicketResponse.from_db(ticket)
         return None
\ No newline at end of file
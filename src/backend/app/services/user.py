@@ -1,5 +1,8 @@
 from app.repositories.user import UserRepository
 from app.schemas.user import UserCreate, UserUpdate, UserResponse, UsersListResponse
+from app.core.pagination import encode_cursor, decode_user_cursor
+from app.core.config import settings
+from app.core.enums import TotalStrategy
 from typing import Optional
 
 class UserService:
@@ -12,11 +15,29 @@ class UserService:
             return UserResponse.model_validate(user)
         return None
 
-    async def get_all_users(self, skip: int = 0, limit: int = 10) -> UsersListResponse:
-        users, total = await self.user_repo.get_all(skip=skip, limit=limit)
+    async def get_all_users(
+        self, skip: int = 0, limit: int = 10, cursor: Optional[str] = None, with_total: bool = True
+    ) -> UsersListResponse:
+        after_id = decode_user_cursor(cursor) if cursor else None
+        users, total = await self.user_repo.get_all(
+            skip=skip,
+            limit=limit + 1,
+            after_id=after_id,
+            total_strategy=settings.LIST_TOTAL_STRATEGY if with_total else TotalStrategy.NONE,
+        )
+
+        has_more = len(users) > limit
+        next_cursor = None
+        if has_more:
+            users = users[:limit]
+            next_cursor = encode_cursor(users[-1].id)
+
         return UsersListResponse(
             users=[UserResponse.model_validate(u) for u in users],
-            total=total
+            total=total.value,
+            total_strategy=total.strategy,
+            has_more=has_more,
+            next_cursor=next_cursor
         )
 
     async def create_user(self, user_in: UserCreate) -> UserResponse:
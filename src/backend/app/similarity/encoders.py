@@ -0,0 +1,104 @@
+import re
+import zlib
+from abc import ABC, abstractmethod
+from typing import Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.enums import SimilarityEncoderKind
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class TextEncoder(ABC):
+    """Переводит тексты в L2-нормированные векторы float32 фиксированной размерности"""
+
+    dim: int
+
+    def fit(self, texts: Sequence[str]) -> None:
+        """Подстраивает веса под корпус; по умолчанию ничего не делает"""
+
+    @abstractmethod
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        ...
+
+
+class HashingTfidfEncoder(TextEncoder):
+    """TF-IDF на хешированных признаках: слова, их префиксы и биграммы.
+
+    Признак хешируется в одну из n_buckets корзин (для IDF), корзина со знаком
+    проецируется в dim координат. Префикс слова грубо заменяет стемминг и
+    сводит вместе словоформы («принтер», «принтера», «принтеру»).
+    """
+
+    def __init__(self, dim: int = 384, n_buckets: int = 1 << 18, prefix_len: int = 5):
+        self.dim = dim
+        self.n_buckets = n_buckets
+        self.prefix_len = prefix_len
+        self.idf = np.ones(n_buckets, dtype=np.float32)
+
+    def _features(self, text: str) -> list[int]:
+        words = [w for w in _TOKEN_RE.findall(text.lower().replace("ё", "е")) if len(w) > 1]
+        features = ["w:" + w for w in words]
+        features += ["p:" + w[: self.prefix_len] for w in words if len(w) > self.prefix_len]
+        features += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+        return [zlib.crc32(f.encode()) for f in features]
+
+    def _hashed(self, texts: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Пары (номер документа, хеш признака) для всех текстов"""
+        hashes = [self._features(t) for t in texts]
+        doc_ids = np.repeat(np.arange(len(texts), dtype=np.int64), [len(h) for h in hashes])
+        flat = np.fromiter((h for doc in hashes for h in doc), dtype=np.int64, count=len(doc_ids))
+        return doc_ids, flat
+
+    def fit(self, texts: Sequence[str]) -> None:
+        doc_ids, flat = self._hashed(texts)
+        pairs = np.unique((doc_ids << 32) | (flat % self.n_buckets))
+        df = np.bincount(pairs & 0xFFFFFFFF, minlength=self.n_buckets)
+        # Сглаженный IDF, как в sklearn: log((1 + n) / (1 + df)) + 1
+        self.idf = (np.log((1 + len(texts)) / (1 + df)) + 1).astype(np.float32)
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if not texts:
+            return out
+        doc_ids, flat = self._hashed(texts)
+        keys, tf = np.unique((doc_ids << 32) | flat, return_counts=True)
+        docs, hashes = keys >> 32, keys & 0xFFFFFFFF
+        buckets = hashes % self.n_buckets
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+        weights = (1 + np.log(tf)).astype(np.float32) * self.idf[buckets] * signs
+        np.add.at(out, (docs, buckets % self.dim), weights)
+        return _normalize(out)
+
+
+class SentenceTransformerEncoder(TextEncoder):
+    """Локальная модель sentence-transformers (работает без сети, если модель скачана заранее)"""
+
+    def __init__(self, model_path: str):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise RuntimeError(
+                "SIMILARITY_ENCODER=sentence-transformers requires the sentence-transformers package"
+            ) from e
+        self.model = SentenceTransformer(model_path, local_files_only=True)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self.model.encode(list(texts), batch_size=64, convert_to_numpy=True)
+        return _normalize(vectors.astype(np.float32))
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+
+def create_encoder() -> TextEncoder:
+    """Кодировщик по настройкам SIMILARITY_*"""
+    if settings.SIMILARITY_ENCODER == SimilarityEncoderKind.SENTENCE_TRANSFORMERS:
+        return SentenceTransformerEncoder(settings.SIMILARITY_MODEL_PATH)
+    return HashingTfidfEncoder(dim=settings.SIMILARITY_DIM)
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Optional, Sequence
+
+from app.core.config import settings
+from app.db.session import async_session_maker
+from app.models.ticket import Ticket
+from app.repositories.ticket import TicketRepository
+
+if TYPE_CHECKING:
+    from app.similarity.encoders import TextEncoder
+    from app.similarity.index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+# Запас при досинхронизации: транзакция могла закоммитить строку
+# с created_at/updated_at чуть раньше уже прочитанного максимума
+SYNC_OVERLAP = timedelta(minutes=1)
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class SimilarityIndexNotReady(Exception):
+    """Индекс похожих обращений ещё строится"""
+
+
+def ticket_text(topic: str, description: str) -> str:
+    return f"{topic}\n{description}"
+
+
+class SimilarityEngine:
+    """Индекс похожих обращений в памяти процесса.
+
+    Строится целиком при старте (и заново, когда число тикетов удвоилось —
+    чтобы обновить IDF и центроиды), тикеты этого процесса добавляются сразу
+    при создании и ответе, изменения из других процессов подтягиваются
+    каждые SIMILARITY_SYNC_SECONDS по created_at/updated_at.
+    """
+
+    def __init__(self):
+        self.encoder: Optional["TextEncoder"] = None
+        self.index: Optional["VectorIndex"] = None
+        self._watermark: Optional[datetime] = None
+        self._built_size = 0
+        # Изменения, пришедшие во время перестройки; применяются к новому индексу
+        self._pending: Optional[list[tuple[int, str, bool]]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.index is not None
+
+    def _advance_watermark(self, rows: Sequence) -> None:
+        for row in rows:
+            for value in (row.created_at, row.updated_at):
+                if value is not None and (self._watermark is None or value > self._watermark):
+                    self._watermark = value
+
+    @staticmethod
+    def _build(rows: Sequence) -> tuple["TextEncoder", "VectorIndex"]:
+        # numpy и кодировщики нужны только при SIMILARITY_ENABLED: импортируются при первой сборке
+        from app.similarity.encoders import create_encoder
+        from app.similarity.index import VectorIndex
+
+        texts = [ticket_text(row.topic, row.description) for row in rows]
+        encoder = create_encoder()
+        encoder.fit(texts)
+        index = VectorIndex(encoder.dim, capacity=max(1024, len(rows)))
+        for start in range(0, len(rows), 4096):
+            chunk = rows[start:start + 4096]
+            index.upsert(
+                [row.id for row in chunk],
+                encoder.encode(texts[start:start + 4096]),
+                [row.answered for row in chunk],
+            )
+        if index.size >= settings.SIMILARITY_BRUTE_FORCE_BELOW:
+            index.train(nlist=int(math.sqrt(index.size)))
+        return encoder, index
+
+    async def rebuild(self) -> None:
+        """Полная перестройка индекса по всем тикетам"""
+        self._pending = []
+        try:
+            rows: list = []
+            async with async_session_maker() as session:
+                repo = TicketRepository(session)
+                while True:
+                    batch = await repo.get_index_batch(after_id=rows[-1].id if rows else 0, limit=5000)
+                    if not batch:
+                        break
+                    rows.extend(batch)
+            # Кодирование и k-means — CPU, выносим из event loop
+            encoder, index = await asyncio.to_thread(self._build, rows)
+            self.encoder, self.index = encoder, index
+            self._built_size = index.size
+            self._watermark = self._watermark or EPOCH
+            self._advance_watermark(rows)
+            pending = self._pending
+        finally:
+            self._pending = None
+        for ticket_id, text, answered in pending or ():
+            self._upsert(ticket_id, text, answered)
+        logger.info("Similarity index built: %d tickets, ivf=%s", index.size, index.trained)
+
+    async def sync(self) -> None:
+        """Подтягивает тикеты, созданные или изменённые другими процессами"""
+        if self._watermark is None:
+            return
+        async with async_session_maker() as session:
+            rows = await TicketRepository(session).get_index_changes(self._watermark - SYNC_OVERLAP)
+        if not rows:
+            return
+        vectors = await asyncio.to_thread(
+            self.encoder.encode, [ticket_text(row.topic, row.description) for row in rows]
+        )
+        self.index.upsert([row.id for row in rows], vectors, [row.answered for row in rows])
+        self._advance_watermark(rows)
+
+    def _upsert(self, ticket_id: int, text: str, answered: bool) -> None:
+        self.index.upsert([ticket_id], self.encoder.encode([text]), [answered])
+
+    def upsert_ticket(self, ticket: Ticket) -> None:
+        """Добавляет или обновляет тикет сразу после записи в этом процессе"""
+        if not settings.SIMILARITY_ENABLED:
+            return
+        text = ticket_text(ticket.topic, ticket.description)
+        answered = ticket.response is not None
+        if self._pending is not None:
+            self._pending.append((ticket.id, text, answered))
+        if self.ready:
+            self._upsert(ticket.id, text, answered)
+
+    def similar(self, ticket: Ticket, k: int) -> list[tuple[int, float]]:
+        """Top-k отвеченных тикетов, похожих на данный: [(id, сходство)]"""
+        if not self.ready:
+            raise SimilarityIndexNotReady()
+        query = self.index.get_vector(ticket.id)
+        if query is None:
+            query = self.encoder.encode([ticket_text(ticket.topic, ticket.description)])[0]
+        nprobe = settings.SIMILARITY_NPROBE if self.index.trained else None
+        return self.index.search(query, k, nprobe=nprobe, answered_only=True, exclude_id=ticket.id)
+
+    def _needs_rebuild(self) -> bool:
+        if not self.ready:
+            return True
+        size = self.index.size
+        return size >= settings.SIMILARITY_BRUTE_FORCE_BELOW and size >= 2 * max(self._built_size, 1)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                if self._needs_rebuild():
+                    await self.rebuild()
+                else:
+                    await self.sync()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Similarity index update failed")
+            await asyncio.sleep(settings.SIMILARITY_SYNC_SECONDS)
+
+    def start(self) -> None:
+        if settings.SIMILARITY_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+similarity_engine = SimilarityEngine()
@@ -0,0 +1,132 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+class VectorIndex:
+    """Векторы тикетов в памяти процесса: полный перебор или IVF (inverted file).
+
+    Векторы L2-нормированы, поэтому близость — скалярное произведение.
+    После train() каждый вектор приписан к ближайшему из nlist центроидов
+    (сферический k-means), и поиск считает сходство только для векторов из
+    nprobe ближайших к запросу кластеров. До обучения поиск точный.
+    """
+
+    def __init__(self, dim: int, capacity: int = 1024):
+        self.dim = dim
+        self.size = 0
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._answered = np.zeros(capacity, dtype=bool)
+        self._lists = np.zeros(capacity, dtype=np.int32)
+        self._positions: dict[int, int] = {}
+        self.centroids: Optional[np.ndarray] = None
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def __contains__(self, ticket_id: int) -> bool:
+        return ticket_id in self._positions
+
+    def _grow(self, needed: int) -> None:
+        capacity = len(self._ids)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("_vectors", "_ids", "_answered", "_lists"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: self.size] = old[: self.size]
+            setattr(self, name, new)
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def upsert(self, ids: Sequence[int], vectors: np.ndarray, answered: Sequence[bool]) -> None:
+        """Добавляет векторы или заменяет уже проиндексированные (по id тикета)"""
+        ids = np.asarray(ids, dtype=np.int64)
+        answered = np.asarray(answered, dtype=bool)
+        positions = np.empty(len(ids), dtype=np.int64)
+        new_count = 0
+        for i, ticket_id in enumerate(ids.tolist()):
+            pos = self._positions.get(ticket_id)
+            if pos is None:
+                pos = self.size + new_count
+                self._positions[ticket_id] = pos
+                new_count += 1
+            positions[i] = pos
+        self._grow(self.size + new_count)
+        self.size += new_count
+
+        self._vectors[positions] = vectors
+        self._ids[positions] = ids
+        self._answered[positions] = answered
+        if self.trained:
+            self._lists[positions] = self._assign(vectors)
+
+    def get_vector(self, ticket_id: int) -> Optional[np.ndarray]:
+        pos = self._positions.get(ticket_id)
+        return None if pos is None else self._vectors[pos]
+
+    def train(self, nlist: int, iterations: int = 10, sample_size: int = 64, seed: int = 0) -> None:
+        """Обучает центроиды на выборке (до sample_size векторов на кластер)"""
+        vectors = self._vectors[: self.size]
+        nlist = min(nlist, self.size)
+        rng = np.random.default_rng(seed)
+        sample = vectors[rng.choice(self.size, min(self.size, nlist * sample_size), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Пустой кластер оставляем на месте
+            filled = norms[:, 0] > 0
+            centroids[filled] = sums[filled] / norms[filled]
+        self.centroids = centroids
+
+        # Распределяем все векторы по спискам порциями, чтобы не держать матрицу N x nlist
+        for start in range(0, self.size, 16384):
+            end = min(start + 16384, self.size)
+            self._lists[start:end] = self._assign(vectors[start:end])
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None,
+        answered_only: bool = False,
+        exclude_id: Optional[int] = None,
+    ) -> list[tuple[int, float]]:
+        """Top-k (id, сходство); nprobe=None — точный поиск полным перебором"""
+        candidates = np.ones(self.size, dtype=bool)
+        if answered_only:
+            candidates &= self._answered[: self.size]
+        if exclude_id is not None and exclude_id in self._positions:
+            candidates[self._positions[exclude_id]] = False
+
+        if nprobe is None or not self.trained:
+            return self._top_k(query, np.flatnonzero(candidates), k)
+
+        order = np.argsort(-(self.centroids @ query))
+        nprobe = min(nprobe, len(order))
+        while True:
+            probed = np.isin(self._lists[: self.size], order[:nprobe])
+            positions = np.flatnonzero(candidates & probed)
+            # Если фильтр отсёк почти всё, расширяем число просматриваемых кластеров
+            if len(positions) >= k or nprobe >= len(order):
+                return self._top_k(query, positions, k)
+            nprobe *= 2
+
+    def _top_k(self, query: np.ndarray, positions: np.ndarray, k: int) -> list[tuple[int, float]]:
+        if len(positions) == 0:
+            return []
+        scores = self._vectors[positions] @ query
+        if len(scores) > k:
+            best = np.argpartition(-scores, k)[:k]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best])]
+        return [(int(self._ids[positions[i]]), float(scores[i])) for i in best]
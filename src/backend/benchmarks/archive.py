@@ -0,0 +1,214 @@
+"""Архив тикетов: задержка горячих запросов до и после переноса в tickets_archive.
+
+Запросы идут через TicketRepository без HTTP (как benchmarks.claims), по
+одному, с total по LIST_TOTAL_STRATEGY. Фазы:
+    before   все тикеты в tickets, как после benchmarks.seed
+    hot      после переноса (ArchiveMover.run_once), списки по умолчанию
+    history  после переноса, include_archived=true
+Перед каждой фазой делается VACUUM ANALYZE. В конце тикеты возвращаются из
+архива, и база остаётся как после seed (--keep — оставить архив). Даты seed
+отсчитываются от 2026-01-01, а срок переноса — от текущего времени.
+Только PostgreSQL. База на 10M строк: python -m benchmarks.seed --reset --tickets 10000000
+
+    python -m benchmarks.archive [--archive-after-days 90] [--requests 200]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.archive.mover import ArchiveMover
+from app.core.config import settings
+from app.core.enums import TotalStrategy
+from app.db.session import get_engine
+from app.models.ticket import ArchivedTicket, Ticket
+from app.repositories.counter import CounterRepository
+from app.repositories.ticket import MOVED_COLUMNS, TicketRepository, ticket_history
+from benchmarks import seed
+from benchmarks.harness import latency_summary, print_table
+
+PHASES = ("before", "hot", "history")
+
+
+@dataclass
+class Fixtures:
+    user_ids: List[int]
+    # Ключи (created_at, id) из второй половины списка: курсоры глубоких страниц
+    deep_keys: List[Tuple[datetime, int]]
+
+
+async def _all_first(repo: TicketRepository, fixtures: Fixtures, rng: random.Random, history: bool) -> None:
+    await repo.get_all_tickets_with_users(
+        limit=21, total_strategy=settings.LIST_TOTAL_STRATEGY, include_archived=history
+    )
+
+
+async def _all_deep(repo: TicketRepository, fixtures: Fixtures, rng: random.Random, history: bool) -> None:
+    await repo.get_all_tickets_with_users(
+        limit=21, after=rng.choice(fixtures.deep_keys), total_strategy=TotalStrategy.NONE, include_archived=history
+    )
+
+
+async def _my_tickets(repo: TicketRepository, fixtures: Fixtures, rng: random.Random, history: bool) -> None:
+    await repo.get_by_user(
+        rng.choice(fixtures.user_ids),
+        limit=21,
+        total_strategy=settings.LIST_TOTAL_STRATEGY,
+        include_archived=history,
+    )
+
+
+async def _search(repo: TicketRepository, fixtures: Fixtures, rng: random.Random, history: bool) -> None:
+    await repo.search(rng.choice(seed.SUBJECTS), limit=11, include_archived=history)
+
+
+SCENARIOS: Dict[str, Callable[..., Awaitable[None]]] = {
+    "all_first": _all_first,
+    "all_deep": _all_deep,
+    "my_tickets": _my_tickets,
+    "search": _search,
+}
+
+
+async def vacuum(engine: AsyncEngine) -> None:
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table in (Ticket.__tablename__, ArchivedTicket.__tablename__):
+            await conn.exec_driver_sql(f"VACUUM ANALYZE {table}")
+
+
+async def load_fixtures(session: AsyncSession, history: bool, samples: int = 10) -> Fixtures:
+    model = ticket_history() if history else Ticket
+    result = await session.execute(
+        select(model.user_id).group_by(model.user_id).order_by(func.count().desc()).limit(200)
+    )
+    user_ids = list(result.scalars().all())
+    total = (await session.execute(select(func.count()).select_from(model))).scalar()
+    rng = random.Random(total)
+    deep_keys = []
+    for offset in sorted(rng.randrange(total // 2, total) for _ in range(samples)):
+        result = await session.execute(
+            select(model.created_at, model.id).order_by(model.created_at.desc(), model.id.desc()).offset(offset).limit(1)
+        )
+        deep_keys.append(tuple(result.one()))
+    return Fixtures(user_ids, deep_keys)
+
+
+async def run_phase(session_maker, scenarios: List[str], requests: int, history: bool) -> Dict[str, dict]:
+    async with session_maker() as session:
+        fixtures = await load_fixtures(session, history)
+    rng = random.Random(requests)
+    results = {}
+    for name in scenarios:
+        latencies = []
+        # Первые запросы прогревают shared_buffers и планы
+        for i in range(requests + 5):
+            started = time.perf_counter()
+            async with session_maker() as session:
+                await SCENARIOS[name](TicketRepository(session), fixtures, rng, history)
+            if i >= 5:
+                latencies.append(time.perf_counter() - started)
+        results[name] = latency_summary(latencies)
+    return results
+
+
+async def restore_all(session_maker) -> int:
+    """Возвращает все тикеты из архива в tickets вместе со счётчиками"""
+    async with session_maker() as session:
+        result = await session.execute(
+            select(ArchivedTicket.user_id, func.count()).group_by(ArchivedTicket.user_id)
+        )
+        per_user = dict(result.all())
+        if not per_user:
+            return 0
+        archive = ArchivedTicket.__table__
+        await session.execute(
+            insert(Ticket).from_select(MOVED_COLUMNS, select(*(archive.c[name] for name in MOVED_COLUMNS)))
+        )
+        await session.execute(delete(ArchivedTicket))
+        moved = sum(per_user.values())
+        await CounterRepository(session).increment_many({
+            **TicketRepository._move_deltas(per_user, archived=-moved),
+            **dict.fromkeys(TicketRepository._version_keys(per_user), 1),
+        })
+        await session.commit()
+        return moved
+
+
+async def table_sizes(session: AsyncSession) -> Tuple[int, int]:
+    hot = (await session.execute(select(func.count()).select_from(Ticket))).scalar()
+    archived = (await session.execute(select(func.count()).select_from(ArchivedTicket))).scalar()
+    return hot, archived
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--archive-after-days", type=float, default=settings.ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--requests", type=int, default=200, help="запросов на сценарий в каждой фазе")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=", ".join(SCENARIOS))
+    parser.add_argument("--keep", action="store_true", help="не возвращать тикеты из архива в конце")
+    args = parser.parse_args()
+    scenarios = args.scenarios.split(",")
+
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("Archive benchmark needs PostgreSQL")
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    restored = await restore_all(session_maker)
+    if restored:
+        print(f"Restored {restored} tickets left in the archive by a previous run")
+    results: Dict[str, Dict[str, dict]] = {}
+    try:
+        await vacuum(engine)
+        results["before"] = await run_phase(session_maker, scenarios, args.requests, history=False)
+
+        mover = ArchiveMover(
+            session_maker, archive_after=timedelta(days=args.archive_after_days), batch_size=args.batch_size
+        )
+        started = time.perf_counter()
+        moved = await mover.run_once()
+        seconds = time.perf_counter() - started
+        async with session_maker() as session:
+            hot, archived = await table_sizes(session)
+        print(
+            f"Moved {moved} tickets in {seconds:.1f}s ({moved / seconds:.0f}/s), "
+            f"tickets={hot}, tickets_archive={archived}"
+        )
+
+        await vacuum(engine)
+        results["hot"] = await run_phase(session_maker, scenarios, args.requests, history=False)
+        results["history"] = await run_phase(session_maker, scenarios, args.requests, history=True)
+    finally:
+        if not args.keep:
+            started = time.perf_counter()
+            restored = await restore_all(session_maker)
+            print(f"Restored {restored} tickets in {time.perf_counter() - started:.1f}s")
+        await engine.dispose()
+
+    print_table(
+        ["scenario", *(f"{phase} p50 ms" for phase in PHASES), "hot p95 ms", "before p95 ms", "hot speedup p50"],
+        [
+            [
+                name,
+                *(results[phase][name]["p50_ms"] for phase in PHASES),
+                results["hot"][name]["p95_ms"],
+                results["before"][name]["p95_ms"],
+                results["before"][name]["p50_ms"] / results["hot"][name]["p50_ms"],
+            ]
+            for name in scenarios
+        ],
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,86 @@
+"""Массовая загрузка: POST /tickets/bulk (NDJSON) против POST /tickets/ по одному.
+
+Строки генерируются детерминированно (тексты benchmarks.seed, авторы —
+случайные клиенты через user_email) и действительно создают тикеты: запускайте
+на базе бенчмарков, а не на рабочей.
+
+    python -m benchmarks.bulk [--url http://127.0.0.1:8000] [--rows 20000] [--single 500]
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Iterator
+
+from benchmarks import seed
+from benchmarks.harness import http_client, login, print_table, run_timed, running_api
+
+
+def bulk_rows(rng: random.Random, count: int, clients: int) -> Iterator[dict]:
+    priorities = [priority.value for priority in seed.PRIORITY_WEIGHTS]
+    for _ in range(count):
+        topic, description = seed.ticket_text(rng)
+        yield {
+            "topic": topic,
+            "description": description,
+            "priority": rng.choice(priorities),
+            "user_email": seed.client_email(rng.randrange(clients)),
+        }
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="адрес запущенного API; без него API поднимается в этом процессе")
+    parser.add_argument("--rows", type=int, default=20_000, help="строк в одной массовой загрузке")
+    parser.add_argument("--single", type=int, default=500, help="тикетов через POST /tickets/")
+    parser.add_argument("--concurrency", type=int, default=10, help="параллельность POST /tickets/")
+    parser.add_argument("--clients", type=int, default=seed.SeedConfig.users, help="клиентов в базе (--users seed)")
+    parser.add_argument("--seed", type=int, default=seed.SeedConfig.seed)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    async with running_api(args.url) as base_url, http_client(base_url, args.concurrency + 5) as client:
+        admin = await login(client, seed.ADMIN_EMAIL, seed.PASSWORD)
+        author = await login(client, seed.client_email(0), seed.PASSWORD)
+
+        body = "".join(
+            json.dumps(row, ensure_ascii=False) + "\n" for row in bulk_rows(rng, args.rows, args.clients)
+        ).encode()
+        started = time.perf_counter()
+        response = await client.post(
+            "/tickets/bulk", content=body, headers={**admin, "Content-Type": "application/x-ndjson"}
+        )
+        bulk_seconds = time.perf_counter() - started
+        response.raise_for_status()
+        bulk = response.json()
+
+        single_rows = list(bulk_rows(rng, args.single, args.clients))
+
+        async def create(i: int) -> bool:
+            row = single_rows[i]
+            response = await client.post(
+                "/tickets/",
+                json={"topic": row["topic"], "description": row["description"], "priority": row["priority"]},
+                headers=author,
+            )
+            return response.status_code == 201
+
+        _, single_errors, single_seconds = await run_timed(create, args.single, args.concurrency)
+
+    print_table(
+        ["path", "rows", "created", "failed", "seconds", "rows/s"],
+        [
+            ["bulk", args.rows, bulk["created"], bulk["failed"], bulk_seconds, bulk["created"] / bulk_seconds],
+            [
+                f"single x{args.concurrency}", args.single, args.single - single_errors, single_errors,
+                single_seconds, (args.single - single_errors) / single_seconds,
+            ],
+        ],
+    )
+    return 0 if not bulk["failed"] and not single_errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,106 @@
+"""Очередь операторов под конкуренцией: TicketRepository.claim_next без HTTP.
+
+На каждом уровне параллельности (--claimers) столько же соединений
+одновременно берут тикеты из очереди, пока не наберут --claims. Печатает
+claims/s, перцентили одного claim и число тикетов, выданных дважды
+(при FOR UPDATE SKIP LOCKED должно быть 0). Закрепления снимаются до и
+после каждого уровня, так что база остаётся как после benchmarks.seed.
+Только PostgreSQL.
+
+    python -m benchmarks.claims [--claimers 1,10,50] [--claims 2000]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from datetime import timedelta
+from typing import List
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.enums import UserRole
+from app.db.session import create_engine_from_settings
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.repositories.ticket import TicketRepository
+from benchmarks.harness import latency_summary, print_table
+
+
+async def release_all(session_maker) -> None:
+    async with session_maker() as session:
+        await session.execute(
+            update(Ticket)
+            .where(Ticket.claimed_by.isnot(None))
+            .values(claimed_by=None, claimed_until=None, updated_at=Ticket.updated_at)
+        )
+        await session.commit()
+
+
+async def run_level(session_maker, operator_ids: List[int], claimers: int, claims: int) -> dict:
+    claimed: List[int] = []
+    latencies: List[float] = []
+    ttl = timedelta(hours=1)
+
+    async def claimer(number: int) -> None:
+        operator_id = operator_ids[number % len(operator_ids)]
+        while len(claimed) < claims:
+            started = time.perf_counter()
+            async with session_maker() as session:
+                ticket = await TicketRepository(session).claim_next(operator_id, ttl)
+            latencies.append(time.perf_counter() - started)
+            if ticket is None:
+                return
+            claimed.append(ticket.id)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(claimer(i) for i in range(claimers)))
+    seconds = time.perf_counter() - started
+    return {
+        "claimers": claimers,
+        "claims": len(claimed),
+        "claims_per_second": len(claimed) / seconds,
+        **latency_summary(latencies),
+        "duplicates": len(claimed) - len(set(claimed)),
+    }
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--claimers", default="1,10,50", help="уровни параллельности через запятую")
+    parser.add_argument("--claims", type=int, default=2000, help="тикетов на уровень")
+    args = parser.parse_args()
+    levels = [int(level) for level in args.claimers.split(",")]
+
+    rows = []
+    for claimers in levels:
+        engine = create_engine_from_settings(
+            settings.DATABASE_URL, name=f"claims{claimers}", pool_size=claimers, max_overflow=0
+        )
+        if engine.dialect.name != "postgresql":
+            raise SystemExit("FOR UPDATE SKIP LOCKED needs PostgreSQL")
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_maker() as session:
+            result = await session.execute(select(User.id).where(User.role == UserRole.OPERATOR).order_by(User.id))
+            operator_ids = list(result.scalars().all())
+        if not operator_ids:
+            raise SystemExit("No operators: run python -m benchmarks.seed first")
+
+        await release_all(session_maker)
+        try:
+            result = await run_level(session_maker, operator_ids, claimers, args.claims)
+        finally:
+            await release_all(session_maker)
+            await engine.dispose()
+        rows.append([
+            result["claimers"], result["claims"], result["claims_per_second"],
+            result["p50_ms"], result["p95_ms"], result["p99_ms"], result["duplicates"],
+        ])
+
+    print_table(["claimers", "claims", "claims/s", "p50 ms", "p95 ms", "p99 ms", "duplicates"], rows)
+    return 1 if any(row[-1] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,142 @@
+"""SSE для операторов: нагрузка на БД и задержка доставки от числа подписчиков.
+
+На каждом уровне (--subscribers) открывается столько потоков /tickets/stream,
+затем клиент создаёт --events тикетов и ждёт, пока событие ticket.created
+дойдёт до всех подписчиков. SQL считаются событиями engine API (в этом
+процессе), поэтому --url не поддерживается. Ожидаемо: SQL на событие не
+зависят от числа подписчиков, в простое SQL нет вовсе.
+
+    EVENTS_BACKEND=postgres python -m benchmarks.events [--subscribers 10,100,1000] [--events 50]
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import event
+
+from app.core.config import settings
+from benchmarks import seed
+from benchmarks.harness import http_client, latency_summary, login, print_table, running_api, scrape_metrics
+
+
+class StatementCounter:
+    def __init__(self, sync_engine):
+        self.count = 0
+        event.listen(sync_engine, "after_cursor_execute", self._count)
+
+    def _count(self, *args) -> None:
+        self.count += 1
+
+
+async def subscribe(
+    client: httpx.AsyncClient, headers: Dict[str, str], sent: List[float], latencies: List[float], ready
+) -> None:
+    """Читает поток и записывает задержку каждого ticket.created.
+
+    Тикеты создаются по одному, поэтому k-е событие относится к k-му запросу;
+    событие приходит раньше ответа на POST, и id к этому моменту ещё неизвестен.
+    """
+    received = 0
+    async with client.stream("GET", "/tickets/stream", headers=headers) as response:
+        response.raise_for_status()
+        event_type = None
+        async for line in response.aiter_lines():
+            if line.startswith("retry:"):
+                ready()
+            elif line.startswith("event:"):
+                event_type = line.split(":", 1)[1].strip()
+            elif line.startswith("data:") and event_type == "ticket.created" and received < len(sent):
+                latencies.append(time.perf_counter() - sent[received])
+                received += 1
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    statements: StatementCounter,
+    operator: Dict[str, str],
+    author: Dict[str, str],
+    subscribers: int,
+    events: int,
+    idle: float,
+) -> dict:
+    rng = random.Random(subscribers)
+    sent: List[float] = []
+    latencies: List[float] = []
+    connected = asyncio.Semaphore(0)
+    streams = [
+        asyncio.create_task(subscribe(client, operator, sent, latencies, connected.release))
+        for _ in range(subscribers)
+    ]
+    try:
+        for _ in range(subscribers):
+            await connected.acquire()
+
+        before = statements.count
+        await asyncio.sleep(idle)
+        idle_statements = statements.count - before
+
+        before = statements.count
+        started = time.perf_counter()
+        for _ in range(events):
+            topic, description = seed.ticket_text(rng)
+            sent.append(time.perf_counter())
+            response = await client.post(
+                "/tickets/", json={"topic": topic, "description": description}, headers=author
+            )
+            response.raise_for_status()
+        expected = events * subscribers
+        deadline = time.perf_counter() + 30
+        while len(latencies) < expected and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        seconds = time.perf_counter() - started
+        metrics = await scrape_metrics(client)
+        return {
+            "subscribers": subscribers,
+            "connected": int(metrics.get(("events_subscribers", frozenset()), 0)),
+            "delivered": f"{len(latencies)}/{expected}",
+            "statements_per_event": (statements.count - before) / events,
+            "idle_statements_per_second": idle_statements / idle,
+            "seconds": seconds,
+            **latency_summary(latencies),
+        }
+    finally:
+        for stream in streams:
+            stream.cancel()
+        await asyncio.gather(*streams, return_exceptions=True)
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", default="10,100,1000", help="уровни через запятую")
+    parser.add_argument("--events", type=int, default=50, help="событий на уровень")
+    parser.add_argument("--idle", type=float, default=2.0, help="секунд простоя для замера фоновых SQL")
+    args = parser.parse_args()
+    levels = [int(level) for level in args.subscribers.split(",")]
+
+    from app.db.session import get_engine
+
+    statements = StatementCounter(get_engine().sync_engine)
+    rows = []
+    async with running_api() as base_url, http_client(base_url, max(levels) + 20) as client:
+        operator = await login(client, seed.operator_email(0), seed.PASSWORD)
+        author = await login(client, seed.client_email(0), seed.PASSWORD)
+        for subscribers in levels:
+            result = await run_level(client, statements, operator, author, subscribers, args.events, args.idle)
+            rows.append([
+                result["subscribers"], result["connected"], result["delivered"], result["statements_per_event"],
+                result["idle_statements_per_second"], result["p50_ms"], result["p95_ms"], result["p99_ms"],
+            ])
+
+    print(f"EVENTS_BACKEND={settings.EVENTS_BACKEND.value}, {args.events} events per level")
+    print_table(
+        ["subscribers", "connected", "delivered", "SQL/event", "idle SQL/s", "p50 ms", "p95 ms", "p99 ms"], rows
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
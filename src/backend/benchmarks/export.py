@@ -0,0 +1,97 @@
+"""Память и скорость потоковых выгрузок CSV/XLSX.
+
+API поднимается в этом процессе, выгрузка читается по HTTP кусками и
+выбрасывается; RSS процесса (сервер и клиент вместе) снимается на каждом
+куске. Прирост пика RSS не должен зависеть от числа строк: сравните прогоны
+на базах разного размера (benchmarks.seed --tickets). С --budget-mb код
+возврата 1, если прирост пика RSS хотя бы одной выгрузки превысил бюджет.
+
+    python -m benchmarks.export [--formats csv,xlsx] [--budget-mb 64]
+"""
+import argparse
+import asyncio
+import gc
+import os
+import resource
+import sys
+import time
+
+from benchmarks import seed
+from benchmarks.harness import http_client, login, print_table, running_api
+
+EXPORTS = {
+    "tickets": "/tickets/export",
+    "stats": "/stats/records/export",
+}
+
+
+def rss_bytes() -> int:
+    """Текущий RSS; где нет /proc — пиковый (ru_maxrss)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        scale = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+async def run_export(client, headers, path: str, export_format: str) -> dict:
+    gc.collect()
+    baseline = peak = rss_bytes()
+    size = 0
+    started = time.perf_counter()
+    async with client.stream("GET", path, params={"format": export_format}, headers=headers) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_raw():
+            size += len(chunk)
+            peak = max(peak, rss_bytes())
+    seconds = time.perf_counter() - started
+    return {"bytes": size, "seconds": seconds, "peak_rss_growth": peak - baseline}
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--formats", default="csv,xlsx")
+    parser.add_argument("--exports", default=",".join(EXPORTS), help="tickets, stats")
+    parser.add_argument("--budget-mb", type=float, help="допустимый прирост пика RSS на одну выгрузку")
+    args = parser.parse_args()
+
+    from sqlalchemy import func, select
+
+    from app.db.session import async_session_maker
+    from app.models.stats import TicketStat
+    from app.models.ticket import Ticket
+
+    async with async_session_maker() as session:
+        counts = {
+            "tickets": (await session.execute(select(func.count()).select_from(Ticket))).scalar(),
+            "stats": (await session.execute(select(func.count()).select_from(TicketStat))).scalar(),
+        }
+
+    rows = []
+    over_budget = []
+    async with running_api() as base_url, http_client(base_url) as client:
+        headers = await login(client, seed.ADMIN_EMAIL, seed.PASSWORD)
+        for name in args.exports.split(","):
+            for export_format in args.formats.split(","):
+                result = await run_export(client, headers, EXPORTS[name], export_format)
+                rows.append([
+                    f"{name}.{export_format}",
+                    counts[name],
+                    result["bytes"] / 2**20,
+                    result["seconds"],
+                    counts[name] / result["seconds"],
+                    result["peak_rss_growth"] / 2**20,
+                ])
+                if args.budget_mb is not None and result["peak_rss_growth"] > args.budget_mb * 2**20:
+                    over_budget.append(f"{name}.{export_format}")
+
+    print_table(["export", "rows", "MB", "seconds", "rows/s", "peak RSS +MB"], rows)
+    if over_budget:
+        print(f"peak RSS growth over {args.budget_mb} MB: {', '.join(over_budget)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
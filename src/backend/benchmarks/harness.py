@@ -0,0 +1,184 @@
+"""Общие части бенчмарков: запуск API, HTTP-клиент, метрики и перцентили.
+
+Без --url API поднимается в этом же процессе (uvicorn на свободном порту
+127.0.0.1), запросы идут через настоящий HTTP, так что потоковые ответы (SSE,
+выгрузки) работают как в проде. Клиент и сервер делят одно ядро и event loop:
+для абсолютных цифр запускайте uvicorn отдельно и передавайте --url.
+"""
+import asyncio
+import logging
+import math
+import re
+import socket
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+MetricKey = Tuple[str, frozenset]
+
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+_LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+
+@asynccontextmanager
+async def running_api(url: Optional[str] = None) -> AsyncIterator[str]:
+    """Базовый URL API: переданный или поднятого в этом процессе"""
+    if url:
+        yield url.rstrip("/")
+        return
+
+    import uvicorn
+
+    from app.core.config import settings
+    from app.main import app
+    from app.similarity.engine import similarity_engine
+
+    # Под нагрузкой на одном ядре медленным будет почти каждый логин; отчёт печатает сам бенчмарк
+    logging.getLogger("app.slow_requests").setLevel(logging.ERROR)
+    # Перенос в архив менял бы данные посреди замера; архив проверяет benchmarks.archive
+    settings.ARCHIVE_MOVER_IN_API = False
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", access_log=False, lifespan="on"))
+    task = asyncio.create_task(server.serve(sockets=[sock]))
+    # Индекс похожих обращений строится в фоне при старте: ждём, чтобы сборка не делила CPU с замерами
+    while not server.started or (settings.SIMILARITY_ENABLED and not similarity_engine.ready):
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    try:
+        yield f"http://127.0.0.1:{sock.getsockname()[1]}"
+    finally:
+        server.should_exit = True
+        await task
+
+
+def http_client(base_url: str, connections: int = 100) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=httpx.Timeout(120, connect=10),
+        limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+    )
+
+
+async def login(client: httpx.AsyncClient, email: str, password: str) -> Dict[str, str]:
+    """Заголовки авторизации пользователя"""
+    response = await client.post("/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def login_many(
+    client: httpx.AsyncClient, emails: List[str], password: str, concurrency: int = 4
+) -> List[Dict[str, str]]:
+    """Логин нескольких пользователей; параллельность ограничена, чтобы не упереться в пул Argon2"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(email: str) -> Dict[str, str]:
+        async with semaphore:
+            return await login(client, email, password)
+
+    return list(await asyncio.gather(*(one(email) for email in emails)))
+
+
+def parse_metrics(text: str) -> Dict[MetricKey, float]:
+    """Сэмплы текстового формата Prometheus: (имя, метки) -> значение"""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = _SAMPLE.match(line)
+        if not match:
+            continue
+        name, labels, value = match.groups()
+        samples[(name, frozenset(_LABEL.findall(labels or "")))] = float(value)
+    return samples
+
+
+async def scrape_metrics(client: httpx.AsyncClient) -> Dict[MetricKey, float]:
+    response = await client.get("/metrics")
+    response.raise_for_status()
+    return parse_metrics(response.text)
+
+
+def metric_delta(before: Dict[MetricKey, float], after: Dict[MetricKey, float], name: str, **labels) -> float:
+    """Прирост сэмпла между двумя снимками /metrics"""
+    key = (name, frozenset((k, str(v)) for k, v in labels.items()))
+    return after.get(key, 0.0) - before.get(key, 0.0)
+
+
+def queries_per_request(
+    before: Dict[MetricKey, float], after: Dict[MetricKey, float], method: str, route: str
+) -> Optional[float]:
+    """Среднее число SQL на запрос к маршруту по гистограмме http_request_db_queries"""
+    count = metric_delta(before, after, "http_request_db_queries_count", method=method, route=route)
+    if not count:
+        return None
+    return metric_delta(before, after, "http_request_db_queries_sum", method=method, route=route) / count
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу"""
+    if not sorted_values:
+        return math.nan
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def latency_summary(seconds: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 и максимум в миллисекундах"""
+    values = sorted(seconds)
+    return {
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": (values[-1] if values else math.nan) * 1000,
+    }
+
+
+async def run_timed(
+    operation: Callable[[int], Awaitable[bool]], count: int, concurrency: int
+) -> Tuple[List[float], int, float]:
+    """Выполняет count операций в concurrency параллельных воркерах.
+
+    operation(i) возвращает False при ошибке. Результат — длительности
+    успешных операций, число ошибок и общее время.
+    """
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(count))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            ok = await operation(i)
+            elapsed = time.perf_counter() - started
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def print_table(headers: List[str], rows: List[List[object]]) -> None:
+    cells = [[_cell(value) for value in row] for row in rows]
+    widths = [max([len(header)] + [len(row[i]) for row in cells]) for i, header in enumerate(headers)]
+    for row in [headers] + cells:
+        print("  ".join(value.ljust(widths[i]) if i == 0 else value.rjust(widths[i]) for i, value in enumerate(row)))
+
+
+def _cell(value: object) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "-"
+        return f"{value:.1f}" if abs(value) >= 10 else f"{value:.2f}"
+    return str(value)
@@ -0,0 +1,136 @@
+"""Фильтры и сортировки /tickets/all: планы без Seq Scan по tickets и tickets_archive.
+
+Для каждого поддерживаемого сочетания фильтров, sort и include_archived
+строится запрос страницы TicketRepository.all_tickets_query. Проверяются
+первая страница и следующая по курсору, через EXPLAIN (ANALYZE, FORMAT JSON).
+Если где-то есть Seq Scan по таблице тикетов, печатаются эти сочетания и код
+выхода — 1. Запускайте на базе benchmarks.seed: на почти пустых таблицах Seq
+Scan дешевле индекса, и планировщик прав. Total в проверку не входит: точный
+COUNT по неизбирательному фильтру читает таблицу целиком при любых индексах,
+для него есть LIST_TOTAL_STRATEGY. Только PostgreSQL.
+
+    python -m benchmarks.listing [--top 10]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+from datetime import timedelta
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.enums import TicketPriority, TicketSort
+from app.db.session import get_engine
+from app.models.ticket import PRIORITY_RANK, Ticket
+from app.models.user import User
+from app.repositories.ticket import TicketRepository
+from benchmarks.harness import print_table
+
+TICKET_TABLES = {Ticket.__tablename__, "tickets_archive"}
+
+
+async def filter_sets(session: AsyncSession) -> List[dict]:
+    """Сочетания фильтров; даты и клиент берутся из данных базы"""
+    newest = (await session.execute(select(func.max(Ticket.created_at)))).scalar()
+    result = await session.execute(
+        select(User.email).join(Ticket, Ticket.user_id == User.id)
+        .group_by(User.email).order_by(func.count().desc()).limit(1)
+    )
+    owner = result.scalar()
+    month = {"created_from": newest - timedelta(days=30), "created_to": newest}
+    return [
+        {},
+        {"awaits_response": True},
+        {"awaits_response": False},
+        {"priority": TicketPriority.HIGH},
+        {"priority": TicketPriority.LOW},
+        month,
+        {"user_email": owner},
+        {"awaits_response": True, "priority": TicketPriority.HIGH},
+        {"priority": TicketPriority.MIDDLE, **month},
+        {"user_email": owner, "awaits_response": False},
+    ]
+
+
+def seq_scans(plan: dict) -> Iterator[str]:
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in TICKET_TABLES:
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+
+def cursor_key(ticket: Ticket, sort: TicketSort) -> tuple:
+    if sort == TicketSort.PRIORITY:
+        return PRIORITY_RANK[ticket.priority], ticket.created_at, ticket.id
+    return ticket.created_at, ticket.id
+
+
+async def explain(session: AsyncSession, query) -> Tuple[float, List[str]]:
+    compiled = query.compile(dialect=session.bind.dialect, compile_kwargs={"literal_binds": True})
+    connection = await session.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN (ANALYZE, FORMAT JSON) {compiled}")
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Execution Time"], sorted(set(seq_scans(plan[0]["Plan"])))
+
+
+def describe(filters: dict) -> str:
+    parts = []
+    for key, value in filters.items():
+        if key == "created_from":
+            parts.append("created 30d")
+        elif key != "created_to":
+            parts.append(f"{key}={getattr(value, 'value', value)}")
+    return ", ".join(parts) or "-"
+
+
+async def check_plans(session: AsyncSession, limit: int) -> List[list]:
+    """Строки [фильтры, sort, archive, страница, мс, seq scan] по всем сочетаниям"""
+    checks = []
+    repo = TicketRepository(session)
+    combinations = itertools.product(await filter_sets(session), TicketSort, (False, True))
+    for filters, sort, include_archived in combinations:
+        params = {"limit": limit + 1, "sort": sort, "include_archived": include_archived, **filters}
+        first = repo.all_tickets_query(**params)
+        rows = (await session.execute(first)).all()
+        pages = [("first", first)]
+        if len(rows) > limit:
+            after = cursor_key(rows[limit - 1][0], sort)
+            pages.append(("next", repo.all_tickets_query(after=after, **params)))
+        for page, query in pages:
+            milliseconds, scans = await explain(session, query)
+            checks.append([describe(filters), sort.value, include_archived, page, milliseconds, ", ".join(scans)])
+    return checks
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=20, help="размер страницы")
+    parser.add_argument("--top", type=int, default=10, help="сколько самых медленных запросов показать")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("EXPLAIN check needs PostgreSQL")
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_maker() as session:
+        checks = await check_plans(session, args.limit)
+
+    failed = [check for check in checks if check[-1]]
+    print(f"{len(checks)} plans checked, {len(failed)} with Seq Scan on ticket tables")
+    headers = ["filters", "sort", "archive", "page", "ms", "seq scan"]
+    if failed:
+        print_table(headers, failed)
+    print(f"Slowest {args.top}:")
+    print_table(headers, sorted(checks, key=lambda check: check[4], reverse=True)[:args.top])
+    await engine.dispose()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
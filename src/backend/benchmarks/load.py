@@ -0,0 +1,376 @@
+"""Нагрузочные сценарии горячих путей API с отчётом p50/p95/p99 и SQL на запрос.
+
+Сценарии (по одному HTTP-запросу на операцию):
+    login        POST /auth/login случайного клиента (Argon2)
+    create       POST /tickets/ от имени клиента
+    my_tickets   GET /tickets/ с переходом по next_cursor до --pages страниц
+    all_first    GET /tickets/all, первая страница
+    all_deep     GET /tickets/all с курсором из второй половины списка
+    search       GET /tickets/search (только PostgreSQL)
+    answer       PATCH /tickets/{id}/response оператором, по ждущим ответа тикетам
+    claim        POST /tickets/claim (только PostgreSQL)
+
+База заполняется benchmarks.seed (без --url — автоматически, если пуста);
+DATABASE_URL процесса бенчмарка должен указывать на базу тестируемого API:
+из неё берутся id тикетов и курсоры глубоких страниц. SQL на запрос считаются
+по /metrics (http_request_db_queries), поэтому работают и с --url.
+
+Сценарии create, answer и claim меняют данные; для сравнения с baseline
+запускайте на свежей базе (--reseed пересоздаёт её тем же --seed).
+
+С --baseline результат сравнивается с сохранённым (--save-baseline): если
+перцентиль из --compare вырос больше чем на --threshold (и больше
+--min-delta-ms), число SQL на запрос — больше чем на --queries-tolerance, или
+были ошибки, код выхода 1. Хвосты одного прогона шумят; для проверки
+регрессий берите --repeat 3 (в отчёт идут медианы замеров).
+
+    python -m benchmarks.load [--url http://127.0.0.1:8000] [--scenarios login,create]
+        [--requests 200] [--concurrency 10] [--baseline benchmarks/baseline.json]
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import func, select
+
+from app.core.pagination import encode_cursor
+from app.models.ticket import Ticket
+from benchmarks import seed
+from benchmarks.harness import (http_client, latency_summary, login_many, print_table, queries_per_request,
+                                run_timed, running_api, scrape_metrics)
+
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms", "max_ms")
+
+
+@dataclass
+class LoadContext:
+    client: httpx.AsyncClient
+    rng: random.Random
+    client_count: int
+    page_size: int
+    pages: int
+    clients: List[Dict[str, str]] = field(default_factory=list)
+    operators: List[Dict[str, str]] = field(default_factory=list)
+    awaiting_ids: List[int] = field(default_factory=list)
+    deep_cursors: List[str] = field(default_factory=list)
+    # Позиция обхода my_tickets: номер клиента -> (курсор, сколько страниц пройдено)
+    walkers: Dict[int, tuple] = field(default_factory=dict)
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    route: str
+    request: Callable[[LoadContext, int], Awaitable[httpx.Response]]
+    postgresql_only: bool = False
+
+
+async def _login(ctx: LoadContext, i: int) -> httpx.Response:
+    email = seed.client_email(ctx.rng.randrange(ctx.client_count))
+    return await ctx.client.post("/auth/login", json={"email": email, "password": seed.PASSWORD})
+
+
+async def _create(ctx: LoadContext, i: int) -> httpx.Response:
+    topic, description = seed.ticket_text(ctx.rng)
+    return await ctx.client.post(
+        "/tickets/",
+        json={"topic": topic, "description": description, "priority": ctx.rng.choice(list(seed.PRIORITY_WEIGHTS))},
+        headers=ctx.clients[i % len(ctx.clients)],
+    )
+
+
+async def _my_tickets(ctx: LoadContext, i: int) -> httpx.Response:
+    walker = i % len(ctx.clients)
+    cursor, depth = ctx.walkers.pop(walker, (None, 0))
+    params = {"limit": ctx.page_size}
+    if cursor:
+        params["cursor"] = cursor
+    response = await ctx.client.get("/tickets/", params=params, headers=ctx.clients[walker])
+    if response.status_code == 200:
+        next_cursor = response.json().get("next_cursor")
+        if next_cursor and depth + 1 < ctx.pages:
+            ctx.walkers[walker] = (next_cursor, depth + 1)
+    return response
+
+
+async def _all_first(ctx: LoadContext, i: int) -> httpx.Response:
+    return await ctx.client.get(
+        "/tickets/all", params={"limit": ctx.page_size}, headers=ctx.operators[i % len(ctx.operators)]
+    )
+
+
+async def _all_deep(ctx: LoadContext, i: int) -> httpx.Response:
+    return await ctx.client.get(
+        "/tickets/all",
+        params={"limit": ctx.page_size, "cursor": ctx.deep_cursors[i % len(ctx.deep_cursors)]},
+        headers=ctx.operators[i % len(ctx.operators)],
+    )
+
+
+async def _search(ctx: LoadContext, i: int) -> httpx.Response:
+    query = f"{ctx.rng.choice(seed.SUBJECTS)} {ctx.rng.choice(seed.PROBLEMS)}"
+    return await ctx.client.get(
+        "/tickets/search", params={"q": query, "limit": ctx.page_size}, headers=ctx.operators[i % len(ctx.operators)]
+    )
+
+
+async def _answer(ctx: LoadContext, i: int) -> httpx.Response:
+    ticket_id = ctx.awaiting_ids[i % len(ctx.awaiting_ids)]
+    return await ctx.client.patch(
+        f"/tickets/{ticket_id}/response",
+        json={"response": seed.response_text(ctx.rng), "awaits_response": False},
+        headers=ctx.operators[i % len(ctx.operators)],
+    )
+
+
+async def _claim(ctx: LoadContext, i: int) -> httpx.Response:
+    return await ctx.client.post("/tickets/claim", headers=ctx.operators[i % len(ctx.operators)])
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("login", "POST", "/auth/login", _login),
+        Scenario("create", "POST", "/tickets/", _create),
+        Scenario("my_tickets", "GET", "/tickets/", _my_tickets),
+        Scenario("all_first", "GET", "/tickets/all", _all_first),
+        Scenario("all_deep", "GET", "/tickets/all", _all_deep),
+        Scenario("search", "GET", "/tickets/search", _search, postgresql_only=True),
+        Scenario("answer", "PATCH", "/tickets/{ticket_id}/response", _answer),
+        Scenario("claim", "POST", "/tickets/claim", _claim, postgresql_only=True),
+    )
+}
+
+
+async def prepare_database(config: seed.SeedConfig, auto_seed: bool, reseed: bool) -> dict:
+    """Проверяет (и при необходимости заполняет) базу; возвращает её параметры для отчёта"""
+    from app.db.session import async_session_maker, get_engine
+
+    engine = get_engine()
+
+    if reseed:
+        print(f"Reseeding {config.users} users and {config.tickets} tickets...", flush=True)
+        await seed.seed(engine, config, reset=True)
+    async with async_session_maker() as session:
+        seeded = await seed.is_seeded(session) if await _has_schema(session) else False
+    if not seeded:
+        if not auto_seed:
+            raise SystemExit("Database is empty: run python -m benchmarks.seed first")
+        print(f"Seeding {config.users} users and {config.tickets} tickets...", flush=True)
+        await seed.seed(engine, config)
+
+    async with async_session_maker() as session:
+        tickets = (await session.execute(select(func.count()).select_from(Ticket))).scalar()
+    return {"dialect": engine.dialect.name, "tickets": tickets}
+
+
+async def _has_schema(session) -> bool:
+    def inspect(connection) -> bool:
+        from sqlalchemy import inspect as sa_inspect
+
+        return sa_inspect(connection).has_table("users")
+
+    connection = await session.connection()
+    return await connection.run_sync(inspect)
+
+
+async def load_fixtures(ctx: LoadContext, sample: int) -> None:
+    """Ждущие ответа тикеты и курсоры глубоких страниц; выбор детерминирован от --seed"""
+    from app.db.session import async_session_maker
+
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(Ticket.id).where(Ticket.awaits_response).order_by(Ticket.id.desc()).limit(sample * 10)
+        )
+        awaiting = list(result.scalars().all())
+        ctx.rng.shuffle(awaiting)
+        ctx.awaiting_ids = awaiting[:sample] or [1]
+
+        total = (await session.execute(select(func.count()).select_from(Ticket))).scalar()
+        ordered = select(Ticket.created_at, Ticket.id).order_by(Ticket.created_at.desc(), Ticket.id.desc())
+        for _ in range(20):
+            offset = ctx.rng.randrange(total // 2, max(total - ctx.page_size, total // 2 + 1))
+            row = (await session.execute(ordered.offset(offset).limit(1))).first()
+            if row is not None:
+                ctx.deep_cursors.append(encode_cursor(*row))
+
+
+async def run_scenario(
+    ctx: LoadContext, scenario: Scenario, requests: int, concurrency: int, warmup: int, repeat: int
+) -> dict:
+    """Прогрев и repeat замеров по requests запросов; в отчёт идут медианы замеров"""
+    async def operation(i: int) -> bool:
+        response = await scenario.request(ctx, i)
+        return response.status_code < 400
+
+    await run_timed(operation, warmup, concurrency)
+    runs = []
+    for run in range(repeat):
+        before = await scrape_metrics(ctx.client)
+        latencies, errors, seconds = await run_timed(
+            lambda i, run=run: operation(warmup + run * requests + i), requests, concurrency
+        )
+        after = await scrape_metrics(ctx.client)
+        runs.append({
+            "errors": errors,
+            "rps": requests / seconds,
+            **latency_summary(latencies),
+            "queries_per_request": queries_per_request(before, after, scenario.method, scenario.route),
+        })
+
+    def median(key: str) -> Optional[float]:
+        values = [run[key] for run in runs if run[key] is not None]
+        return statistics.median(values) if values else None
+
+    return {
+        "requests": requests,
+        "repeat": repeat,
+        "errors": sum(run["errors"] for run in runs),
+        "rps": median("rps"),
+        **{key: median(key) for key in LATENCY_KEYS},
+        "queries_per_request": median("queries_per_request"),
+    }
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    keys: List[str],
+    threshold: float,
+    min_delta_ms: float,
+    queries_tolerance: float,
+) -> List[str]:
+    """Список регрессий относительно baseline"""
+    regressions = []
+    for name, current in results["scenarios"].items():
+        if current["errors"]:
+            regressions.append(f"{name}: {current['errors']} failed requests")
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        for key in keys:
+            old, new = previous.get(key), current.get(key)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + threshold) and new - old > min_delta_ms:
+                regressions.append(f"{name}: {key} {old:.1f} -> {new:.1f} ms (+{(new / old - 1) * 100:.0f}%)")
+        old, new = previous.get("queries_per_request"), current.get("queries_per_request")
+        if old is not None and new is not None and new > old + queries_tolerance:
+            regressions.append(f"{name}: queries per request {old:.2f} -> {new:.2f}")
+    return regressions
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="адрес запущенного API; без него API поднимается в этом процессе")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="через запятую, по умолчанию все")
+    parser.add_argument("--requests", type=int, default=200, help="запросов на сценарий")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=1, help="замеров на сценарий, в отчёт идёт медиана")
+    parser.add_argument("--sessions", type=int, default=20, help="сколько клиентов и операторов залогинить")
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=5, help="глубина обхода my_tickets")
+    parser.add_argument("--users", type=int, default=seed.SeedConfig.users, help="для автозаполнения базы")
+    parser.add_argument("--tickets", type=int, default=seed.SeedConfig.tickets, help="для автозаполнения базы")
+    parser.add_argument("--seed", type=int, default=seed.SeedConfig.seed)
+    parser.add_argument("--reseed", action="store_true", help="пересоздать базу перед прогоном")
+    parser.add_argument("--baseline", help="JSON с прошлым результатом для сравнения")
+    parser.add_argument("--compare", default="p50,p95", help="какие перцентили сравнивать с baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="допустимый рост перцентиля, доля")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="меньший рост не считается регрессией")
+    parser.add_argument("--queries-tolerance", type=float, default=0.5)
+    parser.add_argument("--save-baseline", help="куда записать результат как новый baseline")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    compare_keys = [f"{key.strip()}_ms" for key in args.compare.split(",") if key.strip()]
+    if set(compare_keys) - set(LATENCY_KEYS):
+        parser.error(f"--compare accepts {', '.join(key[:-3] for key in LATENCY_KEYS)}")
+
+    config = seed.SeedConfig(users=args.users, tickets=args.tickets, seed=args.seed)
+    database = await prepare_database(config, auto_seed=args.url is None, reseed=args.reseed)
+
+    results = {
+        "meta": {
+            **database,
+            "target": args.url or "in-process",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "repeat": args.repeat,
+            "page_size": args.page_size,
+            "python": platform.python_version(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "scenarios": {},
+    }
+    async with running_api(args.url) as base_url, http_client(base_url, args.concurrency + 10) as client:
+        ctx = LoadContext(client, random.Random(args.seed), args.users, args.page_size, args.pages)
+        ctx.clients = await login_many(
+            client, [seed.client_email(i) for i in range(min(args.sessions, args.users))], seed.PASSWORD
+        )
+        ctx.operators = await login_many(
+            client, [seed.operator_email(i) for i in range(min(args.sessions, config.operators))], seed.PASSWORD
+        )
+        await load_fixtures(ctx, sample=args.requests * args.repeat + args.warmup)
+
+        for name in names:
+            scenario = SCENARIOS[name]
+            if scenario.postgresql_only and database["dialect"] != "postgresql":
+                print(f"{name}: skipped on {database['dialect']}", flush=True)
+                continue
+            print(f"{name}...", flush=True)
+            results["scenarios"][name] = await run_scenario(
+                ctx, scenario, args.requests, args.concurrency, args.warmup, args.repeat
+            )
+
+    print(
+        f"\n{database['dialect']}, {database['tickets']} tickets, {results['meta']['target']}, "
+        f"concurrency {args.concurrency}, {args.requests} requests per scenario x {args.repeat}"
+    )
+    print_table(
+        ["scenario", "rps", "p50 ms", "p95 ms", "p99 ms", "max ms", "queries/req", "errors"],
+        [
+            [name, r["rps"], r["p50_ms"], r["p95_ms"], r["p99_ms"], r["max_ms"], r["queries_per_request"], r["errors"]]
+            for name, r in results["scenarios"].items()
+        ],
+    )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"\nBaseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        for key in ("dialect", "tickets", "concurrency", "page_size"):
+            if baseline.get("meta", {}).get(key) != results["meta"][key]:
+                print(f"warning: baseline {key}={baseline.get('meta', {}).get(key)}, now {results['meta'][key]}")
+        regressions = compare(
+            results, baseline, compare_keys, args.threshold, args.min_delta_ms, args.queries_tolerance
+        )
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,212 @@
+"""Детерминированные данные для бенчмарков: пользователи, операторы и тикеты.
+
+Один и тот же --seed даёт ту же базу: те же email, темы, приоритеты, даты и
+ответы. Даты отсчитываются от фиксированного ANCHOR, а не от текущего времени.
+Распределения близки к живой поддержке: тикеты по клиентам распределены по
+Парето (немногие пишут часто), LOW/MIDDLE/HIGH = 60/30/10 %, старые тикеты
+почти все отвечены, свежие — реже, срочные отвечают быстрее.
+
+Пишет в DATABASE_URL (PostgreSQL или SQLite), схема создаётся create_all,
+как при старте API. ticket_stats не заполняется: его наполняет сценарий ответа.
+
+    python -m benchmarks.seed [--users 1000] [--tickets 100000] [--reset]
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from app.core.enums import TicketPriority, UserRole
+from app.core.security import get_password_hash
+from app.db.base import Base
+from app.models import counter, draft, stats  # noqa: F401  все таблицы в Base.metadata для create_all/drop_all
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.repositories.counter import CounterRepository, TICKETS_KEY, USERS_KEY, user_tickets_key
+
+# У всех пользователей бенчмарка один пароль: Argon2 считается один раз
+PASSWORD = "bench-password"
+ADMIN_EMAIL = "admin@bench.example"
+ANCHOR = datetime(2026, 1, 1, tzinfo=timezone.utc)
+BATCH_SIZE = 5000
+
+PRIORITY_WEIGHTS = {TicketPriority.LOW: 60, TicketPriority.MIDDLE: 30, TicketPriority.HIGH: 10}
+# Доля отвеченных среди тикетов старше двух суток; свежие отвечены вдвое реже
+ANSWER_RATE = {TicketPriority.LOW: 0.80, TicketPriority.MIDDLE: 0.88, TicketPriority.HIGH: 0.95}
+# Среднее время до ответа, часы
+ANSWER_HOURS = {TicketPriority.LOW: 20.0, TicketPriority.MIDDLE: 8.0, TicketPriority.HIGH: 2.0}
+
+SUBJECTS = [
+    "принтер", "ноутбук", "VPN", "почта", "пароль", "монитор", "1С", "Wi-Fi", "сканер",
+    "телефон", "доступ к папке", "учётная запись", "Outlook", "Teams", "видеокамера", "сайт",
+]
+PROBLEMS = [
+    "не работает", "не включается", "выдаёт ошибку", "очень медленно работает",
+    "не подключается", "перестал открываться", "требует обновления", "зависает",
+]
+DETAILS = [
+    "После обновления системы {subject} {problem}, перезагрузка не помогла.",
+    "С утра {subject} {problem}. Коллеги в кабинете {room} жалуются на то же самое.",
+    "При попытке открыть {subject} появляется сообщение «Ошибка {code}».",
+    "Прошу помочь: {subject} {problem}, а мне нужно срочно отправить отчёт.",
+    "Вчера всё было нормально, сегодня {subject} {problem}. Пробовал переподключить кабель.",
+    "Не могу войти: {subject} {problem}, пишет, что срок действия пароля истёк.",
+]
+RESPONSES = [
+    "Перезапустили службу на сервере, проверьте, пожалуйста, ещё раз.",
+    "Сбросили пароль, новый отправлен в SMS. Смените его при первом входе.",
+    "Обновили драйвер удалённо, проблема должна уйти после перезагрузки.",
+    "Заявка передана инженеру, он подойдёт в кабинет {room} до конца дня.",
+    "Доступ выдан, изменения вступят в силу после повторного входа в систему.",
+    "Это известная проблема, исправление выйдет сегодня вечером.",
+]
+
+
+def client_email(number: int) -> str:
+    return f"user{number}@bench.example"
+
+
+def operator_email(number: int) -> str:
+    return f"operator{number}@bench.example"
+
+
+@dataclass
+class SeedConfig:
+    users: int = 1000
+    operators: int = 10
+    tickets: int = 100_000
+    days: int = 365
+    seed: int = 42
+
+
+def ticket_text(rng: random.Random) -> tuple[str, str]:
+    """Тема и описание обращения"""
+    subject = rng.choice(SUBJECTS)
+    problem = rng.choice(PROBLEMS)
+    topic = f"{subject[0].upper()}{subject[1:]} {problem}"
+    description = " ".join(
+        rng.choice(DETAILS).format(
+            subject=subject, problem=problem, room=rng.randint(100, 599), code=rng.randint(1, 999)
+        )
+        for _ in range(rng.randint(1, 3))
+    )
+    return topic, description
+
+
+def response_text(rng: random.Random) -> str:
+    return rng.choice(RESPONSES).format(room=rng.randint(100, 599))
+
+
+def generate_tickets(config: SeedConfig, user_ids: List[int]) -> Iterator[dict]:
+    """Строки tickets по возрастанию created_at (id растут вместе со временем, как в живой базе)"""
+    rng = random.Random(config.seed)
+    weights = [rng.paretovariate(2.0) for _ in user_ids]
+    owners = rng.choices(user_ids, weights=weights, k=config.tickets)
+    span = config.days * 86400
+    offsets = sorted((rng.random() * span for _ in range(config.tickets)), reverse=True)
+    priorities = list(PRIORITY_WEIGHTS)
+    priority_weights = list(PRIORITY_WEIGHTS.values())
+    for owner, offset in zip(owners, offsets):
+        priority = rng.choices(priorities, weights=priority_weights)[0]
+        created_at = ANCHOR - timedelta(seconds=offset)
+        topic, description = ticket_text(rng)
+        answer_rate = ANSWER_RATE[priority] if offset > 2 * 86400 else ANSWER_RATE[priority] / 2
+        answered = rng.random() < answer_rate
+        row = {
+            "user_id": owner,
+            "topic": topic,
+            "description": description,
+            "priority": priority,
+            "awaits_response": not answered,
+            "response": None,
+            "created_at": created_at,
+            "updated_at": None,
+        }
+        if answered:
+            answered_after = min(rng.expovariate(1 / ANSWER_HOURS[priority]) * 3600, offset)
+            row["response"] = response_text(rng)
+            row["updated_at"] = created_at + timedelta(seconds=answered_after)
+        yield row
+
+
+async def is_seeded(session: AsyncSession) -> bool:
+    result = await session.execute(select(func.count()).select_from(User))
+    return result.scalar() > 0
+
+
+async def seed(engine: AsyncEngine, config: SeedConfig, reset: bool = False) -> None:
+    """Создаёт схему и заполняет её; без reset отказывается писать в непустую базу"""
+    async with engine.begin() as conn:
+        if reset:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_maker() as session:
+        if await is_seeded(session):
+            raise SystemExit("Database is not empty, use --reset to recreate the schema")
+
+        hashed_password = get_password_hash(PASSWORD)
+        users = [{"email": client_email(i), "hashed_password": hashed_password, "role": UserRole.USER}
+                 for i in range(config.users)]
+        users += [{"email": operator_email(i), "hashed_password": hashed_password, "role": UserRole.OPERATOR}
+                  for i in range(config.operators)]
+        users.append({"email": ADMIN_EMAIL, "hashed_password": hashed_password, "role": UserRole.ADMIN})
+        result = await session.execute(insert(User).returning(User.id, User.role, sort_by_parameter_order=True), users)
+        client_ids = [user_id for user_id, role in result.all() if role == UserRole.USER]
+
+        per_user: Counter = Counter()
+        batch: List[dict] = []
+        for row in generate_tickets(config, client_ids):
+            batch.append(row)
+            per_user[row["user_id"]] += 1
+            if len(batch) >= BATCH_SIZE:
+                await session.execute(insert(Ticket), batch)
+                batch.clear()
+        if batch:
+            await session.execute(insert(Ticket), batch)
+
+        counters = CounterRepository(session)
+        deltas = {user_tickets_key(user_id): count for user_id, count in per_user.items()}
+        deltas[TICKETS_KEY] = config.tickets
+        deltas[USERS_KEY] = len(users)
+        keys = sorted(deltas)
+        for start in range(0, len(keys), BATCH_SIZE):
+            await counters.increment_many({key: deltas[key] for key in keys[start:start + BATCH_SIZE]})
+        await session.commit()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=SeedConfig.users)
+    parser.add_argument("--operators", type=int, default=SeedConfig.operators)
+    parser.add_argument("--tickets", type=int, default=SeedConfig.tickets)
+    parser.add_argument("--days", type=int, default=SeedConfig.days)
+    parser.add_argument("--seed", type=int, default=SeedConfig.seed)
+    parser.add_argument("--reset", action="store_true", help="удалить и заново создать все таблицы")
+    args = parser.parse_args()
+
+    from app.db.session import get_engine
+
+    engine = get_engine()
+    config = SeedConfig(
+        users=args.users, operators=args.operators, tickets=args.tickets, days=args.days, seed=args.seed
+    )
+    started = time.perf_counter()
+    await seed(engine, config, reset=args.reset)
+    await engine.dispose()
+    print(
+        f"Seeded {config.users} users, {config.operators} operators, {config.tickets} tickets "
+        f"({engine.dialect.name}) in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
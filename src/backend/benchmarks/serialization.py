@@ -0,0 +1,110 @@
+"""Микробенчмарк сериализации страницы тикетов (без БД и HTTP).
+
+Сравнивает прежнюю сборку ответа /tickets/all (model_validate -> model_dump ->
+повторная валидация) со сборкой через DBResponse.from_db и считает полную
+цену страницы так, как её отдаёт FastAPI: сборка схемы, проверка response_model
+и сериализация в JSON одним проходом (pydantic-core).
+
+    python -m benchmarks.serialization [--rows 100] [--repeat 2000]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from pydantic import TypeAdapter
+
+from app.core.enums import TicketPriority, UserRole
+from app.models.ticket import Ticket
+from app.schemas.ticket import (TicketListResponse, TicketListResponseWithUser, TicketResponse,
+                                TicketResponseWithUser)
+
+
+def make_rows(count: int) -> list[tuple[Ticket, str, UserRole]]:
+    """Тикеты вне сессии с теми же типами атрибутов, что приходят из БД"""
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    priorities = list(TicketPriority)
+    rows = []
+    for i in range(count):
+        answered = i % 3 == 0
+        ticket = Ticket(
+            id=i + 1,
+            user_id=i % 50 + 1,
+            topic=f"Не работает принтер в кабинете {i}",
+            description="Принтер не печатает, на экране ошибка замятия бумаги. " * 4,
+            priority=priorities[i % len(priorities)],
+            awaits_response=not answered,
+            response="Откройте заднюю крышку и извлеките бумагу." if answered else None,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now if answered else None,
+        )
+        rows.append((ticket, f"user{i % 50}@example.com", UserRole.USER))
+    return rows
+
+
+def all_tickets_before(rows) -> TicketListResponseWithUser:
+    tickets = []
+    for ticket, user_email, user_role in rows:
+        ticket_dict = TicketResponse.model_validate(ticket).model_dump()
+        ticket_dict["user_email"] = user_email or "unknown"
+        ticket_dict["user_role"] = user_role.value if user_role else "user"
+        tickets.append(TicketResponseWithUser(**ticket_dict))
+    return TicketListResponseWithUser(tickets=tickets, total=len(rows), has_more=True)
+
+
+def all_tickets_after(rows) -> TicketListResponseWithUser:
+    tickets = [
+        TicketResponseWithUser.from_db(ticket, user_email=user_email or "unknown", user_role=user_role)
+        for ticket, user_email, user_role in rows
+    ]
+    return TicketListResponseWithUser(tickets=tickets, total=len(rows), has_more=True)
+
+
+def my_tickets_before(rows) -> TicketListResponse:
+    return TicketListResponse(tickets=[TicketResponse.model_validate(t) for t, _, _ in rows], total=len(rows))
+
+
+def my_tickets_after(rows) -> TicketListResponse:
+    return TicketListResponse(tickets=[TicketResponse.from_db(t) for t, _, _ in rows], total=len(rows))
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    """Медиана из пяти прогонов, микросекунды на вызов"""
+    func()
+    runs = []
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        runs.append((time.perf_counter() - started) / repeat * 1e6)
+    return sorted(runs)[len(runs) // 2]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+    rows = make_rows(args.rows)
+
+    cases = [
+        ("/tickets/all", TicketListResponseWithUser, all_tickets_before, all_tickets_after),
+        ("/tickets/", TicketListResponse, my_tickets_before, my_tickets_after),
+    ]
+    print(f"{args.rows} tickets per page, microseconds per page (median of 5 x {args.repeat})")
+    print(f"{'endpoint':<14}{'path':<8}{'build':>10}{'response':>12}")
+    for name, model, before, after in cases:
+        adapter = TypeAdapter(model)
+        assert adapter.dump_json(before(rows)) == adapter.dump_json(after(rows)), name
+        for label, build in (("before", before), ("after", after)):
+            build_us = measure(lambda build=build: build(rows), args.repeat)
+            # Как FastAPI с response_model: проверка возвращённой модели и dump_json
+            response_us = measure(
+                lambda adapter=adapter, build=build: adapter.dump_json(adapter.validate_python(build(rows))),
+                args.repeat,
+            )
+            print(f"{name:<14}{label:<8}{build_us:>10.0f}{response_us:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
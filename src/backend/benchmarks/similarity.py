@@ -0,0 +1,85 @@
+"""Индекс похожих обращений: полнота и задержка IVF против полного перебора.
+
+Без БД: корпус генерируется текстами benchmarks.seed, кодируется настроенным
+кодировщиком (SIMILARITY_ENCODER) и индексируется так же, как в
+SimilarityEngine (nlist = sqrt(N)). Синтетические тексты часто совпадают,
+поэтому recall@k считается по сходству: доля выданных IVF результатов, не
+хуже k-го результата точного поиска.
+
+    python -m benchmarks.similarity [--tickets 50000] [--queries 200] [--nprobe 1,4,8,16,32]
+"""
+import argparse
+import math
+import random
+import sys
+import time
+
+import numpy as np
+
+from app.core.config import settings
+from app.similarity.encoders import create_encoder
+from app.similarity.engine import ticket_text
+from app.similarity.index import VectorIndex
+from benchmarks import seed
+from benchmarks.harness import latency_summary, print_table
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", default=f"1,4,{settings.SIMILARITY_NPROBE},16,32")
+    parser.add_argument("--seed", type=int, default=seed.SeedConfig.seed)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    texts = [ticket_text(*seed.ticket_text(rng)) for _ in range(args.tickets)]
+    answered = np.array([rng.random() < 0.8 for _ in range(args.tickets)], dtype=bool)
+    ids = np.arange(1, args.tickets + 1, dtype=np.int64)
+
+    started = time.perf_counter()
+    encoder = create_encoder()
+    encoder.fit(texts)
+    index = VectorIndex(encoder.dim, capacity=args.tickets)
+    for start in range(0, args.tickets, 4096):
+        index.upsert(ids[start:start + 4096], encoder.encode(texts[start:start + 4096]), answered[start:start + 4096])
+    encoded = time.perf_counter()
+    index.train(nlist=int(math.sqrt(index.size)))
+    trained = time.perf_counter()
+    print(
+        f"{args.tickets} tickets: encode {encoded - started:.1f}s, "
+        f"train nlist={len(index.centroids)} {trained - encoded:.1f}s"
+    )
+
+    query_ids = rng.sample(range(1, args.tickets + 1), args.queries)
+
+    def run(nprobe):
+        latencies, results = [], []
+        for ticket_id in query_ids:
+            query = index.get_vector(ticket_id)
+            started = time.perf_counter()
+            results.append(index.search(query, args.k, nprobe=nprobe, answered_only=True, exclude_id=ticket_id))
+            latencies.append(time.perf_counter() - started)
+        return latencies, results
+
+    exact_latencies, exact = run(None)
+    rows = [["brute force", 1.0, *latency_summary(exact_latencies).values()]]
+    for nprobe in (int(value) for value in args.nprobe.split(",")):
+        latencies, found = run(nprobe)
+        hits = total = 0
+        for approximate, reference in zip(found, exact):
+            if not reference:
+                continue
+            # Погрешность float32: равные по тексту векторы могут отличаться в последнем знаке
+            kth_score = reference[-1][1] - 1e-6
+            hits += sum(score >= kth_score for _, score in approximate[:len(reference)])
+            total += len(reference)
+        rows.append([f"ivf nprobe={nprobe}", hits / total if total else math.nan, *latency_summary(latencies).values()])
+
+    print_table([f"search (k={args.k})", "recall", "p50 ms", "p95 ms", "p99 ms", "max ms"], rows)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
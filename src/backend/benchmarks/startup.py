@@ -0,0 +1,53 @@
+"""Холодный импорт app.main: бюджет времени и отложенные зависимости.
+
+Каждый замер — новый интерпретатор; сравнивается медиана с --budget-ms.
+Отдельно проверяется, что тяжёлые зависимости, которые загружаются при первом
+использовании (--deferred), не попали в импорт снова: это от скорости машины
+не зависит. При нарушении печатаются самые тяжёлые модули приложения и
+выход 1, как у benchmarks.load при регрессии.
+
+    python -m benchmarks.startup [--budget-ms 1000] [--runs 5] [--deferred numpy,jose,...]
+"""
+import argparse
+import statistics
+import sys
+
+from app.cli.import_profile import cold_import_seconds, print_profile, profile_imports
+
+DEFERRED = "numpy,jose,passlib,argon2,asyncpg"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=1000, help="бюджет медианы холодного импорта")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--deferred", default=DEFERRED, help="модули, которых не должно быть в импорте")
+    args = parser.parse_args()
+
+    timings = [cold_import_seconds(args.module) * 1000 for _ in range(args.runs)]
+    median = statistics.median(timings)
+    records = profile_imports(args.module)
+    loaded = {record.module for record in records}
+    leaked = [name for name in args.deferred.split(",") if name and name in loaded]
+
+    print(
+        f"import {args.module}: median {median:.0f} ms "
+        f"(min {min(timings):.0f}, max {max(timings):.0f}, {args.runs} runs), budget {args.budget_ms:.0f} ms"
+    )
+    print(f"{len(records)} modules loaded")
+    failed = False
+    if median > args.budget_ms:
+        print(f"REGRESSION: cold import is over budget by {median - args.budget_ms:.0f} ms")
+        failed = True
+    if leaked:
+        print(f"REGRESSION: imported eagerly again: {', '.join(leaked)}")
+        failed = True
+    if failed:
+        print()
+        print_profile(records, top=15, sort="cumulative", prefix="app.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
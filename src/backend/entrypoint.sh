@@ -5,8 +5,6 @@ while ! nc -z db 5432; do
 done
 echo "Database started"
 
-echo "Running migrations..."
-alembic upgrade head
-
+# Миграции один раз, затем воркеры uvicorn (число — SERVER_WORKERS или --workers в аргументах)
 echo "Starting server..."
-uvicorn app.main:app --host 0.0.0.0 --port 8000
\ No newline at end of file
+exec python -m app.cli.serve "$@"
\ No newline at end of file
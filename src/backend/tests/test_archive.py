@@ -0,0 +1,71 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+
+from app.core.enums import TicketPriority
+from app.db.session import async_session_maker
+from app.models.ticket import ArchivedTicket, Ticket
+from app.repositories.ticket import TicketRepository
+
+
+def mail_row(user_id: int, message_id: str) -> dict:
+    return {
+        "user_id": user_id,
+        "topic": "Mail",
+        "description": "Mail is not delivered",
+        "priority": TicketPriority.LOW,
+        "message_id": message_id,
+    }
+
+
+async def _archive_answered(user_id: int, message_id: str) -> int:
+    async with async_session_maker() as session:
+        repo = TicketRepository(session)
+        [ticket_id] = await repo.create_many([mail_row(user_id, message_id)], skip_duplicates=True)
+        await repo.update_response(ticket_id, "Fixed", awaits_response=False)
+        while await repo.archive_batch(datetime.now(timezone.utc) + timedelta(days=1)):
+            pass
+        assert await session.get(ArchivedTicket, ticket_id) is not None
+        return ticket_id
+
+
+async def _create_many(rows: list, skip_duplicates: bool) -> list:
+    async with async_session_maker() as session:
+        return await TicketRepository(session).create_many(rows, skip_duplicates=skip_duplicates)
+
+
+async def _answer(ticket_id: int):
+    async with async_session_maker() as session:
+        ticket = await TicketRepository(session).update_response(ticket_id, "Again", awaits_response=False)
+        return ticket.id, ticket.message_id
+
+
+async def _ticket_ids(message_id: str) -> list:
+    async with async_session_maker() as session:
+        result = await session.execute(select(Ticket.id).where(Ticket.message_id == message_id))
+        return list(result.scalars().all())
+
+
+def test_redelivered_mail_of_archived_ticket_is_skipped(client, make_user):
+    user_id, _ = make_user()
+    message_id = f"{uuid.uuid4().hex}@example.com"
+    archived_id = client.portal.call(_archive_answered, user_id, message_id)
+
+    fresh_id = f"{uuid.uuid4().hex}@example.com"
+    outcomes = client.portal.call(_create_many, [mail_row(user_id, message_id), mail_row(user_id, fresh_id)], True)
+    assert outcomes[0] is None
+    assert isinstance(outcomes[1], int)
+    assert client.portal.call(_ticket_ids, message_id) == []
+    assert client.portal.call(_answer, archived_id) == (archived_id, message_id)
+
+
+def test_restore_gives_up_message_id_taken_in_tickets(client, make_user):
+    user_id, _ = make_user()
+    message_id = f"{uuid.uuid4().hex}@example.com"
+    archived_id = client.portal.call(_archive_answered, user_id, message_id)
+    # Дубликат, появившийся, пока оригинал переносился в архив
+    [duplicate_id] = client.portal.call(_create_many, [mail_row(user_id, message_id)], False)
+
+    assert client.portal.call(_answer, archived_id) == (archived_id, None)
+    assert client.portal.call(_ticket_ids, message_id) == [duplicate_id]
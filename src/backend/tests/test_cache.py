@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from app.core.cache import CacheBackend, RedisCacheBackend, SharedCache
+
+
+class Loader:
+    """load() для get_or_load: считает вызовы и возвращает очередную версию значения"""
+
+    def __init__(self, delay: float = 0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"version": self.calls}
+
+
+class BrokenBackend(CacheBackend):
+    def __init__(self):
+        self.calls = 0
+
+    async def _fail(self, *args):
+        self.calls += 1
+        raise ConnectionError("redis is down")
+
+    get = add = put = _fail
+
+
+def test_concurrent_misses_load_once():
+    async def scenario():
+        cache = SharedCache()
+        load = Loader(delay=0.05)
+        values = await asyncio.gather(*(cache.get_or_load("user:1", load, ttl=60) for _ in range(20)))
+        return load.calls, values
+
+    calls, values = asyncio.run(scenario())
+    assert calls == 1
+    assert values == [{"version": 1}] * 20
+
+
+def test_local_copy_expires_after_local_ttl_without_backend():
+    async def scenario():
+        cache = SharedCache(local_ttl=0.05)
+        load = Loader()
+        await cache.get_or_load("user:1", load, ttl=300)
+        await cache.get_or_load("user:1", load, ttl=300)
+        await asyncio.sleep(0.1)
+        return await cache.get_or_load("user:1", load, ttl=300)
+
+    # Инвалидацию в другом воркере этот процесс не видит: старое живёт не дольше local_ttl
+    assert asyncio.run(scenario()) == {"version": 2}
+
+
+def test_invalidation_in_other_process_holds_off_caching():
+    fakeredis = pytest.importorskip("fakeredis")
+
+    def make_cache(server) -> SharedCache:
+        backend = RedisCacheBackend("redis://fake", client=fakeredis.FakeAsyncRedis(server=server))
+        return SharedCache(backend, local_ttl=0.05, invalidation_hold=0.3)
+
+    async def scenario():
+        server = fakeredis.FakeServer()
+        reader, writer = make_cache(server), make_cache(server)
+        load = Loader()
+        assert await reader.get_or_load("ticket:1", load, ttl=60) == {"version": 1}
+        # Значение в Redis: второй процесс БД не читает
+        assert await writer.get_or_load("ticket:1", load, ttl=60) == {"version": 1}
+        assert load.calls == 1
+
+        await writer.invalidate("ticket:1")
+        await asyncio.sleep(0.1)
+        # Пока надгробие живо, загруженное не кэшируется ни в одном процессе
+        assert await reader.get_or_load("ticket:1", load, ttl=60) == {"version": 2}
+        assert await reader.get_or_load("ticket:1", load, ttl=60) == {"version": 3}
+
+        await asyncio.sleep(0.3)
+        assert await reader.get_or_load("ticket:1", load, ttl=60) == {"version": 4}
+        assert await writer.get_or_load("ticket:1", load, ttl=60) == {"version": 4}
+
+    asyncio.run(scenario())
+
+
+def test_broken_backend_falls_back_to_load_and_is_bypassed():
+    async def scenario():
+        backend = BrokenBackend()
+        cache = SharedCache(backend, local_ttl=0, retry_seconds=60)
+        load = Loader()
+        values = [await cache.get_or_load(f"user:{number}", load, ttl=60) for number in range(5)]
+        return backend.calls, load.calls, values
+
+    backend_calls, load_calls, values = asyncio.run(scenario())
+    assert values == [{"version": number} for number in range(1, 6)]
+    assert load_calls == 5
+    # Одна ошибка get, дальше retry_seconds сетевой уровень не трогается
+    assert backend_calls == 1
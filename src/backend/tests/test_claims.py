@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.enums import TicketPriority, UserRole
+from app.db.session import create_engine_from_settings
+from app.models.ticket import Ticket
+from benchmarks.claims import release_all, run_level
+
+CLAIMERS = 100
+TICKETS = 3000
+
+
+def test_claim_hands_out_ticket_to_operator(client, make_user):
+    _, headers = make_user()
+    operator_id, operator = make_user(UserRole.OPERATOR)
+    client.post(
+        "/tickets/",
+        json={"topic": "Disk", "description": "Disk quota exceeded again", "priority": "high"},
+        headers=headers,
+    ).raise_for_status()
+
+    first = client.post("/tickets/claim", headers=operator)
+    assert first.status_code == 200
+    assert first.json()["claimed_by"] == operator_id
+    second = client.post("/tickets/claim", headers=operator)
+    if second.status_code == 200:
+        assert second.json()["id"] != first.json()["id"]
+    client.delete(f"/tickets/{first.json()['id']}/claim", headers=operator).raise_for_status()
+
+
+def test_concurrent_claimers_get_distinct_tickets_without_waiting(postgres_url, add_users):
+    async def scenario():
+        engine = create_engine_from_settings(postgres_url, name="test_claims", pool_size=CLAIMERS, max_overflow=0)
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_maker() as session:
+            max_connections = int((await session.execute(text("SHOW max_connections"))).scalar())
+            if max_connections <= CLAIMERS + 10:
+                pytest.skip(f"max_connections={max_connections} is too low for {CLAIMERS} claimers")
+            # У каждого claimer свой оператор, как в проде: проверка FK claimed_by
+            # не сводит всех к одной строке users
+            owner, *operators = await add_users(session, UserRole.USER, *[UserRole.OPERATOR] * CLAIMERS)
+            operator_ids = [operator.id for operator in operators]
+            await session.execute(
+                insert(Ticket),
+                [
+                    {
+                        "user_id": owner.id,
+                        "topic": f"Topic {number}",
+                        "description": "Cannot open the shared folder",
+                        "priority": list(TicketPriority)[number % len(TicketPriority)],
+                    }
+                    for number in range(TICKETS)
+                ],
+            )
+            await session.commit()
+
+        monitor = create_engine_from_settings(postgres_url, name="test_claims_monitor", pool_size=1, max_overflow=0)
+        lock_waits = []
+
+        async def sample_lock_waits() -> None:
+            async with monitor.connect() as conn:
+                while True:
+                    # Только блокировки строк: extend при росте таблицы к очереди не относится
+                    result = await conn.execute(
+                        text(
+                            "SELECT count(*) FILTER (WHERE wait_event = 'tuple'), "
+                            "count(*) FILTER (WHERE wait_event = 'transactionid') "
+                            "FROM pg_stat_activity WHERE wait_event_type = 'Lock'"
+                        )
+                    )
+                    lock_waits.append(tuple(result.one()))
+                    await asyncio.sleep(0.005)
+
+        try:
+            single = await run_level(session_maker, operator_ids[:1], 1, 200)
+            await release_all(session_maker)
+            sampler = asyncio.create_task(sample_lock_waits())
+            try:
+                crowd = await run_level(session_maker, operator_ids, CLAIMERS, TICKETS)
+            finally:
+                sampler.cancel()
+        finally:
+            await release_all(session_maker)
+            await engine.dispose()
+            await monitor.dispose()
+        return single, crowd, lock_waits
+
+    single, crowd, lock_waits = asyncio.run(scenario())
+    assert crowd["claims"] == TICKETS
+    assert crowd["duplicates"] == 0
+    queued = [tuple_waits for tuple_waits, _ in lock_waits]
+    chained = [xact_waits for _, xact_waits in lock_waits]
+    # SKIP LOCKED: claimers не выстраиваются в очередь за строкой, закреплённой другим
+    # (без него в очереди за блокировкой строки стоят почти все сразу)
+    assert lock_waits and max(queued) == 0, lock_waits
+    # Ожидание transactionid остаётся в одном случае, и это поведение Postgres, а не очереди:
+    # снимок claimer ещё видит тикет, который другой уже закрепил и зафиксировал, и
+    # heap_lock_tuple идёт по цепочке версий без учёта SKIP LOCKED. Новую версию при перепроверке
+    # успел заблокировать третий claimer: она ему не подошла, но блокировку он держит до своего
+    # COMMIT. Ждут по одному и не дольше, чем идёт один claim
+    assert max(chained) <= 2, lock_waits
+    # Задержка claim растёт только от очереди клиентов в одном event loop,
+    # поэтому сравнивается пропускная способность: она не проседает при 100 claimers
+    assert crowd["claims_per_second"] > single["claims_per_second"] / 2, (single, crowd)
@@ -0,0 +1,25 @@
+from sqlalchemy import func, select
+
+from app.db.session import async_session_maker
+from app.models.counter import RowCounter
+from app.repositories.counter import TICKETS_VERSION_KEY, CounterRepository, shard_keys
+
+
+async def _bump_version(times: int) -> tuple[int, int, int]:
+    async with async_session_maker() as session:
+        counters = CounterRepository(session)
+        before = await counters.get(TICKETS_VERSION_KEY) or 0
+        for _ in range(times):
+            await counters.increment_many({TICKETS_VERSION_KEY: 1})
+        await session.commit()
+        result = await session.execute(
+            select(func.count()).select_from(RowCounter).where(RowCounter.key.in_(shard_keys(TICKETS_VERSION_KEY)))
+        )
+        return before, await counters.get(TICKETS_VERSION_KEY), result.scalar()
+
+
+def test_sharded_counter_sums_its_rows(client):
+    before, after, rows = client.portal.call(_bump_version, 100)
+    assert after == before + 100
+    # Приращения расходятся по долям: параллельные записи не ждут одну строку
+    assert rows > 1
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from app.db.session import async_session_maker
+from app.repositories.draft import DraftRepository
+
+
+async def _claim_drafts() -> list:
+    async with async_session_maker() as session:
+        return await DraftRepository(session).claim(100, timedelta(minutes=5))
+
+
+def test_claim_returns_queue_timestamps(client, make_user):
+    _, headers = make_user()
+    response = client.post(
+        "/tickets/",
+        json={"topic": "Printer", "description": "The office printer is offline"},
+        headers=headers,
+    )
+    assert response.status_code == 201
+
+    jobs = client.portal.call(_claim_drafts)
+    job = next(job for job in jobs if job.ticket_id == response.json()["id"])
+    assert job.topic == "Printer"
+    assert job.started_at >= job.created_at
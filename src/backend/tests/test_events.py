@@ -0,0 +1,19 @@
+import asyncio
+
+from app.core.enums import EventsBackend, TicketEventType
+from app.events.hub import EventHub
+
+
+def test_postgres_backend_falls_back_to_memory_on_sqlite():
+    async def scenario():
+        hub = EventHub(EventsBackend.POSTGRES, "ticket_events", "sqlite+aiosqlite:///./app.db")
+        hub.start()
+        try:
+            assert hub.backend == EventsBackend.MEMORY
+            with hub.subscribe() as subscription:
+                hub.publish(TicketEventType.TICKETS_IMPORTED, created=1)
+                return subscription.queue.get_nowait()
+        finally:
+            await hub.stop()
+
+    assert asyncio.run(scenario()).startswith("event: tickets.imported\n")
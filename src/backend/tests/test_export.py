@@ -0,0 +1,59 @@
+import asyncio
+import csv
+import gc
+import io
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.enums import TicketPriority, UserRole
+from app.core.export import iter_csv, iter_xlsx
+from benchmarks.export import rss_bytes
+
+HEADER = ["id", "topic", "description", "priority", "created_at", "response"]
+ROWS = 300_000
+# Прирост пика RSS за выгрузку; буферизация всего файла дала бы сотни МБ
+BUDGET_BYTES = 32 * 2**20
+
+
+async def _rows(count: int):
+    created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for number in range(count):
+        yield (number, f"Тема {number}", "Не работает почта в офисе " * 8, TicketPriority.LOW, created_at, None)
+
+
+async def _peak_rss_growth(chunks) -> tuple[int, int]:
+    gc.collect()
+    baseline = peak = rss_bytes()
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        peak = max(peak, rss_bytes())
+    return size, peak - baseline
+
+
+@pytest.mark.parametrize("writer", [iter_csv, iter_xlsx], ids=["csv", "xlsx"])
+def test_export_memory_does_not_grow_with_rows(writer):
+    size, growth = asyncio.run(_peak_rss_growth(writer(HEADER, _rows(ROWS))))
+    if writer is iter_csv:
+        # Выгрузка больше бюджета: держать её в памяти целиком тест бы не дал
+        assert size > BUDGET_BYTES
+    assert growth < BUDGET_BYTES, f"peak RSS growth {growth / 2**20:.1f} MB"
+
+
+def test_csv_export_escapes_formulas(client, make_user):
+    _, headers = make_user()
+    _, operator = make_user(UserRole.OPERATOR)
+    topic = "=HYPERLINK(\"http://evil\")"
+    created = client.post(
+        "/tickets/",
+        json={"topic": topic, "description": "@SUM(1+1) in the description"},
+        headers=headers,
+    ).json()
+
+    response = client.get("/tickets/export", params={"format": "csv"}, headers=operator)
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.content.decode("utf-8-sig"))))
+    row = next(row for row in rows if int(row["ID"]) == created["id"])
+    assert row["Тема"] == "'" + topic
+    assert row["Описание"] == "'@SUM(1+1) in the description"
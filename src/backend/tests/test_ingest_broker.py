@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.ingest.broker import RedisStreamsBroker
+
+
+def make_broker(server, consumer: str, visibility_timeout: float) -> RedisStreamsBroker:
+    return RedisStreamsBroker(
+        "redis://fake",
+        "mail",
+        prefetch=100,
+        consumer=consumer,
+        visibility_timeout=visibility_timeout,
+        reclaim_interval=0,
+        client=fakeredis.FakeAsyncRedis(server=server),
+    )
+
+
+def test_redis_streams_reclaims_messages_of_dead_consumer():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        dead = make_broker(server, "worker-a", visibility_timeout=0.05)
+        alive = make_broker(server, "worker-b", visibility_timeout=0.05)
+        await dead.connect()
+        await alive.connect()
+        await dead.publish(b"first")
+        await dead.publish(b"second")
+
+        # worker-a получил письма и упал, не подтвердив их
+        taken = await dead.fetch(10, timeout=0.01)
+        assert [message.body for message in taken] == [b"first", b"second"]
+        assert await alive.fetch(10, timeout=0.01) == []
+
+        await asyncio.sleep(0.1)
+        reclaimed = await alive.fetch(10, timeout=0.01)
+        assert [message.body for message in reclaimed] == [b"first", b"second"]
+        await alive.ack(reclaimed)
+
+        pending = await alive.redis.xpending(alive.stream, alive.group)
+        assert pending["pending"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_redis_streams_keeps_messages_within_visibility_timeout():
+    async def scenario():
+        server = fakeredis.FakeServer()
+        busy = make_broker(server, "worker-a", visibility_timeout=60)
+        other = make_broker(server, "worker-b", visibility_timeout=60)
+        await busy.connect()
+        await other.connect()
+        await busy.publish(b"slow")
+
+        assert len(await busy.fetch(10, timeout=0.01)) == 1
+        assert await other.fetch(10, timeout=0.01) == []
+
+    asyncio.run(scenario())
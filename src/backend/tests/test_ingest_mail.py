@@ -0,0 +1,25 @@
+import pytest
+
+from app.ingest.mail import InvalidMail, parse_mail
+
+
+def make_mail(sender: str) -> bytes:
+    return (
+        f"From: {sender}\r\n"
+        "Subject: VPN is down\r\n"
+        "Message-ID: <1@example.com>\r\n"
+        "\r\n"
+        "VPN disconnects every hour\r\n"
+    ).encode()
+
+
+def test_sender_is_normalized_like_registration():
+    mail = parse_mail(make_mail("John Smith <John@Example.COM>"))
+    assert mail.sender == "John@example.com"
+    assert mail.ticket.topic == "VPN is down"
+
+
+@pytest.mark.parametrize("sender", ["root@localhost", "x@y..z", "no-address"])
+def test_invalid_sender_is_rejected(sender):
+    with pytest.raises(InvalidMail):
+        parse_mail(make_mail(sender))
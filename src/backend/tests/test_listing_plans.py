@@ -0,0 +1,35 @@
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.repositories.ticket import TicketRepository
+from benchmarks.listing import check_plans
+from benchmarks.seed import ANCHOR, SeedConfig, seed
+
+# На почти пустых таблицах Seq Scan дешевле индекса: нужен объём, при котором планировщик выбирает по статистике
+CONFIG = SeedConfig(users=500, tickets=50_000)
+
+
+def test_all_tickets_plans_have_no_seq_scan(postgres_url):
+    async def scenario():
+        engine = create_async_engine(postgres_url, poolclass=NullPool)
+        # Схема пересоздаётся: тесты после этого заводят своих пользователей и тикеты
+        await seed(engine, CONFIG, reset=True)
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        # Старые отвеченные — в архив, как у ArchiveMover: include_archived читает обе таблицы
+        async with session_maker() as session:
+            while await TicketRepository(session).archive_batch(ANCHOR - timedelta(days=90), limit=5000):
+                pass
+        async with engine.connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.exec_driver_sql("VACUUM ANALYZE")
+        async with session_maker() as session:
+            checks = await check_plans(session, limit=20)
+        await engine.dispose()
+        return checks
+
+    checks = asyncio.run(scenario())
+    assert checks
+    assert [check for check in checks if check[-1]] == []
@@ -0,0 +1,18 @@
+import statistics
+
+from app.cli.import_profile import cold_import_seconds, profile_imports
+from benchmarks.startup import DEFERRED
+
+# Запас в несколько раз к benchmarks.startup (1000 мс): тест ловит грубые регрессии на любой машине
+BUDGET_SECONDS = 3
+
+
+def test_deferred_dependencies_are_not_imported_eagerly():
+    loaded = {record.module for record in profile_imports("app.main")}
+    assert "app.main" in loaded
+    assert [name for name in DEFERRED.split(",") if name in loaded] == []
+
+
+def test_cold_import_fits_budget():
+    median = statistics.median(cold_import_seconds("app.main") for _ in range(3))
+    assert median < BUDGET_SECONDS, f"cold import of app.main took {median:.2f} s"
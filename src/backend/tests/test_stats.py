@@ -0,0 +1,57 @@
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.enums import TicketPriority, UserRole
+from app.models.stats import TicketStat
+from app.models.ticket import Ticket
+from app.repositories.ticket import TicketRepository
+from app.repositories.user import UserRepository
+
+
+def test_answer_is_recorded_in_stats(client, make_user):
+    _, headers = make_user()
+    operator_id, operator = make_user(UserRole.OPERATOR)
+    ticket = client.post(
+        "/tickets/",
+        json={"topic": "VPN", "description": "VPN disconnects every hour", "priority": "high"},
+        headers=headers,
+    ).json()
+
+    response = client.patch(
+        f"/tickets/{ticket['id']}/response", json={"response": "Update the client"}, headers=operator
+    )
+    assert response.status_code == 200
+
+    records = client.get("/stats/records", params={"limit": 100}, headers=operator).json()["records"]
+    record = next(record for record in records if record["ticket_id"] == ticket["id"])
+    assert record["operator_id"] == operator_id
+    assert record["solution"] == "Update the client"
+    assert record["first_response_seconds"] >= 0
+    priorities = client.get("/stats/priorities", headers=operator).json()["priorities"]
+    assert next(row for row in priorities if row["priority"] == "high")["answered"] >= 1
+
+
+def test_deleting_users_keeps_their_stats_records(postgres_url, add_users):
+    async def scenario():
+        engine = create_async_engine(postgres_url, poolclass=NullPool)
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_maker() as session:
+            owner, operator = await add_users(session, UserRole.USER, UserRole.OPERATOR)
+            await session.commit()
+            ticket = Ticket(
+                user_id=owner.id, topic="Mail", description="Mail is not delivered", priority=TicketPriority.LOW
+            )
+            session.add(ticket)
+            await session.commit()
+            await TicketRepository(session).update_response(ticket.id, "Fixed", operator_id=operator.id)
+
+            assert await UserRepository(session).delete(operator.id)
+            record = (await session.execute(select(TicketStat).where(TicketStat.ticket_id == ticket.id))).scalar_one()
+            assert record.operator_id is None
+            assert record.client_id == owner.id
+        await engine.dispose()
+
+    asyncio.run(scenario())
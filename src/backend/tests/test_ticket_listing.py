@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.core.enums import UserRole
+from app.db.session import get_engine
+
+
+@contextmanager
+def count_statements():
+    """Считает SQL, выполненные engine primary внутри блока"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = get_engine().sync_engine
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_all_tickets_statements_do_not_grow_with_page_size(client, make_user):
+    for _ in range(6):
+        _, headers = make_user()
+        for number in range(10):
+            response = client.post(
+                "/tickets/",
+                json={"topic": f"Topic {number}", "description": "Cannot log in to the portal"},
+                headers=headers,
+            )
+            assert response.status_code == 201
+    _, operator = make_user(UserRole.OPERATOR)
+    # Первый запрос оператора кладёт его в кэш текущего пользователя
+    client.get("/tickets/all", params={"limit": 1}, headers=operator).raise_for_status()
+
+    counts = {}
+    for limit in (5, 50):
+        with count_statements() as statements:
+            response = client.get("/tickets/all", params={"limit": limit}, headers=operator)
+        assert response.status_code == 200
+        tickets = response.json()["tickets"]
+        assert len(tickets) == limit
+        assert all(ticket["user_email"] for ticket in tickets)
+        counts[limit] = len(statements)
+
+    assert counts[5] == counts[50], counts